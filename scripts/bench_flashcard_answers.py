@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""Check and time the build-time flashcard answer layout against the browser formatter it replaced.
+
+Flashcard pages used to run formatAnswerForExam() (kept below as JS_FORMATTER) on
+every card shown. The converter now lays out answers with list lines once
+(answer_list_html) and ships them as answerHtml; the page's answerHtml() only
+escapes the rest. This script runs a set of edge cases (line endings, Unicode
+spaces, list markers, HTML characters, non-string answers) plus a synthetic deck
+through the old formatter, the page's current path and format_answer_html(), and
+reports
+
+- any answer where either differs from the old formatter (exit status 1)
+- the time per card shown in the page, before and after
+- the Python time for the whole deck, paid once per build
+- how much answerHtml adds to the card data, raw and gzipped
+
+    python scripts/bench_flashcard_answers.py --cards 10000
+"""
+
+import argparse
+import gzip
+import importlib.util
+import json
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+FLASHCARDS_MAIN = REPO_ROOT / "skills" / "flashcards" / "main.py"
+
+JS_FORMATTER = r"""
+function formatAnswerForExam(text) {
+    if (!text) return '';
+    let formatted = String(text)
+        .replace(/&/g, '&amp;')
+        .replace(/</g, '&lt;')
+        .replace(/>/g, '&gt;');
+    const lines = formatted.split(/\n|\r\n|\r/);
+    const items = [];
+    for (let i = 0; i < lines.length; i++) {
+        const line = lines[i].trim();
+        if (!line) continue;
+        const bulletMatch = line.match(/^[•\-\*◦▪▪▫]\s+(.+)$/);
+        if (bulletMatch) {
+            items.push({type: 'bullet', content: bulletMatch[1]});
+            continue;
+        }
+        const numberMatch = line.match(/^(\d+)[\.\)]\s+(.+)$/);
+        if (numberMatch) {
+            items.push({type: 'number', content: numberMatch[2]});
+            continue;
+        }
+        const letterMatch = line.match(/^([a-zA-Z])[\.\)]\s+(.+)$/);
+        if (letterMatch) {
+            items.push({type: 'letter', content: letterMatch[2]});
+            continue;
+        }
+        items.push({type: 'text', content: line});
+    }
+    let html = '';
+    let currentList = null;
+    let listType = null;
+    for (let i = 0; i < items.length; i++) {
+        const item = items[i];
+        if (item.type === 'bullet' || item.type === 'number' || item.type === 'letter') {
+            if (!currentList || listType !== item.type) {
+                if (currentList) {
+                    html += '</ul>';
+                }
+                currentList = [];
+                listType = item.type;
+                html += '<ul>';
+            }
+            html += '<li>' + item.content + '</li>';
+        } else {
+            if (currentList) {
+                html += '</ul>';
+                currentList = null;
+                listType = null;
+            }
+            html += '<div class="formatted-answer">' + item.content + '</div>';
+        }
+    }
+    if (currentList) {
+        html += '</ul>';
+    }
+    if (!html.includes('<ul>')) {
+        html = '<div class="formatted-answer">' + formatted.replace(/\n/g, '<br>') + '</div>';
+    }
+    return html;
+}
+"""
+
+NODE_DRIVER = r"""
+const fs = require('fs');
+const cards = JSON.parse(fs.readFileSync(process.argv[2], 'utf8'));
+const rounds = Number(process.argv[3]);
+const best = (show) => {
+  let ms = Infinity;
+  for (let round = 0; round < rounds; round++) {
+    const started = process.hrtime.bigint();
+    for (const card of cards) show(card);
+    ms = Math.min(ms, Number(process.hrtime.bigint() - started) / 1e6);
+  }
+  return ms;
+};
+console.log(JSON.stringify({
+  before: cards.map((card) => formatAnswerForExam(card.answer)),
+  after: cards.map(answerHtml),
+  beforeMs: best((card) => formatAnswerForExam(card.answer)),
+  afterMs: best(answerHtml)
+}));
+"""
+
+EDGE_CASES = [
+    "", "plain answer", "two\nlines", "a\r\nb\rc\n\nd", "• one\n• two", "- dash\n* star\n◦ ring\n▪ square\n▫ open",
+    "1. first\n2) second\n10. tenth", "a. alpha\nB) beta", "• bullet\n1. number\na. letter\ntext\n• again",
+    "  • indented\t\n\t2.\tafter tab  ", "•no space", "1.no space", "ab. two letters", "\u0661. arabic digit",
+    "• <b>tag</b> & more", "x < y > z & w", "•\u00a0nbsp", "\u3000• ideographic", "\ufeff• bom",
+    "\x85• nel\x1c", "•\u2003em space", "• a\u2028b", "text\u2029more", "\n\n• trailing\n\n",
+    "• \ue0000\ue001 math ref", "1.\n2. empty first", "a) b) c", 0, 42, 1.5, 2.0, True, False, None
+]
+
+
+def script_function(script: str, name: str) -> str:
+    start = script.index(f"function {name}(")
+    return script[start:script.index("\n        }\n", start) + len("\n        }\n")]
+
+
+def load_flashcards_module():
+    spec = importlib.util.spec_from_file_location("flashcards_main", FLASHCARDS_MAIN)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_answers(count: int, seed: int = 1) -> list[str]:
+    rng = random.Random(seed)
+    words = "cell membrane protein energy transport gradient <enzyme> & substrate kinetic".split()
+    markers = ["• ", "- ", "* ", "1. ", "2) ", "a. ", "b) ", ""]
+    answers = []
+    for _ in range(count):
+        lines = []
+        for _ in range(rng.randint(1, 6)):
+            marker = rng.choice(markers)
+            lines.append(marker + " ".join(rng.choice(words) for _ in range(rng.randint(3, 12))))
+        answers.append(rng.choice(["\n", "\r\n"]).join(lines))
+    return answers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and time build-time flashcard answer layout")
+    parser.add_argument("--cards", type=int, default=10000, help="Cards in the synthetic deck (default: 10000)")
+    parser.add_argument("--rounds", type=int, default=5, help="Timing rounds, best is reported (default: 5)")
+    args = parser.parse_args()
+
+    node = shutil.which("node")
+    if not node:
+        sys.exit("node is required to run the JS formatter")
+
+    flashcards = load_flashcards_module()
+    answers = EDGE_CASES + make_answers(args.cards)
+    cards = [
+        flashcards.with_answer_html({"question": f"Card {number}", "answer": answer})
+        for number, answer in enumerate(answers, 1)
+    ]
+    page_functions = "\n".join(
+        script_function(flashcards.FLASHCARDS_SCRIPT, name) for name in ("escapeHtml", "answerHtml")
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        script = Path(tmp) / "formatter.js"
+        script.write_text(JS_FORMATTER + page_functions + NODE_DRIVER, encoding="utf-8")
+        data = Path(tmp) / "cards.json"
+        data.write_text(json.dumps(cards), encoding="utf-8")
+        result = json.loads(subprocess.run(
+            [node, str(script), str(data), str(args.rounds)], capture_output=True, text=True, check=True
+        ).stdout)
+
+    mismatches = []
+    for answer, expected, shown in zip(answers, result["before"], result["after"]):
+        built = flashcards.format_answer_html(answer)
+        if shown != expected or built != expected:
+            mismatches.append((answer, expected, shown, built))
+    for answer, expected, shown, built in mismatches[:10]:
+        print(f"MISMATCH {answer!r}\n  before: {expected!r}\n  page:   {shown!r}\n  python: {built!r}")
+
+    deck = answers[len(EDGE_CASES):]
+    python_ms = float("inf")
+    for _ in range(args.rounds):
+        started = time.perf_counter()
+        for answer in deck:
+            flashcards.with_answer_html({"answer": answer})
+        python_ms = min(python_ms, (time.perf_counter() - started) * 1000)
+
+    plain = json.dumps([{"question": card["question"], "answer": card["answer"]} for card in cards]).encode("utf-8")
+    shipped = json.dumps(cards).encode("utf-8")
+    per_card = 1000 / len(cards)
+    print(f"Parity: {len(answers) - len(mismatches)}/{len(answers)} answers identical "
+          f"({len(EDGE_CASES)} edge cases, {len(deck)} deck cards, {sum('answerHtml' in card for card in cards)} with lists)")
+    print(f"Page, per card shown: {result['beforeMs'] * per_card:.2f} µs before, {result['afterMs'] * per_card:.2f} µs now")
+    print(f"Build (Python): {python_ms:.1f} ms for {len(deck)} cards, once")
+    print(f"Card data: {len(plain) / 1024:.0f} KB -> {len(shipped) / 1024:.0f} KB raw, "
+          f"{len(gzip.compress(plain)) / 1024:.0f} KB -> {len(gzip.compress(shipped)) / 1024:.0f} KB gzip")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Estimate the first-paint work of a large mind map with build-time fold state.
+
+Pages used to lay out the whole map expanded, then poll every 100 ms for the SVG
+and fold everything below the first level in the browser. The converter now
+writes payload.fold into the map data (--initial-depth), so markmap lays out only
+the visible nodes on its first pass. This script builds a synthetic outline at
+several --initial-depth values and reports, per page:
+
+- how many nodes the first layout covers, out of the whole map
+- the time to lay those nodes out, with the converter's Python port of markmap's
+  tree layout (layout_mindmap) standing in for the browser's
+- page size and build time
+
+There is no browser here, so the layout times are an estimate of the relative
+first-paint cost, not a measurement of it. The old page's cost is the
+fully expanded row (-1) plus at least one 100 ms poll before the fold.
+
+    python scripts/bench_mindmap_fold.py --nodes 5000 --depths -1 1 2 3
+"""
+
+import argparse
+import importlib.util
+import tempfile
+import time
+from pathlib import Path
+
+
+MINDMAP_MAIN = Path(__file__).resolve().parent.parent / "skills" / "mindmap" / "main.py"
+
+
+def load_mindmap_module():
+    spec = importlib.util.spec_from_file_location("mindmap_main", MINDMAP_MAIN)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_outline(nodes: int, branching: int) -> str:
+    """A Markdown outline of `nodes` nodes, filled breadth first, `branching` children each."""
+    lines = ["# Root"]
+    children: dict[int, list[int]] = {0: []}
+    depth = {0: 0}
+    queue, parent = [0], 0
+    for node in range(1, nodes):
+        while len(children[queue[parent]]) == branching:
+            parent += 1
+        children[queue[parent]].append(node)
+        children[node] = []
+        depth[node] = depth[queue[parent]] + 1
+        queue.append(node)
+
+    stack = list(reversed(children[0]))
+    while stack:
+        node = stack.pop()
+        lines.append(f"{'  ' * (depth[node] - 1)}- Topic {node} with a few words of text")
+        stack.extend(reversed(children[node]))
+    return "\n".join(lines) + "\n"
+
+
+def visible_tree(node: dict) -> dict:
+    """The part of a markmap tree the page lays out: children of folded nodes are skipped."""
+    if (node.get("payload") or {}).get("fold"):
+        return {**node, "children": []}
+    return {**node, "children": [visible_tree(child) for child in node.get("children", [])]}
+
+
+def count_nodes(node: dict) -> int:
+    return 1 + sum(count_nodes(child) for child in node.get("children", []))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estimate mind map first-paint work per --initial-depth")
+    parser.add_argument("--nodes", type=int, default=5000, help="Nodes in the synthetic outline (default: 5000)")
+    parser.add_argument("--branching", type=int, default=6, help="Children per node (default: 6)")
+    parser.add_argument("--depths", type=int, nargs="+", default=[-1, 1, 2, 3],
+                        help="--initial-depth values to compare (default: -1 1 2 3)")
+    parser.add_argument("--rounds", type=int, default=5, help="Timing rounds, best is reported (default: 5)")
+    args = parser.parse_args()
+
+    mindmap = load_mindmap_module()
+    mindmap.logger.remove()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "outline.md"
+        source.write_text(make_outline(args.nodes, args.branching), encoding="utf-8")
+        print(f"{'depth':>6} {'laid out':>14} {'layout ms':>10} {'page KB':>9} {'build ms':>9}")
+        for initial_depth in args.depths:
+            output = Path(tmp) / f"depth{initial_depth}.html"
+            started = time.perf_counter()
+            mindmap.convert_markdown_to_mindmap(
+                str(source), str(output), renderer="python", initial_depth=initial_depth
+            )
+            build_ms = (time.perf_counter() - started) * 1000
+
+            page = output.read_text(encoding="utf-8")
+            tree = mindmap.markmap_tree_from_html(page)
+            shown = visible_tree(tree)
+            layout_ms = float("inf")
+            for _ in range(args.rounds):
+                started = time.perf_counter()
+                mindmap.layout_mindmap(shown)
+                layout_ms = min(layout_ms, (time.perf_counter() - started) * 1000)
+
+            laid_out = f"{count_nodes(shown)}/{count_nodes(tree)}"
+            print(f"{initial_depth:>6} {laid_out:>14} {layout_ms:>10.1f} {len(page) / 1024:>9.0f} {build_ms:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
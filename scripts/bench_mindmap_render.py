@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Compare in-process mind map rendering with the markmap-cli paths it replaces.
+
+Headings-and-lists outlines are rendered in Python (--renderer python) instead
+of starting markmap-cli per file. This script converts the same synthetic
+outlines with convert_markdown_to_mindmap() three ways and reports the median
+and total time per document:
+
+- python: in-process, no Node
+- cli:    one markmap-cli subprocess per document (the old default path)
+- worker: one long-lived markmap worker for all documents (batch mode)
+
+The cli and worker rows are skipped when markmap-cli is not installed; the
+worker row also needs an entry point find_markmap_entry() can load.
+
+    python scripts/bench_mindmap_render.py --docs 20 --topics 30
+"""
+
+import argparse
+import importlib.util
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+
+MINDMAP_MAIN = Path(__file__).resolve().parent.parent / "skills" / "mindmap" / "main.py"
+
+
+def load_mindmap_module():
+    spec = importlib.util.spec_from_file_location("mindmap_main", MINDMAP_MAIN)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_outline(number: int, topics: int) -> str:
+    lines = [f"# Study Unit {number}", ""]
+    for topic in range(topics):
+        lines += [f"## Topic {topic}", "", f"- Point {topic}.1 with **bold** text", f"- Point {topic}.2"]
+        lines += [f"  - Detail {topic}.2.{detail} and `code`" for detail in range(3)]
+        lines.append("")
+    return "\n".join(lines)
+
+
+def convert_all(mindmap, sources: list[Path], output_dir: Path, renderer: str, worker=None) -> list[float]:
+    output_dir.mkdir()
+    times = []
+    for source in sources:
+        started = time.perf_counter()
+        mindmap.convert_markdown_to_mindmap(
+            str(source), str(output_dir / f"{source.stem}.html"), renderer=renderer, worker=worker, force=True
+        )
+        times.append((time.perf_counter() - started) * 1000)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare in-process and markmap-cli mind map rendering")
+    parser.add_argument("--docs", type=int, default=20, help="Outlines to convert per path (default: 20)")
+    parser.add_argument("--topics", type=int, default=30, help="Second-level topics per outline (default: 30)")
+    args = parser.parse_args()
+
+    mindmap = load_mindmap_module()
+    mindmap.logger.remove()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sources = []
+        for number in range(args.docs):
+            source = Path(tmp) / f"unit{number}.md"
+            source.write_text(make_outline(number, args.topics), encoding="utf-8")
+            sources.append(source)
+
+        results = {"python": convert_all(mindmap, sources, Path(tmp) / "python", "python")}
+        has_cli = bool(shutil.which("markmap") or mindmap.find_markmap_cli())
+        if has_cli:
+            results["cli"] = convert_all(mindmap, sources, Path(tmp) / "cli", "cli")
+            started = time.perf_counter()
+            worker = mindmap.MarkmapWorker.create()
+            startup_ms = (time.perf_counter() - started) * 1000
+            if worker:
+                try:
+                    results["worker"] = convert_all(mindmap, sources, Path(tmp) / "worker", "cli", worker)
+                finally:
+                    worker.close()
+                print(f"Worker start-up: {startup_ms:.0f} ms, once per batch (not included below)")
+            else:
+                print("SKIP  worker (no markmap entry point the worker can load)")
+        else:
+            print("SKIP  cli, worker (markmap-cli not installed)")
+
+    baseline = statistics.median(results["cli"]) if "cli" in results else None
+    print(f"{'path':>8} {'median ms':>10} {'total ms':>10} {'vs cli':>8}")
+    for name, times in results.items():
+        median = statistics.median(times)
+        speedup = f"{baseline / median:.1f}x" if baseline else "-"
+        print(f"{name:>8} {median:>10.1f} {sum(times):>10.0f} {speedup:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Measure per-render time and allocations of the quiz and flashcard page templates.
+
+Renders small decks to the UTF-8 bytes that get written or served, once with the
+compiled page cached (the normal case) and once recompiling the page for every
+render, and reports the median time and the peak traced allocation per render.
+
+    python scripts/bench_page_render.py --cards 10 50 --renders 500 --katex-kb 300
+"""
+
+import argparse
+import importlib.util
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+
+from loguru import logger
+
+
+SKILLS_DIR = Path(__file__).resolve().parent.parent / "skills"
+
+
+def load_skill(name: str):
+    spec = importlib.util.spec_from_file_location(f"{name}_main", SKILLS_DIR / name / "main.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def synthetic_katex_assets(size_kb: int) -> dict:
+    """Inline KaTeX-sized assets (about a tenth CSS), for machines without a local install."""
+    css = ".katex{font:normal 1.21em KaTeX_Main,serif}" * (size_kb * 1024 // 10 // 44)
+    js = "var katexStub=function(a){return a};" * (size_kb * 1024 * 9 // 10 // 37)
+    return {"styles": f"<style>{css}</style>", "scripts": f"<script>{js}</script>", "fonts_dir": None}
+
+
+def measure(render, compiled_pages: dict, renders: int, cold: bool) -> tuple[float, int, int]:
+    """Return (median µs per render, peak traced bytes of one render, page bytes)."""
+    page = render()
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(renders // 5 or 1):
+            if cold:
+                compiled_pages.clear()
+            render()
+        timings.append((time.perf_counter() - start) / (renders // 5 or 1))
+
+    if cold:
+        compiled_pages.clear()
+    tracemalloc.start()
+    render()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(timings) * 1e6, peak, len(page)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark quiz/flashcard page rendering")
+    parser.add_argument("--cards", type=int, nargs="+", default=[10, 50], help="Deck sizes to render")
+    parser.add_argument("--renders", type=int, default=500, help="Renders per measurement (default: 500)")
+    parser.add_argument("--katex-kb", type=int, default=0,
+                        help="Use synthetic inline KaTeX assets of about this many KB (default: installed assets)")
+    args = parser.parse_args()
+
+    quiz = load_skill("quiz")
+    flashcards = load_skill("flashcards")
+    logger.remove()
+    quiz_katex = synthetic_katex_assets(args.katex_kb) if args.katex_kb else quiz.get_katex_assets()
+    flashcards_katex = synthetic_katex_assets(args.katex_kb) if args.katex_kb else flashcards.get_katex_assets()
+
+    print(f"{'page':<11} {'cards':>5} {'template':<10} {'µs/render':>10} {'peak KB':>8} {'page KB':>8}")
+    for count in args.cards:
+        quiz_data = {
+            "title": "Benchmark",
+            "questions": [
+                {"question": f"Question {i}: $x^{i}$?", "options": ["A", "B", "C", "D"], "correctIndex": i % 4}
+                for i in range(count)
+            ]
+        }
+        cards = [{"question": f"Term {i}", "answer": f"Definition {i}"} for i in range(count)]
+        cases = [
+            ("quiz", lambda: quiz.render_quiz_html(quiz_data, quiz_katex), quiz._compiled_pages),
+            ("flashcards", lambda: flashcards.render_flashcards_html(cards, "Benchmark", flashcards_katex),
+             flashcards._compiled_pages),
+        ]
+        for name, render, compiled_pages in cases:
+            for label, cold in (("compiled", False), ("recompile", True)):
+                micros, peak, size = measure(render, compiled_pages, args.renders, cold)
+                print(f"{name:<11} {count:>5} {label:<10} {micros:>10.1f} {peak / 1024:>8.0f} {size / 1024:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""Measure the DOM work each quiz interaction causes (answer, hint, next, review).
+
+Builds a synthetic quiz with math in every field and plays it through in Node
+against a small counting DOM: every question's hint is opened, an answer is picked
+and the learner moves on, then the quiz is reviewed. For each kind of interaction
+it reports the median script time and, per interaction, the nodes created, the
+nodes inserted into and removed from the document, attribute changes on attached
+elements, the HTML parsed and the formulas handed to math rendering.
+
+Document insertions, removals and attribute changes are what invalidate style and
+layout in a browser, and each formula costs a KaTeX render there (the stub here
+only inserts KaTeX-sized markup), so those columns are the ones to compare.
+--baseline REV runs the quiz script from a git revision alongside this tree's:
+
+    python scripts/bench_quiz_interaction.py --questions 40 --baseline HEAD~1
+"""
+
+import argparse
+import importlib.util
+import json
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+QUIZ_MAIN = Path("skills") / "quiz" / "main.py"
+
+NODE_HARNESS = r"""
+const fs = require('fs');
+const vm = require('vm');
+
+const KATEX_NODES = 12;
+let stats;
+const resetStats = () => {
+  stats = { created: 0, inserted: 0, removed: 0, changed: 0, parsed: 0, formulas: 0 };
+};
+resetStats();
+const subtreeSize = (node) => 1 + node.childNodes.reduce((sum, child) => sum + subtreeSize(child), 0);
+
+class Node {
+  constructor() { this.parentNode = null; this.childNodes = []; stats.created++; }
+  get isConnected() {
+    let node = this;
+    while (node.parentNode) node = node.parentNode;
+    return node === documentRoot;
+  }
+  _insert(child, index) {
+    if (child.parentNode) child.parentNode.removeChild(child);
+    child.parentNode = this;
+    this.childNodes.splice(index, 0, child);
+    if (this.isConnected) stats.inserted += subtreeSize(child);
+    return child;
+  }
+  appendChild(child) { return this._insert(child, this.childNodes.length); }
+  removeChild(child) {
+    const connected = this.isConnected;
+    this.childNodes.splice(this.childNodes.indexOf(child), 1);
+    child.parentNode = null;
+    if (connected) stats.removed += subtreeSize(child);
+    return child;
+  }
+  replaceWith(node) {
+    const parent = this.parentNode;
+    const index = parent.childNodes.indexOf(this);
+    parent.removeChild(this);
+    parent._insert(node, index);
+  }
+}
+
+class Text extends Node {
+  constructor(data) { super(); this.nodeType = 3; this.data = data; }
+  get textContent() { return this.data; }
+}
+
+class Element extends Node {
+  constructor(tag) {
+    super();
+    this.nodeType = 1;
+    this.tagName = tag.toUpperCase();
+    this.attributes = new Map();
+    const element = this;
+    this.classList = {
+      contains: (name) => element.className.split(/\s+/).includes(name),
+      add: (name) => {
+        if (!element.classList.contains(name)) element.className = (element.className + ' ' + name).trim();
+      },
+      remove: (name) => {
+        if (element.classList.contains(name)) {
+          element.className = element.className.split(/\s+/).filter((c) => c !== name).join(' ');
+        }
+      },
+      toggle: (name) => element.classList.contains(name) ? element.classList.remove(name) : element.classList.add(name)
+    };
+    this.style = new Proxy({}, {
+      set: (target, key, value) => {
+        if (target[key] !== value) { target[key] = value; element._changed(); }
+        return true;
+      }
+    });
+  }
+  _changed() { if (this.isConnected) stats.changed++; }
+  getAttribute(name) { return this.attributes.has(name) ? this.attributes.get(name) : null; }
+  setAttribute(name, value) {
+    value = String(value);
+    if (this.attributes.get(name) !== value) { this.attributes.set(name, value); this._changed(); }
+  }
+  removeAttribute(name) { if (this.attributes.delete(name)) this._changed(); }
+  hasAttribute(name) { return this.attributes.has(name); }
+  get className() { return this.getAttribute('class') || ''; }
+  set className(value) { this.setAttribute('class', value); }
+  get id() { return this.getAttribute('id') || ''; }
+  get hidden() { return this.hasAttribute('hidden'); }
+  set hidden(value) { value ? this.setAttribute('hidden', '') : this.removeAttribute('hidden'); }
+  get disabled() { return this.hasAttribute('disabled'); }
+  set disabled(value) { value ? this.setAttribute('disabled', '') : this.removeAttribute('disabled'); }
+  get children() { return this.childNodes.filter((node) => node.nodeType === 1); }
+  get firstElementChild() { return this.children[0] || null; }
+  get lastElementChild() { return this.children[this.children.length - 1] || null; }
+  get textContent() { return this.childNodes.map((node) => node.textContent).join(''); }
+  set textContent(value) { this._replaceChildren([new Text(String(value))]); }
+  set innerHTML(html) {
+    stats.parsed += html.length;
+    const holder = new Element('template');
+    parseInto(holder, html);
+    this._replaceChildren(holder.childNodes.slice());
+  }
+  _replaceChildren(nodes) {
+    for (const child of this.childNodes.slice()) this.removeChild(child);
+    for (const node of nodes) this.appendChild(node);
+  }
+  *descendants() {
+    for (const child of this.childNodes) {
+      if (child.nodeType === 1) { yield child; yield* child.descendants(); }
+    }
+  }
+  getElementsByTagName(tag) { return [...this.descendants()].filter((el) => el.tagName === tag.toUpperCase()); }
+  getElementById(id) {
+    for (const el of this.descendants()) if (el.id === id) return el;
+    return null;
+  }
+}
+
+const VOID_TAGS = new Set(['br', 'img', 'input', 'hr', 'meta', 'link']);
+const TOKEN_RE = /<!--[\s\S]*?-->|<\/([a-zA-Z][\w-]*)\s*>|<([a-zA-Z][\w-]*)((?:\s+[^\s=>\/]+(?:\s*=\s*(?:"[^"]*"|'[^']*'|[^\s>]+))?)*)\s*\/?>|[^<]+|</g;
+const ATTRIBUTE_RE = /([^\s=>\/]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+)))?/g;
+const decode = (text) => text
+  .replace(/&lt;/g, '<').replace(/&gt;/g, '>').replace(/&quot;/g, '"').replace(/&#39;/g, "'").replace(/&amp;/g, '&');
+
+function parseInto(root, html) {
+  let node = root;
+  for (const token of html.matchAll(TOKEN_RE)) {
+    if (token[0].startsWith('<!--')) continue;
+    if (token[1]) {
+      let open = node;
+      while (open !== root && open.tagName !== token[1].toUpperCase()) open = open.parentNode;
+      if (open !== root) node = open.parentNode;
+    } else if (token[2]) {
+      const element = new Element(token[2]);
+      for (const attribute of token[3].matchAll(ATTRIBUTE_RE)) {
+        element.attributes.set(attribute[1].toLowerCase(), decode(attribute[2] ?? attribute[3] ?? attribute[4] ?? ''));
+      }
+      node.appendChild(element);
+      if (!VOID_TAGS.has(token[2].toLowerCase()) && !token[0].endsWith('/>')) node = element;
+    } else {
+      node.appendChild(new Text(decode(token[0])));
+    }
+  }
+}
+
+// Stand-in for KaTeX auto-render: replaces every $...$ in text nodes with KaTeX-sized markup
+const MATH_RE = /\$\$[\s\S]+?\$\$|\$[^$]+?\$/g;
+function katexStub(tex) {
+  const root = new Element('span');
+  root.setAttribute('class', 'katex');
+  let node = root;
+  for (let i = 1; i < KATEX_NODES; i++) node = node.appendChild(new Element('span'));
+  node.appendChild(new Text(tex));
+  return root;
+}
+function renderMathInElement(root) {
+  for (const child of root.childNodes.slice()) {
+    if (child.nodeType === 1) {
+      if (!child.classList.contains('katex')) renderMathInElement(child);
+      continue;
+    }
+    if (!child.data.includes('$')) continue;
+    const parts = [];
+    let last = 0;
+    for (const match of child.data.matchAll(MATH_RE)) {
+      if (match.index > last) parts.push(new Text(child.data.slice(last, match.index)));
+      parts.push(katexStub(match[0]));
+      stats.formulas++;
+      last = match.index + match[0].length;
+    }
+    if (!parts.length) continue;
+    if (last < child.data.length) parts.push(new Text(child.data.slice(last)));
+    const index = root.childNodes.indexOf(child);
+    root.removeChild(child);
+    parts.forEach((part, offset) => root._insert(part, index + offset));
+  }
+}
+
+const documentRoot = new Element('html');
+const body = documentRoot.appendChild(new Element('body'));
+const document = {
+  body,
+  createElement: (tag) => new Element(tag),
+  getElementById: (id) => documentRoot.getElementById(id)
+};
+
+const html = fs.readFileSync(process.argv[2], 'utf8');
+const rounds = Number(process.argv[3]);
+const bodyHtml = html.slice(html.indexOf('<body>') + 6, html.indexOf('</body>')).replace(/<script[\s\S]*?<\/script>/g, '');
+const code = [...html.matchAll(/<script>([\s\S]*?)<\/script>/g)].map((match) => match[1]).join('\n');
+const samples = {};
+let context;
+
+function measure(action, run) {
+  resetStats();
+  const start = process.hrtime.bigint();
+  run();
+  const us = Number(process.hrtime.bigint() - start) / 1000;
+  (samples[action] = samples[action] || []).push({ us, ...stats });
+}
+
+function click(action, onclick) {
+  const target = [...documentRoot.descendants()].find(
+    (el) => el.getAttribute('onclick') === onclick && !el.hidden && el.isConnected
+  );
+  if (!target) throw new Error(`nothing to click for ${onclick}`);
+  measure(action, () => vm.runInContext(target.getAttribute('onclick'), context));
+}
+
+// Each round plays the quiz on a fresh page; later rounds run with warm JIT
+for (let round = 0; round < rounds; round++) {
+  body.innerHTML = bodyHtml;
+  context = vm.createContext({ document, renderMathInElement, console });
+  measure('load', () => vm.runInContext(code, context));
+  const total = vm.runInContext('totalQuestions', context);
+  for (let i = 0; i < total; i++) {
+    const question = vm.runInContext(`questions[${i}]`, context);
+    if (question.hint) {
+      click('open hint', 'toggleHint()');
+    }
+    const pick = (question.correctIndex + (i % 2)) % question.options.length;
+    click('answer', `selectAnswer(${pick})`);
+    click(i < total - 1 ? 'next' : 'finish', i < total - 1 ? 'nextQuestion()' : 'finishQuiz()');
+  }
+  click('review', 'reviewQuiz()');
+  for (let i = 1; i < total; i++) click('review next', 'nextQuestion()');
+  for (let i = 1; i < Math.min(total, 6); i++) click('previous', 'previousQuestion()');
+}
+console.log(JSON.stringify(samples));
+"""
+
+ACTIONS = ["load", "open hint", "answer", "next", "finish", "review", "review next", "previous"]
+
+
+def load_quiz_module(tmp: Path, revision: Optional[str]):
+    path = REPO_ROOT / QUIZ_MAIN
+    if revision:
+        path = tmp / f"quiz-{revision.replace('/', '_')}.py"
+        path.write_text(subprocess.run(
+            ["git", "show", f"{revision}:{QUIZ_MAIN.as_posix()}"],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout, encoding="utf-8")
+    spec = importlib.util.spec_from_file_location("quiz_main", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_questions(count: int) -> list[dict]:
+    return [
+        {
+            "question": f"Question {i}: what is $x^{{{i % 9 + 2}}}$ when $x = 2$?",
+            "options": [f"$2^{{{i % 9 + 2 + offset}}}$" for offset in range(4)],
+            "correctIndex": i % 4,
+            "hint": f"Multiply $2$ by itself ${i % 9 + 2}$ times",
+            "correctExplanation": f"$2^{{{i % 9 + 2}}} = {2 ** (i % 9 + 2)}$",
+            "wrongExplanation": f"Count the factors: $2 \\cdot 2 \\cdots$ gives $2^{{{i % 9 + 2}}}$"
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DOM work per quiz interaction")
+    parser.add_argument("--questions", type=int, default=40, help="Questions in the synthetic quiz (default: 40)")
+    parser.add_argument("--rounds", type=int, default=5, help="Times the quiz is played through (default: 5)")
+    parser.add_argument("--baseline", help="Also measure the quiz script at this git revision")
+    args = parser.parse_args()
+
+    node = shutil.which("node")
+    if not node:
+        sys.exit("node is required to run the interaction benchmark")
+
+    quiz_data = {"title": "Benchmark", "questions": make_questions(args.questions)}
+    katex_assets = {"styles": "", "scripts": "", "fonts_dir": None}
+    with tempfile.TemporaryDirectory() as tmp:
+        harness = Path(tmp) / "harness.js"
+        harness.write_text(NODE_HARNESS, encoding="utf-8")
+        versions = [(args.baseline, args.baseline)] if args.baseline else []
+        versions.append(("current", None))
+
+        print(f"{args.questions} questions, {args.rounds} rounds; per interaction: median time, then means")
+        print(f"{'version':<10} {'action':<12} {'n':>4} {'median µs':>10} {'created':>8} "
+              f"{'inserted':>9} {'removed':>8} {'attrs':>6} {'HTML KB':>8} {'formulas':>9}")
+        for label, revision in versions:
+            quiz = load_quiz_module(Path(tmp), revision)
+            page = Path(tmp) / f"quiz-{label.replace('/', '_')}.html"
+            page.write_text(quiz.generate_html(quiz_data, katex_assets), encoding="utf-8")
+            samples = json.loads(subprocess.run(
+                [node, str(harness), str(page), str(args.rounds)], capture_output=True, text=True, check=True
+            ).stdout)
+            for action in ACTIONS:
+                runs = samples.get(action)
+                if not runs:
+                    continue
+
+                def mean(field: str) -> float:
+                    return sum(run[field] for run in runs) / len(runs)
+
+                print(f"{label:<10} {action:<12} {len(runs):>4} {statistics.median(run['us'] for run in runs):>10.1f} "
+                      f"{mean('created'):>8.0f} {mean('inserted'):>9.0f} {mean('removed'):>8.0f} "
+                      f"{mean('changed'):>6.1f} {mean('parsed') / 1024:>8.2f} {mean('formulas'):>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Measure how long a generated quiz page takes to make its first question available.
+
+Builds a synthetic question bank, renders it with several --chunk-size values and
+times (in Node, with a minimal DOM stub) the page's question script up to the
+first question access, which is what blocks the quiz from becoming interactive.
+
+    python scripts/bench_quiz_load.py --questions 5000 --chunk-sizes 0 50 200
+"""
+
+import argparse
+import importlib.util
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+
+QUIZ_MAIN = Path(__file__).resolve().parent.parent / "skills" / "quiz" / "main.py"
+
+NODE_HARNESS = r"""
+const fs = require('fs');
+const vm = require('vm');
+const html = fs.readFileSync(process.argv[2], 'utf8');
+const code = fs.readFileSync(process.argv[3], 'utf8');
+const blocks = {};
+for (const m of html.matchAll(/<script type="application\/json" id="([^"]+)">([\s\S]*?)<\/script>/g)) {
+  blocks[m[1]] = m[2];
+}
+globalThis.document = { getElementById: (id) => ({ textContent: blocks[id] }) };
+const start = process.hrtime.bigint();
+vm.runInThisContext(code + '\nquestions[0].question;');
+console.log(Number(process.hrtime.bigint() - start) / 1e6);
+"""
+
+
+def load_quiz_module():
+    spec = importlib.util.spec_from_file_location("quiz_main", QUIZ_MAIN)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_questions(count: int) -> list[dict]:
+    return [
+        {
+            "question": f"Question {i}: which option describes concept {i} best?",
+            "options": [f"Option {i}-{choice} with some explanatory text" for choice in "ABCD"],
+            "correctIndex": i % 4,
+            "hint": f"Think about concept {i}",
+            "correctExplanation": f"Option {'ABCD'[i % 4]} is right because of reason {i}.",
+            "wrongExplanation": f"The answer is option {'ABCD'[i % 4]}."
+        }
+        for i in range(count)
+    ]
+
+
+def question_script(html: str, chunk_size: int) -> str:
+    start = html.index("        const questions = ")
+    if chunk_size:
+        end = html.index(");", html.index("})(", start)) + 2
+    else:
+        end = html.index("\n", start)
+    return html[start:end]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark quiz page question hydration")
+    parser.add_argument("--questions", type=int, default=5000, help="Questions in the synthetic bank")
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[0, 50, 200], help="Chunk sizes to compare")
+    parser.add_argument("--runs", type=int, default=5, help="Node runs per chunk size (median is reported)")
+    args = parser.parse_args()
+
+    node = shutil.which("node")
+    if not node:
+        sys.exit("node is required to run the page-load benchmark")
+
+    quiz = load_quiz_module()
+    quiz_data = {"title": "Benchmark", "questions": make_questions(args.questions)}
+    katex_assets = {"styles": "", "scripts": "", "fonts_dir": None}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        harness = Path(tmp) / "harness.js"
+        harness.write_text(NODE_HARNESS, encoding="utf-8")
+        print(f"{args.questions} questions, median of {args.runs} runs")
+        print(f"{'chunk size':>10}  {'page KB':>8}  {'first question ms':>18}")
+        for chunk_size in args.chunk_sizes:
+            html = quiz.generate_html(quiz_data, katex_assets, chunk_size=chunk_size)
+            page = Path(tmp) / f"quiz-{chunk_size}.html"
+            code = Path(tmp) / f"questions-{chunk_size}.js"
+            page.write_text(html, encoding="utf-8")
+            code.write_text(question_script(html, chunk_size), encoding="utf-8")
+            timings = [
+                float(subprocess.run(
+                    [node, str(harness), str(page), str(code)],
+                    capture_output=True, text=True, check=True
+                ).stdout)
+                for _ in range(args.runs)
+            ]
+            label = chunk_size or "inline"
+            print(f"{label:>10}  {len(html.encode('utf-8')) / 1024:>8.0f}  {statistics.median(timings):>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""Compare render latency of the HTTP render server with forking `python main.py`.
+
+Starts scripts/serve.py on a free port (or uses --url), then for the quiz,
+flashcards and mindmap skills reports median/p95 latency of one-shot CLI runs
+and of sequential server requests, plus server throughput with --clients
+concurrent connections.
+
+    python scripts/bench_render_server.py --requests 200 --cli-runs 5 --clients 4
+"""
+
+import argparse
+import http.client
+import json
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+QUIZ = {
+    "title": "Benchmark Quiz",
+    "questions": [
+        {
+            "question": f"Question {i}: what is $x^{i}$ when $x = 1$?",
+            "options": ["0", "1", f"{i}", "undefined"],
+            "correctIndex": 1,
+            "hint": "Any power of one",
+            "correctExplanation": "One to any power is one.",
+            "wrongExplanation": "One to any power is one."
+        }
+        for i in range(20)
+    ]
+}
+FLASHCARDS = {
+    "title": "Benchmark Cards",
+    "flashcards": [{"question": f"Term {i}", "answer": f"Definition of term {i}"} for i in range(30)]
+}
+MINDMAP = "# Benchmark\n\n" + "".join(
+    f"## Topic {i}\n\n- Point {i}.1\n- Point {i}.2\n  - Detail {i}.2.1\n\n" for i in range(10)
+)
+
+CASES = [
+    ("quiz", "/quiz", json.dumps(QUIZ), "quiz.json"),
+    ("flashcards", "/flashcards", json.dumps(FLASHCARDS), "flashcards.json"),
+    ("mindmap", "/mindmap", MINDMAP, "mindmap.md"),
+]
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_server(host: str, port: int, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection(host, port, timeout=1)
+            connection.request("GET", "/health")
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.1)
+    sys.exit("render server did not come up")
+
+
+def post(connection: http.client.HTTPConnection, path: str, body: bytes) -> float:
+    start = time.perf_counter()
+    connection.request("POST", path, body=body)
+    response = connection.getresponse()
+    response.read()
+    if response.status != 200:
+        raise RuntimeError(f"{path} returned {response.status}")
+    return time.perf_counter() - start
+
+
+def cli_latencies(skill: str, source: str, filename: str, runs: int) -> list[float]:
+    timings = []
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = Path(tmp) / filename
+        input_path.write_text(source, encoding="utf-8")
+        for run in range(runs):
+            output_path = Path(tmp) / f"out-{run}.html"
+            start = time.perf_counter()
+            subprocess.run(
+                [sys.executable, str(REPO_ROOT / "skills" / skill / "main.py"),
+                 "-i", str(input_path), "-o", str(output_path)],
+                capture_output=True, check=True
+            )
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def throughput(host: str, port: int, path: str, body: bytes, clients: int, requests: int) -> float:
+    per_client = max(1, requests // clients)
+
+    def client():
+        connection = http.client.HTTPConnection(host, port, timeout=60)
+        for _ in range(per_client):
+            post(connection, path, body)
+        connection.close()
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return per_client * clients / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the render server against per-request CLI runs")
+    parser.add_argument("--url", help="Use an already running server instead of starting one")
+    parser.add_argument("--requests", type=int, default=200, help="Server requests per skill (default: 200)")
+    parser.add_argument("--cli-runs", type=int, default=5, help="CLI runs per skill (default: 5, 0 to skip)")
+    parser.add_argument("--clients", type=int, default=4, help="Concurrent connections for throughput (default: 4)")
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        host, port = "127.0.0.1", free_port()
+        server = subprocess.Popen(
+            [sys.executable, str(REPO_ROOT / "scripts" / "serve.py"), "--port", str(port), "--log-level", "WARNING"]
+        )
+    try:
+        wait_for_server(host, port)
+        print(f"{'skill':<11} {'mode':<7} {'median ms':>10} {'p95 ms':>8} {'req/s':>8}")
+        for skill, path, source, filename in CASES:
+            body = source.encode("utf-8")
+            if args.cli_runs:
+                timings = cli_latencies(skill, source, filename, args.cli_runs)
+                print(f"{skill:<11} {'cli':<7} {statistics.median(timings) * 1000:>10.1f} "
+                      f"{percentile(timings, 0.95) * 1000:>8.1f} {len(timings) / sum(timings):>8.1f}")
+
+            connection = http.client.HTTPConnection(host, port, timeout=60)
+            post(connection, path, body)
+            timings = [post(connection, path, body) for _ in range(args.requests)]
+            connection.close()
+            rate = throughput(host, port, path, body, args.clients, args.requests)
+            print(f"{skill:<11} {'server':<7} {statistics.median(timings) * 1000:>10.1f} "
+                  f"{percentile(timings, 0.95) * 1000:>8.1f} {rate:>8.1f}")
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
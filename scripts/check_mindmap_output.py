@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Check that mind map pages are byte-identical to the file-based post-processing they replaced.
+
+The mindmap converter used to write the rendered page to disk, then re-read and
+re-write it for every post-processing step (control panel injection, KaTeX font
+URLs for --fonts-root). It now does those steps in memory and writes the page
+once. This script builds each case below with convert_markdown_to_mindmap() and
+with a re-implementation of the old file round trips (previous_post_processing),
+and exits with status 1 if any page differs:
+
+- in-process render, LF and CRLF input
+- markmap-cli render (math falls back to it), LF and CRLF input
+- --fonts-root, which rewrites the KaTeX font URLs of a CLI page
+- a literal </body> in the outline text
+- --renderer auto on an indented paragraph after a list item, which must fall
+  back to markmap-cli
+
+It also checks that outlines the in-process renderer would misread (see
+FALLBACK_OUTLINES) are handed to markmap-cli instead. The CLI cases use the local markmap-cli (see get_markmap_command) and are
+skipped with a note when none is installed.
+
+    python scripts/check_mindmap_output.py
+"""
+
+import argparse
+import filecmp
+import importlib.util
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+
+MINDMAP_MAIN = Path(__file__).resolve().parent.parent / "skills" / "mindmap" / "main.py"
+
+OUTLINE = "# Biology\n\n## Cells\n- Membrane\n  - Lipid bilayer\n- Nucleus\n\n## Energy\n- ATP\n- Glycolysis\n"
+MATH_OUTLINE = "# Physics\n\n## Mechanics\n- Force $F = ma$\n- Energy $E = mc^2$\n\n## Waves\n- $v = f\\lambda$\n"
+BODY_OUTLINE = "# Markup\n\n## Tags\n- `</body>` closes the page\n"
+# Raw inline HTML is left to markmap-cli
+RAW_BODY_OUTLINE = BODY_OUTLINE + "- Text with </body> in it\n"
+# The indented paragraph belongs to the list item in Markdown
+CONTINUED_OUTLINE = "# T\n\n- item\n\n  continued para\n"
+
+# Outlines whose Markdown tree the in-process renderer cannot reproduce
+FALLBACK_OUTLINES = [
+    CONTINUED_OUTLINE,
+    "# T\n\n- item\n\n continued with one space\n",
+    "# T\n\n- item\nlazy continuation\n",
+    "# T\n\nfirst line\nsecond line\n",
+    "# T\n\n    indented code\n",
+    "# T\n\n- item\n\n\tcontinued after a tab\n",
+]
+
+# (name, outline, renderer, line ending, use --fonts-root)
+CASES = [
+    ("in-process", OUTLINE, "python", "\n", False),
+    ("in-process CRLF", OUTLINE, "python", "\r\n", False),
+    ("in-process </body>", BODY_OUTLINE, "python", "\n", False),
+    ("cli", MATH_OUTLINE, "cli", "\n", False),
+    ("cli CRLF", MATH_OUTLINE, "cli", "\r\n", False),
+    ("cli </body>", RAW_BODY_OUTLINE, "cli", "\n", False),
+    ("cli --fonts-root", MATH_OUTLINE, "cli", "\n", True),
+    ("auto list continuation", CONTINUED_OUTLINE, "auto", "\n", False),
+]
+
+
+def load_mindmap_module():
+    spec = importlib.util.spec_from_file_location("mindmap_main", MINDMAP_MAIN)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def cli_available(mindmap) -> bool:
+    return bool(shutil.which("markmap") or mindmap.find_markmap_cli())
+
+
+def previous_post_processing(mindmap, output_path: str, fonts_root: Optional[str]) -> None:
+    """The steps as they ran before pages were post-processed in memory: each one
+    re-reads the output file and writes it back."""
+    with open(output_path, 'r', encoding='utf-8') as f:
+        html_content = f.read()
+    html_content = mindmap.inject_custom_features(html_content)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(html_content)
+
+    with open(output_path, 'r', encoding='utf-8') as f:
+        html_content = f.read()
+    if 'katex' not in html_content or 'fonts/KaTeX_' not in html_content:
+        return
+    if not mindmap.NPM_CACHE.exists() or not mindmap.find_markmap_katex_fonts():
+        return
+    output_dir = Path(output_path).resolve().parent
+    base_dir = Path(fonts_root).resolve() if fonts_root else output_dir
+    prefix = Path(os.path.relpath(base_dir, output_dir)).as_posix()
+    if prefix != '.':
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(html_content.replace('url(fonts/', f'url({prefix}/fonts/'))
+
+
+def previous_page(mindmap, markdown_path: str, output_path: str, renderer: str, fonts_root: Optional[str]) -> None:
+    """Build a page the old way: render to output_path, then post-process the file."""
+    with open(markdown_path, 'r', encoding='utf-8') as f:
+        markdown_content = f.read()
+    initial_depth = mindmap.DEFAULT_INITIAL_DEPTH
+    if renderer == "python":
+        html_content = mindmap.render_markdown_in_process(markdown_content, True, initial_depth)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(html_content)
+    else:
+        cmd = [*mindmap.get_markmap_command(), '--offline', markdown_path, '-o', output_path]
+        subprocess.run(cmd, capture_output=True, text=True, timeout=mindmap.MARKMAP_TIMEOUT, check=True)
+        # Fold state is set on the CLI's page before post-processing, as the converter does
+        with open(output_path, 'r', encoding='utf-8') as f:
+            html_content = mindmap.fold_markmap_page(f.read(), initial_depth)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(html_content)
+    previous_post_processing(mindmap, output_path, fonts_root)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check mind map pages against the file-based post-processing")
+    parser.parse_args()
+
+    mindmap = load_mindmap_module()
+    mindmap.logger.remove()
+    has_cli = cli_available(mindmap)
+
+    failures, checked = [], 0
+    for outline in FALLBACK_OUTLINES:
+        checked += 1
+        if mindmap.render_markdown_in_process(outline) is None:
+            print(f"OK    falls back: {outline!r}")
+        else:
+            failures.append(outline)
+            print(f"DIFF  rendered in-process instead of by markmap-cli: {outline!r}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for number, (name, outline, renderer, newline, use_fonts_root) in enumerate(CASES):
+            if renderer != "python" and not has_cli:
+                print(f"SKIP  {name} (markmap-cli not installed)")
+                continue
+            case_dir = Path(tmp) / f"case{number}"
+            (case_dir / "current").mkdir(parents=True)
+            (case_dir / "previous").mkdir()
+            markdown_path = case_dir / "input.md"
+            markdown_path.write_bytes(outline.replace("\n", newline).encode("utf-8"))
+            fonts_root = str(case_dir) if use_fonts_root else None
+
+            current = case_dir / "current" / "map.html"
+            mindmap.convert_markdown_to_mindmap(
+                str(markdown_path), str(current), renderer=renderer, fonts_root=fonts_root, force=True
+            )
+            previous = case_dir / "previous" / "map.html"
+            previous_page(mindmap, str(markdown_path), str(previous), renderer, fonts_root)
+
+            checked += 1
+            if filecmp.cmp(current, previous, shallow=False):
+                print(f"OK    {name} ({current.stat().st_size / 1024:.1f} KB)")
+            else:
+                failures.append(name)
+                print(f"DIFF  {name}: {current.stat().st_size} bytes now, {previous.stat().st_size} before")
+
+    print(f"{checked - len(failures)}/{checked} checks passed")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
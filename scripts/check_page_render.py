@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Check that quiz and flashcard pages render deck titles the way the old templates did.
+
+The page templates used to be an f-string (quiz) and str.format (flashcards),
+which put any JSON title into the page as str(title). Pages are now filled from
+precompiled UTF-8 fragments (fill_page). This script renders decks whose title
+is a number, a float or a boolean, and the same decks with str(title), through
+render_quiz_html() / render_flashcards_html() and the file converters. It exits
+with status 1 if a page fails to render or differs from its string-titled twin.
+
+    python scripts/check_page_render.py
+"""
+
+import argparse
+import importlib.util
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+
+SKILLS_DIR = Path(__file__).resolve().parent.parent / "skills"
+
+TITLES = [2024, 1.5, True, "Plain title"]
+QUESTIONS = [{"question": "What is $x^2$ at $x = 2$?", "options": ["2", "4"], "correctIndex": 1}]
+CARDS = [{"question": "Term", "answer": "• one\n• two"}]
+
+
+def load_skill(name: str):
+    spec = importlib.util.spec_from_file_location(f"{name}_main", SKILLS_DIR / name / "main.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def converted(convert, data: dict, path: Path) -> bytes:
+    source = path.with_suffix(".json")
+    source.write_text(json.dumps(data), encoding="utf-8")
+    convert(str(source), str(path), force=True)
+    return path.read_bytes()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check quiz/flashcard pages for non-string deck titles")
+    parser.parse_args()
+
+    quiz = load_skill("quiz")
+    flashcards = load_skill("flashcards")
+    quiz.logger.remove()
+    quiz_katex = quiz.get_katex_assets()
+    flashcards_katex = flashcards.get_katex_assets()
+
+    renders = {
+        "quiz render": lambda title, tmp: quiz.render_quiz_html(
+            {"title": title, "questions": QUESTIONS}, quiz_katex
+        ),
+        "quiz file": lambda title, tmp: converted(
+            quiz.convert_quiz, {"title": title, "questions": QUESTIONS}, tmp / "quiz.html"
+        ),
+        "flashcards render": lambda title, tmp: flashcards.render_flashcards_html(CARDS, title, flashcards_katex),
+        "flashcards file": lambda title, tmp: converted(
+            flashcards.convert_json_to_flashcards, {"title": title, "flashcards": CARDS}, tmp / "cards.html"
+        ),
+    }
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, render in renders.items():
+            for title in TITLES:
+                case = f"{name} title={title!r}"
+                try:
+                    page = render(title, Path(tmp))
+                    expected = render(str(title), Path(tmp))
+                except Exception as e:
+                    failures += 1
+                    print(f"FAIL  {case}: {type(e).__name__}: {e}")
+                    continue
+                if page != expected:
+                    failures += 1
+                    print(f"DIFF  {case}: differs from title={str(title)!r}")
+                elif f"<title>{title}</title>".encode("utf-8") not in page:
+                    failures += 1
+                    print(f"DIFF  {case}: <title> is not str(title)")
+                else:
+                    print(f"OK    {case}")
+
+    total = len(renders) * len(TITLES)
+    print(f"{total - failures}/{total} pages render as before")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
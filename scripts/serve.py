@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""Long-running HTTP render service for the quiz, flashcards and mindmap skills.
+
+Forking `python main.py` per render pays for interpreter start-up, imports and
+KaTeX/markmap asset discovery every time. This server loads the three converters
+once, keeps their assets (and a markmap-cli worker) warm and renders in memory:
+
+    POST /quiz          quiz JSON (array or {title, questions})  -> HTML   [?chunk_size=N]
+    POST /flashcards    flashcard JSON (array or {title, flashcards}) -> HTML
+    POST /mindmap       Markdown -> HTML           [?renderer=auto|python|cli&initial_depth=N]
+    GET  /fonts/<name>  KaTeX fonts the pages reference as fonts/<name>
+    GET  /health        status and counters as JSON
+
+    python scripts/serve.py --port 8765 --concurrency 4 --timeout 30
+
+Renders run on a pool of --concurrency threads. Requests beyond --max-pending
+(queued plus running) get 503, and a render that has not finished after
+--timeout seconds gets 504. A timed-out render still holds its thread, and
+counts as pending until it returns. Invalid input gets 400 with a JSON error
+message.
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import signal
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from pathlib import Path
+from typing import Callable
+from urllib.parse import parse_qs, urlsplit
+
+from loguru import logger
+
+
+SKILLS_DIR = Path(__file__).resolve().parent.parent / "skills"
+MAX_BODY_BYTES = 32 << 20
+IDLE_TIMEOUT = 15
+FONT_TYPES = {".woff2": "font/woff2", ".woff": "font/woff", ".ttf": "font/ttf"}
+
+
+def load_skill(name: str):
+    """Import skills/<name>/main.py under a private module name."""
+    spec = importlib.util.spec_from_file_location(f"{name.replace('-', '_')}_main", SKILLS_DIR / name / "main.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class RenderError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class Renderers:
+    """The three converters with their assets resolved once for the process."""
+
+    def __init__(self, fonts_base: str = "fonts", markmap_worker: bool = True, log_level: str = "INFO"):
+        self.quiz = load_skill("quiz")
+        self.flashcards = load_skill("flashcards")
+        self.mindmap = load_skill("mindmap")
+        # Each skill resets loguru to INFO on import, so configure it afterwards
+        logger.remove()
+        logger.add(sys.stderr, level=log_level)
+        self.fonts_base = fonts_base.rstrip("/")
+
+        self.quiz_katex = self._with_fonts_base(self.quiz.get_katex_assets())
+        self.flashcards_katex = self._with_fonts_base(self.flashcards.get_katex_assets())
+        self.mindmap.find_markmap_assets()
+        self.markmap_worker = self.mindmap.MarkmapWorker.create() if markmap_worker else None
+        # One Node worker serves one request at a time
+        self._markmap_lock = threading.Lock()
+
+        self.fonts = {}
+        font_dirs = [self.quiz_katex["fonts_dir"], self.mindmap.find_markmap_katex_fonts()]
+        for fonts_dir in font_dirs:
+            if fonts_dir and Path(fonts_dir).is_dir():
+                for font in sorted(Path(fonts_dir).iterdir()):
+                    if font.suffix in FONT_TYPES and font.name not in self.fonts:
+                        self.fonts[font.name] = font.read_bytes()
+        logger.info(
+            f"✓ Renderers ready (KaTeX: {'local' if self.quiz_katex['fonts_dir'] else 'CDN'}, "
+            f"markmap worker: {'yes' if self.markmap_worker else 'no'}, {len(self.fonts)} fonts)"
+        )
+
+    def _with_fonts_base(self, katex_assets: dict) -> dict:
+        if self.fonts_base == "fonts":
+            return katex_assets
+        return {**katex_assets, "styles": katex_assets["styles"].replace("url(fonts/", f"url({self.fonts_base}/")}
+
+    def quiz_html(self, body: bytes, params: dict) -> bytes:
+        data = json.loads(body)
+        if isinstance(data, list):
+            data = {"title": "Quiz", "questions": data}
+        if not isinstance(data, dict) or not isinstance(data.get("questions"), list):
+            raise ValueError("Expected a question array or {title, questions: []}")
+        for number, question in enumerate(data["questions"], 1):
+            self.quiz.validate_question(question, number)
+        chunk_size = params.get("chunk_size", "0")
+        if not chunk_size.isdigit():
+            raise ValueError("chunk_size must be 0 or a positive number")
+        return self.quiz.render_quiz_html(data, self.quiz_katex, chunk_size=int(chunk_size))
+
+    def flashcards_html(self, body: bytes, params: dict) -> bytes:
+        data = json.loads(body)
+        if isinstance(data, list):
+            cards, title = data, "Flashcards"
+        elif isinstance(data, dict) and isinstance(data.get("flashcards"), list):
+            cards, title = data["flashcards"], data.get("title", "Flashcards")
+        else:
+            raise ValueError("Invalid JSON format. Expected array or {flashcards: [], title: ''}")
+        if not cards:
+            raise ValueError("No flashcards found in JSON")
+        for number, card in enumerate(cards, 1):
+            self.flashcards.validate_card(card, number)
+        return self.flashcards.render_flashcards_html(cards, title, self.flashcards_katex)
+
+    def mindmap_html(self, body: bytes, params: dict) -> bytes:
+        markdown = body.decode("utf-8")
+        if not markdown.strip():
+            raise ValueError("Markdown is empty")
+        renderer = params.get("renderer", "auto")
+        if renderer not in self.mindmap.RENDERERS:
+            raise ValueError(f"renderer must be one of {', '.join(self.mindmap.RENDERERS)}")
+        initial_depth = params.get("initial_depth", str(self.mindmap.DEFAULT_INITIAL_DEPTH))
+        if not (initial_depth.isdigit() or initial_depth == "-1"):
+            raise ValueError("initial_depth must be -1 (fully expanded) or a number of levels")
+        initial_depth = int(initial_depth)
+
+        html = None
+        if renderer != "cli":
+            html = self.mindmap.render_markdown_in_process(markdown, renderer == "python", initial_depth)
+        if html is None:
+            with tempfile.TemporaryDirectory(prefix="mindmap-") as tmp:
+                markdown_path = Path(tmp) / "mindmap.md"
+                markdown_path.write_text(markdown, encoding="utf-8")
+                output_path = str(Path(tmp) / "mindmap.html")
+                if self.markmap_worker:
+                    with self._markmap_lock:
+                        html = self.mindmap.render_markdown_with_cli(
+                            str(markdown_path), markdown, output_path, self.markmap_worker
+                        )
+                else:
+                    html = self.mindmap.render_markdown_with_cli(str(markdown_path), markdown, output_path)
+            html = self.mindmap.fold_markmap_page(html, initial_depth)
+
+        html = self.mindmap.inject_custom_features(html)
+        if self.fonts_base != "fonts":
+            html = html.replace("url(fonts/", f"url({self.fonts_base}/")
+        return html.encode("utf-8")
+
+    def close(self) -> None:
+        if self.markmap_worker:
+            self.markmap_worker.close()
+
+
+class RenderServer:
+    """Minimal HTTP/1.1 server (Content-Length bodies, keep-alive) in front of Renderers."""
+
+    def __init__(self, renderers: Renderers, concurrency: int, max_pending: int, timeout: float):
+        self.renderers = renderers
+        self.timeout = timeout
+        self.max_pending = max_pending
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="render")
+        self.routes: dict[str, Callable[[bytes, dict], bytes]] = {
+            "/quiz": renderers.quiz_html,
+            "/flashcards": renderers.flashcards_html,
+            "/mindmap": renderers.mindmap_html,
+        }
+        self.pending = 0
+        self.started = time.monotonic()
+        self.counters = {"rendered": 0, "rejected": 0, "failed": 0, "timed_out": 0}
+
+    async def render(self, path: str, body: bytes, params: dict) -> bytes:
+        if self.pending >= self.max_pending:
+            self.counters["rejected"] += 1
+            raise RenderError(HTTPStatus.SERVICE_UNAVAILABLE, "Too many pending renders")
+        self.pending += 1
+        future = asyncio.get_running_loop().run_in_executor(self.executor, self.routes[path], body, params)
+        # A render that times out keeps its pool thread until it returns, so it
+        # stays pending until then rather than until the 504 is sent
+        future.add_done_callback(self._render_done)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.counters["timed_out"] += 1
+            raise RenderError(HTTPStatus.GATEWAY_TIMEOUT, f"Render exceeded {self.timeout:g}s")
+        except ValueError as e:
+            self.counters["failed"] += 1
+            raise RenderError(HTTPStatus.BAD_REQUEST, str(e))
+        except Exception as e:
+            self.counters["failed"] += 1
+            logger.exception(f"✗ {path} render failed")
+            raise RenderError(HTTPStatus.INTERNAL_SERVER_ERROR, f"{type(e).__name__}: {e}")
+
+    def _render_done(self, future: asyncio.Future) -> None:
+        self.pending -= 1
+        if not future.cancelled():
+            # Retrieve the result of an abandoned render so asyncio does not log it as unhandled
+            future.exception()
+
+    async def respond(self, method: str, target: str, body: bytes) -> tuple[HTTPStatus, str, bytes, dict]:
+        url = urlsplit(target)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        if url.path in self.routes:
+            if method != "POST":
+                raise RenderError(HTTPStatus.METHOD_NOT_ALLOWED, "Use POST")
+            html = await self.render(url.path, body, params)
+            self.counters["rendered"] += 1
+            return HTTPStatus.OK, "text/html; charset=utf-8", html, {}
+
+        if method != "GET":
+            raise RenderError(HTTPStatus.METHOD_NOT_ALLOWED, "Use GET")
+        if url.path == "/health":
+            status = {
+                "status": "ok",
+                "uptime": round(time.monotonic() - self.started, 1),
+                "pending": self.pending,
+                "markmap_worker": bool(self.renderers.markmap_worker),
+                **self.counters
+            }
+            return HTTPStatus.OK, "application/json", json.dumps(status).encode("utf-8"), {}
+        if url.path.startswith("/fonts/"):
+            name = url.path[len("/fonts/"):]
+            if name in self.renderers.fonts:
+                headers = {"Cache-Control": "public, max-age=31536000, immutable"}
+                return HTTPStatus.OK, FONT_TYPES[Path(name).suffix], self.renderers.fonts[name], headers
+        raise RenderError(HTTPStatus.NOT_FOUND, f"No such resource: {url.path}")
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+
+                started = time.perf_counter()
+                extra_headers = {}
+                try:
+                    if "transfer-encoding" in headers:
+                        keep_alive = False
+                        raise RenderError(HTTPStatus.LENGTH_REQUIRED, "Send the body with Content-Length")
+                    length = int(headers.get("content-length", 0))
+                    if length > MAX_BODY_BYTES:
+                        keep_alive = False
+                        raise RenderError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Body exceeds {MAX_BODY_BYTES} bytes")
+                    body = await asyncio.wait_for(reader.readexactly(length), IDLE_TIMEOUT) if length else b""
+                    status, content_type, payload, extra_headers = await self.respond(method, target, body)
+                except RenderError as e:
+                    status, content_type = e.status, "application/json"
+                    payload = json.dumps({"error": str(e)}).encode("utf-8")
+
+                head = [
+                    f"HTTP/1.1 {status.value} {status.phrase}",
+                    f"Content-Type: {content_type}",
+                    f"Content-Length: {len(payload)}",
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}",
+                    *(f"{name}: {value}" for name, value in extra_headers.items())
+                ]
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + payload)
+                await writer.drain()
+                logger.info(
+                    f"{method} {target} → {status.value} "
+                    f"({len(payload) / 1024:.1f} KB, {(time.perf_counter() - started) * 1000:.1f} ms)"
+                )
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.renderers.close()
+
+
+async def serve(args: argparse.Namespace) -> None:
+    renderers = Renderers(args.fonts_base, not args.no_markmap_worker, args.log_level.upper())
+    server = RenderServer(renderers, args.concurrency, args.max_pending, args.timeout)
+    listener = await asyncio.start_server(server.handle_connection, args.host, args.port)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    address = listener.sockets[0].getsockname()
+    logger.success(f"Render server listening on http://{address[0]}:{address[1]} ({args.concurrency} render threads)")
+    try:
+        async with listener:
+            await stop.wait()
+    finally:
+        server.close()
+        logger.info("Render server stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve quiz, flashcard and mind map rendering over HTTP")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on (default: 8765)")
+    parser.add_argument("--concurrency", type=int, default=os.cpu_count() or 1,
+                        help="Renders running at once (default: CPU count)")
+    parser.add_argument("--max-pending", type=int, default=None,
+                        help="Queued plus running renders before requests get 503 (default: 8 x concurrency)")
+    parser.add_argument("--timeout", type=float, default=30, help="Seconds before a render gets 504 (default: 30)")
+    parser.add_argument("--fonts-base", default="fonts",
+                        help="URL prefix pages use for KaTeX fonts, e.g. http://host:8765/fonts (default: fonts)")
+    parser.add_argument("--no-markmap-worker", action="store_true",
+                        help="Spawn markmap-cli per render instead of keeping a Node worker")
+    parser.add_argument("--log-level", default="INFO", help="loguru level (default: INFO)")
+    args = parser.parse_args()
+
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    args.max_pending = args.max_pending or 8 * args.concurrency
+
+    asyncio.run(serve(args))
+
+
+if __name__ == "__main__":
+    main()
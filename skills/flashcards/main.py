@@ -5,37 +5,154 @@ Pure frontend - AI generates JSON, this converts to interactive UI
 
 import argparse
 import base64
+import csv
+import gzip
+import hashlib
 import json
 import os
+import re
 import sys
 import shutil
+import sqlite3
+import subprocess
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, Optional, TextIO, Union
 from loguru import logger
 
 logger.remove()
 logger.add(sys.stderr, level="INFO")
 
 
-def find_katex_dist() -> Optional[Path]:
-    npm_cache = Path.home() / '.npm' / '_npx'
-    candidates = []
+CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')) / 'open-exam-skills'
+ASSET_INDEX_PATH = CACHE_DIR / 'asset-index.json'
+FONT_STORE_DIR = CACHE_DIR / 'fonts'
+FONT_MODES = ('link', 'symlink', 'copy')
+ASSET_MODES = ('inline', 'shared')
+BUILD_MANIFEST_NAME = '.build-manifest.json'
+MATH_CACHE_PATH = CACHE_DIR / 'katex-render-cache.sqlite3'
+MATH_CACHE_MAX_BYTES = 64 << 20
+SRS_NEW_PER_DAY = 20
+BACKGROUND_STORE_DIR = CACHE_DIR / 'backgrounds'
+BACKGROUND_FORMATS = ('png', 'webp', 'avif')
+CARD_BACKGROUNDS = {'black': 'Confetti_black.png', 'white': 'Confetti_white.png'}
+SRS_EPOCH = date(1970, 1, 1)
+COMPRESSIONS = {'gzip': ('.gz', 9), 'brotli': ('.br', 11)}
+
+_katex_assets_memo: Optional[dict] = None
+_lookup_memo: dict[str, Optional[Path]] = {}
+_font_digests: dict[tuple[str, int, float], str] = {}
+_shared_asset_names: dict[tuple[str, str], str] = {}
+_converter_version: Optional[str] = None
+_compiled_pages: dict[tuple, tuple[list[bytes], list[str]]] = {}
+_card_backgrounds: dict[tuple, Optional[tuple[bytes, str]]] = {}
+_flashcard_styles: dict[tuple, str] = {}
+_katex_worker: Optional['KatexWorker'] = None
+_katex_worker_started = False
+_brotli_missing_warned = False
+
+
+def _mtime(path: Path) -> Optional[float]:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return None
+
+
+def _read_asset_index() -> dict:
+    try:
+        return json.loads(ASSET_INDEX_PATH.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
 
-    if npm_cache.exists():
-        candidates.extend(npm_cache.glob('*/node_modules/katex/dist'))
 
+def _write_asset_index(index: dict) -> None:
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = ASSET_INDEX_PATH.with_name(f"{ASSET_INDEX_PATH.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(index, indent=2), encoding='utf-8')
+        os.replace(tmp_path, ASSET_INDEX_PATH)
+    except OSError as e:
+        logger.debug(f"Asset index not saved: {e}")
+
+
+def _indexed_lookup(
+    key: str,
+    roots: list[Path],
+    resolve: Callable[[], Optional[Path]],
+    refresh: bool = False
+) -> Optional[Path]:
+    """Reuse a previous glob result while its search roots and the result itself are unchanged.
+
+    Installing a new package under ~/.npm/_npx creates a directory there, which bumps the
+    root's mtime, so a stale hit is only possible after in-place edits; use a refresh for those.
+    Results are also memoised per process, so batch jobs do not re-read the index.
+    """
+    if not refresh and key in _lookup_memo:
+        return _lookup_memo[key]
+
+    stamp = {str(root): _mtime(root) for root in roots}
+    index = _read_asset_index()
+    entry = index.get(key)
+    if not refresh and entry and entry.get('roots') == stamp:
+        cached = Path(entry['path']) if entry.get('path') else None
+        if cached is None or _mtime(cached) == entry.get('mtime'):
+            _lookup_memo[key] = cached
+            return cached
+
+    result = resolve()
+    index[key] = {
+        'roots': stamp,
+        'path': str(result) if result else None,
+        'mtime': _mtime(result) if result else None
+    }
+    _write_asset_index(index)
+    _lookup_memo[key] = result
+    return result
+
+
+def find_katex_dist(refresh: bool = False) -> Optional[Path]:
+    npm_cache = Path.home() / '.npm' / '_npx'
     local_node_modules = Path.cwd() / 'node_modules' / 'katex' / 'dist'
-    if local_node_modules.exists():
-        candidates.append(local_node_modules)
 
-    if not candidates:
-        return None
+    def resolve() -> Optional[Path]:
+        candidates = []
 
-    return max(candidates, key=lambda path: path.stat().st_mtime)
+        if npm_cache.exists():
+            candidates.extend(npm_cache.glob('*/node_modules/katex/dist'))
 
+        if local_node_modules.exists():
+            candidates.append(local_node_modules)
 
-def get_katex_assets() -> dict:
-    dist = find_katex_dist()
+        if not candidates:
+            return None
+
+        return max(candidates, key=lambda path: path.stat().st_mtime)
+
+    return _indexed_lookup(
+        f"katex-dist:{Path.cwd()}",
+        [npm_cache, local_node_modules],
+        resolve,
+        refresh
+    )
+
+
+def get_katex_assets(refresh: bool = False) -> dict:
+    """Resolve KaTeX styles/scripts once per process; later calls return the memoised dict."""
+    global _katex_assets_memo
+    if _katex_assets_memo is not None and not refresh:
+        return _katex_assets_memo
+
+    _katex_assets_memo = _load_katex_assets(find_katex_dist(refresh))
+    return _katex_assets_memo
+
+
+def _load_katex_assets(dist: Optional[Path]) -> dict:
     if dist:
         css_path = dist / 'katex.min.css'
         js_path = dist / 'katex.min.js'
@@ -47,7 +164,10 @@ def get_katex_assets() -> dict:
             return {
                 'styles': f"<style>{css}</style>",
                 'scripts': f"<script>{katex_js}</script>\n<script>{auto_render_js}</script>",
-                'fonts_dir': dist / 'fonts'
+                'fonts_dir': dist / 'fonts',
+                'css': css,
+                'js': katex_js,
+                'auto_render_js': auto_render_js
             }
 
     version = '0.16.18'
@@ -64,71 +184,132 @@ def get_katex_assets() -> dict:
     }
 
 
-def ensure_katex_fonts(output_path: str, fonts_dir: Optional[Path]) -> None:
-    if not fonts_dir or not fonts_dir.exists():
-        return
+def refresh_asset_cache() -> dict:
+    """Forget cached KaTeX lookups and resolve the assets again."""
+    assets = get_katex_assets(refresh=True)
+    if assets['fonts_dir']:
+        logger.success(f"KaTeX asset cache refreshed: {assets['fonts_dir'].parent}")
+    else:
+        logger.warning("KaTeX asset cache refreshed: no local KaTeX found, using CDN")
+    return assets
 
-    output_dir = Path(output_path).resolve().parent
-    dest_dir = output_dir / 'fonts'
-    dest_dir.mkdir(parents=True, exist_ok=True)
 
-    for font_file in fonts_dir.glob('*'):
-        if font_file.is_file():
-            shutil.copy2(font_file, dest_dir / font_file.name)
+def _font_digest(font_file: Path) -> str:
+    stat = font_file.stat()
+    key = (str(font_file), stat.st_size, stat.st_mtime)
+    if key not in _font_digests:
+        _font_digests[key] = hashlib.sha256(font_file.read_bytes()).hexdigest()
+    return _font_digests[key]
 
-    logger.info(f"✓ KaTeX fonts copied to: {dest_dir}")
 
+def _store_font(font_file: Path) -> Path:
+    """Place a font in the content-addressed store once and return the stored path."""
+    stored = FONT_STORE_DIR / f"{_font_digest(font_file)}{font_file.suffix}"
+    if not stored.exists():
+        FONT_STORE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = stored.with_name(f"{stored.name}.{os.getpid()}.tmp")
+        shutil.copy2(font_file, tmp_path)
+        os.replace(tmp_path, stored)
+    return stored
 
-def generate_notebooklm_html(
-    flashcards: list,
+
+def _font_is_current(dest: Path, source: Path) -> bool:
+    try:
+        dest_stat = dest.stat()
+    except OSError:
+        return False
+    source_stat = source.stat()
+    if os.path.samestat(dest_stat, source_stat):
+        return True
+    if dest_stat.st_size != source_stat.st_size:
+        return False
+    if dest_stat.st_mtime == source_stat.st_mtime:
+        return True
+    return hashlib.sha256(dest.read_bytes()).hexdigest() == _font_digest(source)
+
+
+def _deploy_font(font_file: Path, dest: Path, mode: str) -> str:
+    """Put one font at dest; returns 'unchanged', 'linked', 'symlinked' or 'copied'."""
+    source = font_file
+    if mode != 'copy':
+        try:
+            source = _store_font(font_file)
+        except OSError as e:
+            logger.debug(f"Font store unavailable, copying instead: {e}")
+            mode = 'copy'
+
+    if _font_is_current(dest, source):
+        return 'unchanged'
+
+    tmp_path = dest.with_name(f".{dest.name}.{os.getpid()}.tmp")
+    tmp_path.unlink(missing_ok=True)
+    result = 'copied'
+    try:
+        if mode == 'link':
+            os.link(source, tmp_path)
+            result = 'linked'
+        elif mode == 'symlink':
+            os.symlink(source, tmp_path)
+            result = 'symlinked'
+    except OSError:
+        # Hard links cannot cross filesystems; symlinks may be disallowed
+        result = 'copied'
+    if result == 'copied':
+        shutil.copy2(font_file, tmp_path)
+    os.replace(tmp_path, dest)
+    return result
+
+
+def deploy_fonts(fonts_dir: Path, dest_dir: Path, mode: str = 'link') -> dict:
+    """Deploy every font in fonts_dir into dest_dir, skipping files that are already current."""
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    counts: dict[str, int] = {}
+    for font_file in sorted(fonts_dir.glob('*')):
+        if font_file.is_file():
+            state = _deploy_font(font_file, dest_dir / font_file.name, mode)
+            counts[state] = counts.get(state, 0) + 1
+    return counts
+
+
+def ensure_katex_fonts(
     output_path: str,
-    title: str = "Flashcards",
-    katex_assets: Optional[dict] = None
+    fonts_dir: Optional[Path],
+    mode: str = 'link',
+    fonts_root: Optional[str] = None
 ) -> None:
-    """Generate interactive flashcard HTML."""
+    if not fonts_dir or not fonts_dir.exists():
+        return
 
-    logger.info(f"Generating HTML for {len(flashcards)} flashcards...")
-    
-    # Load and encode background images as base64
-    script_dir = Path(__file__).parent
-    confetti_black_path = script_dir / "Confetti_black.png"
-    confetti_white_path = script_dir / "Confetti_white.png"
-    
-    confetti_black_b64 = ""
-    confetti_white_b64 = ""
-    
-    if confetti_black_path.exists():
-        with open(confetti_black_path, 'rb') as f:
-            confetti_black_b64 = base64.b64encode(f.read()).decode('utf-8')
-        logger.info("✓ Loaded Confetti_black.png")
-    else:
-        logger.warning(f"⚠ Confetti_black.png not found at {confetti_black_path}")
-    
-    if confetti_white_path.exists():
-        with open(confetti_white_path, 'rb') as f:
-            confetti_white_b64 = base64.b64encode(f.read()).decode('utf-8')
-        logger.info("✓ Loaded Confetti_white.png")
-    else:
-        logger.warning(f"⚠ Confetti_white.png not found at {confetti_white_path}")
+    base_dir = Path(fonts_root).resolve() if fonts_root else Path(output_path).resolve().parent
+    dest_dir = base_dir / 'fonts'
+    counts = deploy_fonts(fonts_dir, dest_dir, mode)
 
-    katex_assets = katex_assets or get_katex_assets()
-    katex_styles = katex_assets['styles']
-    katex_scripts = katex_assets['scripts']
+    summary = ', '.join(f"{count} {state}" for state, count in sorted(counts.items()))
+    logger.info(f"✓ KaTeX fonts deployed to: {dest_dir} ({summary})")
 
-    html_template = """<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{title}</title>
-    <style>
-        * {{
+
+def localize_katex_assets(katex_assets: dict, output_path: str, fonts_root: Optional[str]) -> dict:
+    """Point inline KaTeX font URLs at a fonts directory shared by the whole output tree."""
+    if not fonts_root or not katex_assets['fonts_dir']:
+        return katex_assets
+
+    output_dir = Path(output_path).resolve().parent
+    prefix = Path(os.path.relpath(Path(fonts_root).resolve(), output_dir)).as_posix()
+    if prefix == '.':
+        return katex_assets
+    return {
+        **katex_assets,
+        'styles': katex_assets['styles'].replace('url(fonts/', f'url({prefix}/fonts/')
+    }
+
+
+FLASHCARDS_STYLES = """        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
 
-        body {{
+        body {
             font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif;
             background: #1b1b1b;
             min-height: 100vh;
@@ -137,10 +318,10 @@ def generate_notebooklm_html(
             align-items: center;
             padding: 40px 20px;
             position: relative;
-        }}
+        }
 
         body::before,
-        body::after {{
+        body::after {
             content: "";
             position: fixed;
             width: 200px;
@@ -150,71 +331,71 @@ def generate_notebooklm_html(
             filter: blur(25px);
             pointer-events: none;
             z-index: 0;
-        }}
+        }
 
-        body::before {{
+        body::before {
             top: 10%;
             left: 10%;
-        }}
+        }
 
-        body::after {{
+        body::after {
             bottom: 10%;
             right: 10%;
-        }}
+        }
 
-        body > * {{
+        body > * {
             position: relative;
             z-index: 1;
-        }}
+        }
 
-        .header {{
+        .header {
             text-align: center;
             color: white;
             margin-bottom: 30px;
             width: 100%;
             max-width: 600px;
-        }}
+        }
 
-        .header h1 {{
+        .header h1 {
             font-size: 28px;
             font-weight: 600;
             margin-bottom: 8px;
-        }}
+        }
 
-        .header .source {{
+        .header .source {
             font-size: 14px;
             opacity: 0.9;
-        }}
+        }
 
-        .instructions {{
+        .instructions {
             text-align: center;
             color: rgba(255, 255, 255, 0.8);
             font-size: 14px;
             margin-bottom: 20px;
-        }}
+        }
 
-        .card-container {{
+        .card-container {
             position: relative;
             width: 100%;
             max-width: 360px;
             height: 520px;
             perspective: 1000px;
-        }}
+        }
 
-        .card {{
+        .card {
             width: 100%;
             height: 100%;
             position: relative;
             transform-style: preserve-3d;
             transition: transform 0.6s cubic-bezier(0.4, 0.0, 0.2, 1);
             cursor: pointer;
-        }}
+        }
 
-        .card.flipped {{
+        .card.flipped {
             transform: rotateY(180deg);
-        }}
+        }
 
-        .card-face {{
+        .card-face {
             position: absolute;
             width: 100%;
             height: 100%;
@@ -227,76 +408,81 @@ def generate_notebooklm_html(
             align-items: center;
             padding: 40px;
             box-shadow: 0 10px 40px rgba(0, 0, 0, 0.2);
-        }}
+        }
 
-        .card-front {{
-            background: #0f0f0f url('data:image/png;base64,{confetti_black_b64}') center / cover no-repeat;
+        .card-front {
+            background: #0f0f0f@@CONFETTI_BLACK@@ center / cover no-repeat;
             color: white;
-        }}
+        }
 
-        .card-back {{
-            background: #ffffff url('data:image/png;base64,{confetti_white_b64}') center / cover no-repeat;
+        .card-back {
+            background: #ffffff;
             color: #2d2d2d;
             transform: rotateY(180deg);
-        }}
+        }
+
+        /* The answer side's image is only fetched and decoded once a card is flipped */
+        .card.revealed .card-back {
+            background: #ffffff@@CONFETTI_WHITE@@ center / cover no-repeat;
+        }
 
-        .card-content {{
+        .card-content {
             font-size: 22px;
             line-height: 1.6;
             text-align: center;
             max-width: 100%;
             word-wrap: break-word;
-        }}
+        }
 
-        .card-back .card-content {{
+        .card-back .card-content {
             font-size: 20px;
             text-align: left;
             padding-left: 20px;
             padding-right: 20px;
-        }}
+        }
 
         .card-back .card-content ul,
-        .card-back .card-content ol {{
+        .card-back .card-content ol {
             text-align: left;
             margin: 16px 0;
             padding-left: 30px;
             list-style-position: outside;
-        }}
+        }
 
-        .card-back .card-content ul {{
+        .card-back .card-content ul {
             list-style-type: disc;
-        }}
+        }
 
-        .card-back .card-content ol {{
+        .card-back .card-content ol {
             list-style-type: decimal;
-        }}
+        }
 
-        .card-back .card-content li {{
+        .card-back .card-content li {
             margin: 10px 0;
             line-height: 1.7;
             padding-left: 8px;
-        }}
+        }
 
-        .card-back .card-content .formatted-answer {{
+        .card-back .card-content .formatted-answer {
             text-align: left;
             white-space: pre-line;
-        }}
+        }
 
-        .card-front .card-action {{
+        .card-front .card-action {
             position: absolute;
             bottom: 30px;
             color: rgba(255, 255, 255, 0.6);
             font-size: 14px;
-        }}
+        }
 
-        .card-back .card-action {{
+        .card-back .card-action {
             position: absolute;
             bottom: 30px;
             display: flex;
             gap: 12px;
-        }}
+        }
 
-        .explain-btn {{
+        .explain-btn {
             background: none;
             border: 1px solid #dadce0;
             color: #5f6368;
@@ -308,22 +494,22 @@ def generate_notebooklm_html(
             align-items: center;
             gap: 6px;
             transition: all 0.2s;
-        }}
+        }
 
-        .explain-btn:hover {{
+        .explain-btn:hover {
             background: #f8f9fa;
             border-color: #5f6368;
-        }}
+        }
 
-        .navigation {{
+        .navigation {
             display: flex;
             justify-content: center;
             align-items: center;
             gap: 20px;
             margin-top: 30px;
-        }}
+        }
 
-        .nav-btn {{
+        .nav-btn {
             width: 48px;
             height: 48px;
             border-radius: 50%;
@@ -335,42 +521,42 @@ def generate_notebooklm_html(
             justify-content: center;
             transition: all 0.2s;
             box-shadow: 0 2px 8px rgba(0, 0, 0, 0.1);
-        }}
+        }
 
-        .nav-btn:hover:not(:disabled) {{
+        .nav-btn:hover:not(:disabled) {
             background: #f8f9fa;
             box-shadow: 0 4px 12px rgba(0, 0, 0, 0.15);
-        }}
+        }
 
-        .nav-btn:disabled {{
+        .nav-btn:disabled {
             opacity: 0.3;
             cursor: not-allowed;
-        }}
+        }
 
-        .nav-btn svg {{
+        .nav-btn svg {
             width: 20px;
             height: 20px;
             stroke: #5f6368;
             stroke-width: 2;
             fill: none;
-        }}
+        }
 
-        .controls {{
+        .controls {
             display: flex;
             align-items: center;
             gap: 20px;
             margin-top: 20px;
-        }}
+        }
 
-        .progress {{
+        .progress {
             color: white;
             font-size: 14px;
             display: flex;
             align-items: center;
             gap: 12px;
-        }}
+        }
 
-        .control-btn {{
+        .control-btn {
             background: none;
             border: none;
             cursor: pointer;
@@ -379,189 +565,78 @@ def generate_notebooklm_html(
             align-items: center;
             justify-content: center;
             transition: opacity 0.2s;
-        }}
+        }
 
-        .control-btn:hover {{
+        .control-btn:hover {
             opacity: 0.7;
-        }}
+        }
 
-        .control-btn svg {{
+        .control-btn svg {
             width: 20px;
             height: 20px;
             stroke: white;
             stroke-width: 2;
             fill: none;
-        }}
+        }
 
-        .download-icon {{
+        .download-icon {
             fill: white;
             stroke: none;
-        }}
-    </style>
-    {katex_styles}
-</head>
-<body>
-    <div class="header">
-        <h1>{title}</h1>
-        <div class="source">Based on 1 source</div>
-    </div>
-
-    <div class="instructions">
-        Press "Space" to flip, "← / →" to navigate
-    </div>
-
-    <div class="card-container">
-        <div class="card" id="card">
-            <div class="card-face card-front">
-                <div class="card-content" id="question"></div>
-                <div class="card-action">See answer</div>
-            </div>
-            <div class="card-face card-back">
-                <div class="card-content" id="answer"></div>
-            </div>
-        </div>
-    </div>
+        }
 
-    <div class="navigation">
-        <button class="nav-btn" id="prev-btn" onclick="previousCard()">
-            <svg viewBox="0 0 24 24"><path d="M15 18l-6-6 6-6"/></svg>
-        </button>
-        <button class="nav-btn" id="next-btn" onclick="nextCard()">
-            <svg viewBox="0 0 24 24"><path d="M9 18l6-6-6-6"/></svg>
-        </button>
-    </div>
+        .card-back .card-action[hidden],
+        .control-btn[hidden] {
+            display: none;
+        }
 
-    <div class="controls">
-        <button class="control-btn" onclick="resetCards()" title="Reset">
-            <svg viewBox="0 0 24 24">
-                <path d="M3 12a9 9 0 0 1 9-9 9.75 9.75 0 0 1 6.74 2.74L21 8"/>
-                <path d="M21 3v5h-5"/>
-                <path d="M21 12a9 9 0 0 1-9 9 9.75 9.75 0 0 1-6.74-2.74L3 16"/>
-                <path d="M3 21v-5h5"/>
-            </svg>
-        </button>
-        <div class="progress">
-            <span id="current">1</span> / <span id="total">{total}</span> cards
-        </div>
-        <button class="control-btn" onclick="downloadCSV()" title="Download CSV">
-            <svg viewBox="0 0 24 24" class="download-icon">
-                <path d="M21 15v4a2 2 0 0 1-2 2H5a2 2 0 0 1-2-2v-4"/>
-                <polyline points="7 10 12 15 17 10"/>
-                <line x1="12" y1="15" x2="12" y2="3"/>
-            </svg>
-        </button>
-    </div>
+        .control-btn.active svg {
+            stroke: #78d2ff;
+        }
+"""
 
-    {katex_scripts}
-    <script>
-        const flashcards = {flashcards_json};
-        let currentIndex = 0;
+FLASHCARDS_SCRIPT = """        let currentIndex = 0;
         let isFlipped = false;
+        let reviewMode = false;
 
-        function renderMath(target) {{
+        function renderMath(target) {
             if (!target || typeof renderMathInElement !== 'function') return;
-            renderMathInElement(target, {{
+            renderMathInElement(target, {
                 delimiters: [
-                    {{left: '$$', right: '$$', display: true}},
-                    {{left: '$', right: '$', display: false}},
-                    {{left: '\\(', right: '\\)', display: false}},
-                    {{left: '\\[', right: '\\]', display: true}}
+                    {left: '$$', right: '$$', display: true},
+                    {left: '$', right: '$', display: false},
+                    {left: '\\(', right: '\\)', display: false},
+                    {left: '\\[', right: '\\]', display: true}
                 ],
                 throwOnError: false
-            }});
-        }}
-
-        function formatAnswerForExam(text) {{
-            if (!text) return '';
-            
-            // Convert to string and escape HTML
-            let formatted = String(text)
+            });
+        }
+
+        function escapeHtml(text) {
+            return String(text == null ? '' : text)
                 .replace(/&/g, '&amp;')
                 .replace(/</g, '&lt;')
                 .replace(/>/g, '&gt;');
-            
-            // Split by lines first
-            const lines = formatted.split(/\\n|\\r\\n|\\r/);
-            const items = [];
-            let inList = false;
-            
-            for (let i = 0; i < lines.length; i++) {{
-                const line = lines[i].trim();
-                if (!line) continue;
-                
-                // Check for bullet points: •, -, *, ◦, ▪, or Unicode bullets
-                const bulletMatch = line.match(/^[•\-\*◦▪▪▫]\s+(.+)$/);
-                if (bulletMatch) {{
-                    items.push({{type: 'bullet', content: bulletMatch[1]}});
-                    inList = true;
-                    continue;
-                }}
-                
-                // Check for numbered lists: 1., 2., 3., etc. or 1), 2), 3), etc.
-                const numberMatch = line.match(/^(\d+)[\.\)]\s+(.+)$/);
-                if (numberMatch) {{
-                    items.push({{type: 'number', content: numberMatch[2]}});
-                    inList = true;
-                    continue;
-                }}
-                
-                // Check for lettered lists: a., b., c., etc. or a), b), c), etc.
-                const letterMatch = line.match(/^([a-zA-Z])[\.\)]\s+(.+)$/);
-                if (letterMatch) {{
-                    items.push({{type: 'letter', content: letterMatch[2]}});
-                    inList = true;
-                    continue;
-                }}
-                
-                // Regular text line
-                items.push({{type: 'text', content: line}});
-            }}
-            
-            // Build HTML output
-            let html = '';
-            let currentList = null;
-            let listType = null;
-            
-            for (let i = 0; i < items.length; i++) {{
-                const item = items[i];
-                
-                if (item.type === 'bullet' || item.type === 'number' || item.type === 'letter') {{
-                    // Start a new list if needed
-                    if (!currentList || listType !== item.type) {{
-                        if (currentList) {{
-                            html += '</ul>';
-                        }}
-                        currentList = [];
-                        listType = item.type;
-                        html += '<ul>';
-                    }}
-                    html += '<li>' + item.content + '</li>';
-                }} else {{
-                    // Close current list if open
-                    if (currentList) {{
-                        html += '</ul>';
-                        currentList = null;
-                        listType = null;
-                    }}
-                    // Add text with line break
-                    html += '<div class="formatted-answer">' + item.content + '</div>';
-                }}
-            }}
-            
-            // Close any open list
-            if (currentList) {{
-                html += '</ul>';
-            }}
-            
-            // If no lists were found, return as formatted text
-            if (!html.includes('<ul>')) {{
-                html = '<div class="formatted-answer">' + formatted.replace(/\\n/g, '<br>') + '</div>';
-            }}
-            
-            return html;
-        }}
-
-        function updateCard() {{
+        }
+
+        // Formulas rendered at build time are stored once in prerenderedMath as
+        // [TeX source, KaTeX HTML] and referenced from the cards as \uE000<index>\uE001
+        function withMath(html) {
+            return html.replace(/\uE000(\d+)\uE001/g, (match, index) => prerenderedMath[index][1]);
+        }
+
+        function mathSource(text) {
+            return String(text).replace(/\uE000(\d+)\uE001/g, (match, index) => prerenderedMath[index][0]);
+        }
+
+        // Answers with list lines are laid out at build time (answer_list_html in
+        // main.py); the rest only need escaping and line breaks
+        function answerHtml(card) {
+            if (card.answerHtml) return card.answerHtml;
+            if (!card.answer) return '';
+            return '<div class="formatted-answer">' + escapeHtml(card.answer).replace(/\\n/g, '<br>') + '</div>';
+        }
+
+        function updateCard() {
             const card = document.getElementById('card');
             const question = document.getElementById('question');
             const answer = document.getElementById('answer');
@@ -570,112 +645,1998 @@ def generate_notebooklm_html(
             const nextBtn = document.getElementById('next-btn');
 
             // Update content
-            question.textContent = flashcards[currentIndex].question;
-            // Format answer for exam mode with proper line breaks
-            answer.innerHTML = formatAnswerForExam(flashcards[currentIndex].answer);
+            question.innerHTML = withMath(escapeHtml(flashcards[currentIndex].question));
+            answer.innerHTML = withMath(answerHtml(flashcards[currentIndex]));
             current.textContent = currentIndex + 1;
 
             renderMath(question);
             renderMath(answer);
 
             // Reset flip
-            if (isFlipped) {{
+            if (isFlipped) {
                 card.classList.remove('flipped');
                 isFlipped = false;
-            }}
+            }
 
             // Update navigation buttons
-            prevBtn.disabled = currentIndex === 0;
-            nextBtn.disabled = currentIndex === flashcards.length - 1;
-        }}
+            prevBtn.disabled = reviewMode || currentIndex === 0;
+            nextBtn.disabled = reviewMode || currentIndex === flashcards.length - 1;
+        }
 
-        function flipCard() {{
+        function flipCard() {
+            if (reviewMode && !dueCardShown) return;
             const card = document.getElementById('card');
+            card.classList.add('revealed');
             card.classList.toggle('flipped');
             isFlipped = !isFlipped;
-        }}
+        }
 
-        function nextCard() {{
-            if (currentIndex < flashcards.length - 1) {{
+        function nextCard() {
+            if (!reviewMode && currentIndex < flashcards.length - 1) {
                 currentIndex++;
                 updateCard();
-            }}
-        }}
+            }
+        }
 
-        function previousCard() {{
-            if (currentIndex > 0) {{
+        function previousCard() {
+            if (!reviewMode && currentIndex > 0) {
                 currentIndex--;
                 updateCard();
-            }}
-        }}
+            }
+        }
 
-        function resetCards() {{
+        function resetCards() {
+            if (reviewMode) return;
             currentIndex = 0;
             updateCard();
-        }}
-
-        function downloadCSV() {{
-            let csv = 'question,answer\\n';
-            flashcards.forEach(card => {{
-                const q = '"' + card.question.replace(/"/g, '""') + '"';
-                const a = '"' + card.answer.replace(/"/g, '""') + '"';
-                csv += q + ',' + a + '\\n';
-            }});
-
-            const blob = new Blob([csv], {{ type: 'text/csv' }});
+        }
+
+        // The Blob joins the rows itself, so no deck-sized string is built
+        function downloadCSV() {
+            const rows = ['question,answer\\n'];
+            flashcards.forEach(card => {
+                const q = '"' + mathSource(card.question).replace(/"/g, '""') + '"';
+                const a = '"' + mathSource(card.answer).replace(/"/g, '""') + '"';
+                rows.push(q + ',' + a + '\\n');
+            });
+            downloadFile(rows, csvFilename, 'text/csv');
+        }
+
+        function downloadFile(parts, filename, type) {
+            const blob = new Blob(parts, { type: type });
             const url = window.URL.createObjectURL(blob);
             const a = document.createElement('a');
             a.href = url;
-            a.download = '{title}_flashcards.csv';
+            a.download = filename;
             document.body.appendChild(a);
             a.click();
             document.body.removeChild(a);
             window.URL.revokeObjectURL(url);
-        }}
+        }
+
+        // Spaced repetition, for pages built with --spaced-repetition. A card's SM-2
+        // state is [reps, interval, ease, due, lapses, last review ms], with days
+        // counted from 1970-01-01 in local time (the converter replays exported logs
+        // with the same rules). Cards wait in a binary heap ordered by (due day,
+        // queue order), so the next due card is always at the top.
+        let srsStates = null;
+        let dueHeap = [];
+        let queued = 0;
+        let dueCount = 0;
+        let dueCardShown = false;
+        // Never-reviewed cards wait outside the heap, in deck order. Each day the
+        // learner opens review mode, up to newPerDay of them (less those already
+        // started that day) join the heap, so days away never pile new cards up.
+        let newCards = [];
+        let newReleased = 0;
+        let newWaiting = 0;
+        let scheduleDay = null;
+        const newStarted = new Map();
+
+        function today() {
+            const now = new Date();
+            return Math.floor((now.getTime() - now.getTimezoneOffset() * 60000) / 86400000);
+        }
+
+        function srsKey(suffix) {
+            return `flashcards-srs:${srs.deck}:${suffix}`;
+        }
+
+        function storedEntries(prefix) {
+            const entries = [];
+            try {
+                for (let i = 0; i < localStorage.length; i++) {
+                    const name = localStorage.key(i);
+                    if (name.startsWith(prefix)) {
+                        entries.push([name.slice(prefix.length), localStorage.getItem(name)]);
+                    }
+                }
+            } catch (e) {
+                // Storage can be unavailable (private windows, some file:// pages)
+            }
+            return entries;
+        }
+
+        function sm2(state, grade, day, now) {
+            let [reps, interval, ease, due, lapses] = state || [0, 0, 2.5, day, 0];
+            if (grade < 3) {
+                // Lapsed cards start over and come back at the end of today's queue
+                reps = 0;
+                interval = 1;
+                lapses++;
+                due = day;
+            } else {
+                interval = reps === 0 ? 1 : reps === 1 ? 6 : Math.round(interval * ease);
+                reps++;
+                due = day + interval;
+            }
+            ease = Math.max(1.3, ease + 0.1 - (5 - grade) * (0.08 + (5 - grade) * 0.02));
+            return [reps, interval, ease, due, lapses, now];
+        }
+
+        function heapBefore(a, b) {
+            return a[0] < b[0] || (a[0] === b[0] && a[1] < b[1]);
+        }
+
+        function siftDown(i) {
+            for (;;) {
+                const left = 2 * i + 1;
+                let first = i;
+                if (left < dueHeap.length && heapBefore(dueHeap[left], dueHeap[first])) first = left;
+                if (left + 1 < dueHeap.length && heapBefore(dueHeap[left + 1], dueHeap[first])) first = left + 1;
+                if (first === i) return;
+                [dueHeap[i], dueHeap[first]] = [dueHeap[first], dueHeap[i]];
+                i = first;
+            }
+        }
+
+        function heapPush(entry) {
+            dueHeap.push(entry);
+            let i = dueHeap.length - 1;
+            while (i > 0 && heapBefore(dueHeap[i], dueHeap[(i - 1) >> 1])) {
+                const parent = (i - 1) >> 1;
+                [dueHeap[i], dueHeap[parent]] = [dueHeap[parent], dueHeap[i]];
+                i = parent;
+            }
+        }
+
+        function heapPop() {
+            const top = dueHeap[0];
+            const last = dueHeap.pop();
+            if (dueHeap.length) {
+                dueHeap[0] = last;
+                siftDown(0);
+            }
+            return top;
+        }
+
+        function loadSchedule() {
+            // The build-time schedule (from imported review logs) unless this browser
+            // has reviewed the card more recently
+            srsStates = new Map(Object.entries(srs.cards));
+            storedEntries(srsKey('card:')).forEach(([key, value]) => {
+                const state = JSON.parse(value);
+                const known = srsStates.get(key);
+                if (!known || known[5] <= state[5]) srsStates.set(key, state);
+            });
+            dueHeap = [];
+            newCards = [];
+            flashcards.forEach((card, index) => {
+                const state = srsStates.get(card.key);
+                if (state) {
+                    dueHeap.push([state[3], queued++, index]);
+                } else {
+                    newCards.push(index);
+                }
+            });
+            for (let i = (dueHeap.length >> 1) - 1; i >= 0; i--) siftDown(i);
+        }
+
+        function startedOn(day) {
+            if (!newStarted.has(day)) {
+                let started = 0;
+                try {
+                    started = Number(localStorage.getItem(srsKey('new:' + day))) || 0;
+                } catch (e) {
+                    // Counted for this visit only when storage is unavailable
+                }
+                newStarted.set(day, started);
+            }
+            return newStarted.get(day);
+        }
+
+        function startDay(day) {
+            // Release today's new cards and count what is due; cards released on an
+            // earlier day but not yet reviewed still count against today's limit
+            scheduleDay = day;
+            const release = Math.min(srs.newPerDay - startedOn(day) - newWaiting, newCards.length - newReleased);
+            for (let i = 0; i < release; i++) {
+                heapPush([day, queued++, newCards[newReleased++]]);
+                newWaiting++;
+            }
+            dueCount = dueHeap.reduce((count, entry) => count + (entry[0] <= day ? 1 : 0), 0);
+        }
+
+        function showDueCard() {
+            const day = today();
+            if (day !== scheduleDay) startDay(day);
+            dueCardShown = dueHeap.length > 0 && dueHeap[0][0] <= day;
+            document.getElementById('due-count').textContent = dueCount;
+            if (dueCardShown) {
+                currentIndex = dueHeap[0][2];
+                updateCard();
+                return;
+            }
+            updateCard();
+            const next = dueHeap.length ? new Date(dueHeap[0][0] * 86400000).toISOString().slice(0, 10) : null;
+            document.getElementById('question').textContent = next
+                ? `All caught up. Next review: ${next}`
+                : 'All caught up.';
+        }
+
+        function toggleReviewMode() {
+            reviewMode = !reviewMode;
+            if (reviewMode) {
+                if (!srsStates) loadSchedule();
+                startDay(today());
+            }
+            document.getElementById('grade-buttons').hidden = !reviewMode;
+            document.getElementById('review-btn').classList.toggle('active', reviewMode);
+            document.getElementById('browse-progress').hidden = reviewMode;
+            document.getElementById('review-progress').hidden = !reviewMode;
+            if (reviewMode) {
+                showDueCard();
+            } else {
+                updateCard();
+            }
+        }
+
+        function gradeCard(grade) {
+            if (!reviewMode || !dueCardShown || !isFlipped) return;
+            const index = heapPop()[2];
+            const key = flashcards[index].key;
+            const day = today();
+            const isNew = !srsStates.has(key);
+            const state = sm2(srsStates.get(key), grade, day, Date.now());
+            srsStates.set(key, state);
+            if (isNew) {
+                newWaiting--;
+                newStarted.set(day, startedOn(day) + 1);
+            }
+            heapPush([state[3], queued++, index]);
+            if (state[3] > day) dueCount--;
+
+            const review = {card: key, ts: state[5], day: day, grade: grade, interval: state[1], ease: state[2], due: state[3]};
+            try {
+                // The log is kept per day, so a review only rewrites today's entries
+                localStorage.setItem(srsKey('card:' + key), JSON.stringify(state));
+                if (isNew) localStorage.setItem(srsKey('new:' + day), String(newStarted.get(day)));
+                const logKey = srsKey('log:' + day);
+                localStorage.setItem(logKey, (localStorage.getItem(logKey) || '') + JSON.stringify(review) + '\\n');
+            } catch (e) {
+                // Still schedules for this visit when storage is full or unavailable
+            }
+            showDueCard();
+        }
+
+        function downloadReviewLog() {
+            const days = storedEntries(srsKey('log:')).sort((a, b) => a[0] - b[0]);
+            downloadFile(days.map(([day, lines]) => lines), srs.logFilename, 'application/x-ndjson');
+        }
 
         // Keyboard navigation
-        document.addEventListener('keydown', (e) => {{
-            if (e.code === 'Space') {{
+        document.addEventListener('keydown', (e) => {
+            if (e.code === 'Space') {
                 e.preventDefault();
                 flipCard();
-            }} else if (e.code === 'ArrowLeft') {{
+            } else if (e.code === 'ArrowLeft') {
                 e.preventDefault();
                 previousCard();
-            }} else if (e.code === 'ArrowRight') {{
+            } else if (e.code === 'ArrowRight') {
                 e.preventDefault();
                 nextCard();
-            }}
-        }});
+            } else if (reviewMode && e.key >= '1' && e.key <= '4') {
+                gradeCard([1, 3, 4, 5][e.key - 1]);
+            }
+        });
 
         // Click to flip
         document.getElementById('card').addEventListener('click', flipCard);
 
         // Initialize
+        if (srs) {
+            document.getElementById('review-btn').hidden = false;
+            document.getElementById('log-btn').hidden = false;
+        }
         updateCard();
-    </script>
+"""
+
+
+def card_background(name: str, background_format: str = 'png') -> Optional[tuple[bytes, str]]:
+    """Return (image bytes, format) of a card background, or None if its PNG is missing.
+
+    Encoded images are cached per process. WebP and AVIF are transcoded once with
+    cwebp / avifenc into a content-addressed store; without the encoder the PNG is
+    used as is.
+    """
+    source = Path(__file__).parent / CARD_BACKGROUNDS[name]
+    stat = source.stat() if source.exists() else None
+    key = (str(source), stat and stat.st_size, stat and stat.st_mtime, background_format)
+    if key not in _card_backgrounds:
+        if stat is None:
+            logger.warning(f"⚠ {source.name} not found at {source}")
+            _card_backgrounds[key] = None
+        else:
+            _card_backgrounds[key] = _encode_background(source, background_format)
+    return _card_backgrounds[key]
+
+
+def _encode_background(source: Path, background_format: str) -> tuple[bytes, str]:
+    data = source.read_bytes()
+    if background_format == 'png':
+        return data, 'png'
+
+    stored = BACKGROUND_STORE_DIR / f"{hashlib.sha256(data).hexdigest()}.{background_format}"
+    if not stored.exists():
+        tmp_path = stored.with_name(f".{stored.name}.{os.getpid()}.tmp.{background_format}")
+        command = {
+            'webp': ['cwebp', '-quiet', '-q', '80', str(source), '-o', str(tmp_path)],
+            'avif': ['avifenc', '--speed', '6', str(source), str(tmp_path)]
+        }[background_format]
+        if not shutil.which(command[0]):
+            logger.warning(f"⚠ {command[0]} not found, keeping {source.name} as PNG")
+            return data, 'png'
+        BACKGROUND_STORE_DIR.mkdir(parents=True, exist_ok=True)
+        try:
+            subprocess.run(command, check=True, capture_output=True, timeout=120)
+            os.replace(tmp_path, stored)
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.warning(f"⚠ Could not convert {source.name} to {background_format} ({e}), keeping PNG")
+            return data, 'png'
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    encoded = stored.read_bytes()
+    logger.info(f"✓ {source.name} as {background_format}: {len(data) / 1024:.0f} KB -> {len(encoded) / 1024:.0f} KB")
+    return encoded, background_format
+
+
+def load_flashcard_styles(background_format: str = 'png', background_urls: Optional[dict] = None) -> str:
+    """Return the flashcard CSS with the card backgrounds, built once per process.
+
+    The backgrounds are embedded as data URIs unless background_urls maps
+    'black'/'white' to image files (shared asset mode).
+    """
+    key = (background_format, tuple(sorted(background_urls.items())) if background_urls is not None else None)
+    if key not in _flashcard_styles:
+        css = FLASHCARDS_STYLES
+        for name in CARD_BACKGROUNDS:
+            if background_urls is not None:
+                url = background_urls.get(name)
+            else:
+                image = card_background(name, background_format)
+                url = image and f"data:image/{image[1]};base64,{base64.b64encode(image[0]).decode('ascii')}"
+            css = css.replace(f'@@CONFETTI_{name.upper()}@@', f" url('{url}')" if url else '')
+        _flashcard_styles[key] = css
+    return _flashcard_styles[key]
+
+
+def write_shared_asset(assets_root: Path, name: str, suffix: str, content: Union[str, bytes]) -> str:
+    """Write content once as <name>.<hash><suffix> in assets_root and return the file name."""
+    key = (str(assets_root), content)
+    if key in _shared_asset_names:
+        return _shared_asset_names[key]
+
+    data = content.encode('utf-8') if isinstance(content, str) else content
+    filename = f"{name}.{hashlib.sha256(data).hexdigest()[:16]}{suffix}"
+    path = assets_root / filename
+    if not path.exists():
+        assets_root.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{filename}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    _shared_asset_names[key] = filename
+    return filename
+
+
+def publish_shared_assets(
+    katex_assets: dict,
+    assets_dir: str,
+    fonts_mode: str = 'link',
+    background_format: str = 'png'
+) -> dict:
+    """Write the flashcard CSS/JS, card backgrounds and local KaTeX files into assets_dir
+    under content-hashed names.
+
+    KaTeX fonts go to <assets_dir>/fonts so the shared katex CSS resolves them.
+    """
+    assets_root = Path(assets_dir).resolve()
+    background_urls = {}
+    for name in CARD_BACKGROUNDS:
+        image = card_background(name, background_format)
+        if image:
+            background_urls[name] = write_shared_asset(assets_root, f'confetti-{name}', f'.{image[1]}', image[0])
+    files = {
+        'flashcards_css': write_shared_asset(
+            assets_root, 'flashcards', '.css', load_flashcard_styles(background_format, background_urls)
+        ),
+        'flashcards_js': write_shared_asset(assets_root, 'flashcards', '.js', FLASHCARDS_SCRIPT),
+    }
+    if katex_assets.get('css') is not None:
+        files['katex_css'] = write_shared_asset(assets_root, 'katex', '.css', katex_assets['css'])
+        files['katex_js'] = write_shared_asset(assets_root, 'katex', '.js', katex_assets['js'])
+        files['auto_render_js'] = write_shared_asset(
+            assets_root, 'auto-render', '.js', katex_assets['auto_render_js']
+        )
+        ensure_katex_fonts(str(assets_root / files['katex_css']), katex_assets['fonts_dir'], fonts_mode)
+
+    logger.info(f"✓ Shared assets ready in: {assets_root} ({len(files)} files)")
+    return {'root': str(assets_root), 'files': files, 'images': sorted(background_urls.values())}
+
+
+def shared_asset_urls(shared_assets: dict, output_path: str) -> dict:
+    """Map each shared asset to a URL relative to the page at output_path."""
+    output_dir = Path(output_path).resolve().parent
+    prefix = Path(os.path.relpath(shared_assets['root'], output_dir)).as_posix()
+    return {key: f"{prefix}/{filename}" for key, filename in shared_assets['files'].items()}
+
+
+FLASHCARDS_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>@@TITLE@@</title>
+@@STYLES@@
+    @@KATEX_STYLES@@
+</head>
+<body>
+    <div class="header">
+        <h1>@@TITLE@@</h1>
+        <div class="source">Based on 1 source</div>
+    </div>
+
+    <div class="instructions">
+        Press "Space" to flip, "← / →" to navigate
+    </div>
+
+    <div class="card-container">
+        <div class="card" id="card">
+            <div class="card-face card-front">
+                <div class="card-content" id="question"></div>
+                <div class="card-action">See answer</div>
+            </div>
+            <div class="card-face card-back">
+                <div class="card-content" id="answer"></div>
+                <div class="card-action" id="grade-buttons" hidden>
+                    <button class="explain-btn" onclick="event.stopPropagation(); gradeCard(1)" title="1">Again</button>
+                    <button class="explain-btn" onclick="event.stopPropagation(); gradeCard(3)" title="2">Hard</button>
+                    <button class="explain-btn" onclick="event.stopPropagation(); gradeCard(4)" title="3">Good</button>
+                    <button class="explain-btn" onclick="event.stopPropagation(); gradeCard(5)" title="4">Easy</button>
+                </div>
+            </div>
+        </div>
+    </div>
+
+    <div class="navigation">
+        <button class="nav-btn" id="prev-btn" onclick="previousCard()">
+            <svg viewBox="0 0 24 24"><path d="M15 18l-6-6 6-6"/></svg>
+        </button>
+        <button class="nav-btn" id="next-btn" onclick="nextCard()">
+            <svg viewBox="0 0 24 24"><path d="M9 18l6-6-6-6"/></svg>
+        </button>
+    </div>
+
+    <div class="controls">
+        <button class="control-btn" onclick="resetCards()" title="Reset">
+            <svg viewBox="0 0 24 24">
+                <path d="M3 12a9 9 0 0 1 9-9 9.75 9.75 0 0 1 6.74 2.74L21 8"/>
+                <path d="M21 3v5h-5"/>
+                <path d="M21 12a9 9 0 0 1-9 9 9.75 9.75 0 0 1-6.74-2.74L3 16"/>
+                <path d="M3 21v-5h5"/>
+            </svg>
+        </button>
+        <div class="progress">
+            <span id="browse-progress"><span id="current">1</span> / <span id="total">@@TOTAL@@</span> cards</span>
+            <span id="review-progress" hidden><span id="due-count">0</span> due today</span>
+        </div>
+        <button class="control-btn" onclick="downloadCSV()" title="Download CSV">
+            <svg viewBox="0 0 24 24" class="download-icon">
+                <path d="M21 15v4a2 2 0 0 1-2 2H5a2 2 0 0 1-2-2v-4"/>
+                <polyline points="7 10 12 15 17 10"/>
+                <line x1="12" y1="15" x2="12" y2="3"/>
+            </svg>
+        </button>
+        <button class="control-btn" id="review-btn" onclick="toggleReviewMode()" title="Review due cards" hidden>
+            <svg viewBox="0 0 24 24">
+                <rect x="3" y="4" width="18" height="17" rx="2"/>
+                <path d="M3 9h18M8 2v4M16 2v4"/>
+            </svg>
+        </button>
+        <button class="control-btn" id="log-btn" onclick="downloadReviewLog()" title="Download review log" hidden>
+            <svg viewBox="0 0 24 24">
+                <circle cx="12" cy="12" r="9"/>
+                <path d="M12 7v5l3 3"/>
+            </svg>
+        </button>
+    </div>
+
+    @@KATEX_SCRIPTS@@
+    <script>
+        const flashcards = @@FLASHCARDS_JSON@@;
+        const csvFilename = @@CSV_FILENAME_JSON@@;
+        const prerenderedMath = @@MATH_JSON@@;
+        const srs = @@SRS_JSON@@;
+@@INLINE_SCRIPT@@    </script>@@EXTERNAL_SCRIPT@@
 </body>
 </html>"""
 
-    # Generate HTML
-    flashcards_json = json.dumps(flashcards)
-    html = html_template.format(
-        title=title,
-        total=len(flashcards),
-        flashcards_json=flashcards_json,
-        confetti_black_b64=confetti_black_b64,
-        confetti_white_b64=confetti_white_b64,
-        katex_styles=katex_styles,
-        katex_scripts=katex_scripts
+PAGE_SLOT_RE = re.compile(r'@@([A-Z_]+)@@')
+MAX_COMPILED_PAGES = 64
+
+
+def compile_page(template: str, static: dict) -> tuple[list[bytes], list[str]]:
+    """Fill the static slots of template and split it around the remaining ones.
+
+    Returns (literals, slots) with len(literals) == len(slots) + 1. The literals
+    are kept UTF-8 encoded so a render only encodes the per-page values instead
+    of rebuilding and re-encoding the whole page (see fill_page).
+    """
+    parts = PAGE_SLOT_RE.split(template)
+    literals, slots = [parts[0]], []
+    for name, literal in zip(parts[1::2], parts[2::2]):
+        if name in static:
+            literals[-1] += static[name] + literal
+        else:
+            slots.append(name)
+            literals.append(literal)
+    return [literal.encode('utf-8') for literal in literals], slots
+
+
+def fill_page(page: tuple[list[bytes], list[str]], values: dict) -> bytes:
+    literals, slots = page
+    parts = [literals[0]]
+    for name, literal in zip(slots, literals[1:]):
+        parts.append(values[name].encode('utf-8'))
+        parts.append(literal)
+    return b''.join(parts)
+
+
+STREAM_READ_SIZE = 1 << 16
+MAX_RECORD_CHARS = 64 << 20
+STREAM_BATCH_SIZE = 1000
+JSON_WHITESPACE_RE = re.compile(r'[ \t\r\n]*')
+NUMBER_END_RE = re.compile(r'[^0-9+\-.eE]')
+
+
+class _JsonStream:
+    """Pull tokenizer over a JSON text file that decodes one value at a time."""
+
+    def __init__(self, f: TextIO):
+        self.f = f
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(STREAM_READ_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character ('' at end of input)."""
+        while True:
+            self.pos = JSON_WHITESPACE_RE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"Expected one of {chars!r} but found {char or 'end of file'!r}")
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        if self.peek() in '-0123456789':
+            # A number is only complete once something that cannot continue it follows
+            while not NUMBER_END_RE.search(self.buf, self.pos) and self._fill():
+                pass
+        while True:
+            try:
+                value, self.pos = self.decoder.raw_decode(self.buf, self.pos)
+                return value
+            except json.JSONDecodeError:
+                # The value may simply continue in the next chunk
+                if len(self.buf) - self.pos > MAX_RECORD_CHARS or not self._fill():
+                    raise
+
+    def array_items(self) -> Iterator[tuple[str, Any]]:
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield 'item', self.value()
+            if self.expect(',]') == ']':
+                return
+
+    def events(self, list_key: str) -> Iterator[tuple[str, Any]]:
+        if self.expect('[{') == '[':
+            yield from self.array_items()
+        elif self.peek() == '}':
+            self.pos += 1
+        else:
+            while True:
+                key = self.value()
+                if not isinstance(key, str):
+                    raise ValueError(f"Expected an object key but found {key!r}")
+                self.expect(':')
+                if key == list_key and self.peek() == '[':
+                    self.pos += 1
+                    yield from self.array_items()
+                else:
+                    yield 'field', (key, self.value())
+                if self.expect(',}') == '}':
+                    break
+        if self.peek():
+            raise ValueError("Unexpected data after the JSON document")
+
+
+def iter_json_records(path: str, list_key: str) -> Iterator[tuple[str, Any]]:
+    """Stream a JSON or JSON Lines deck without loading it whole.
+
+    Yields ('item', value) for each element of a top-level array, of the list_key
+    array in a top-level object, or for each JSON Lines record, and
+    ('field', (key, value)) for the object's other fields. In JSON Lines files a
+    record of the form {"title": ...} is reported as a field.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        if Path(path).suffix.lower() not in ('.jsonl', '.ndjson'):
+            try:
+                yield from _JsonStream(f).events(list_key)
+            except ValueError as e:
+                raise ValueError(f"{path}: {e}") from None
+            return
+
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{path}:{line_number}: {e}") from None
+            if isinstance(record, dict) and list(record) == ['title']:
+                yield 'field', ('title', record['title'])
+            else:
+                yield 'item', record
+
+
+def validate_card(card: Any, number: int) -> None:
+    if not isinstance(card, dict) or 'question' not in card or 'answer' not in card:
+        raise ValueError(f"Card {number} missing 'question' or 'answer' field")
+
+
+# JavaScript's \s and String.trim() whitespace, and the line terminators its '.' stops at.
+# Python's own classes differ (\x1c-\x1f and \x85 vs \ufeff, non-ASCII digits).
+JS_WHITESPACE = (
+    '\t\n\x0b\x0c\r \xa0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a'
+    '\u2028\u2029\u202f\u205f\u3000\ufeff'
+)
+_JS_SPACE = f"[{re.escape(JS_WHITESPACE)}]+"
+_JS_REST_OF_LINE = '([^\n\r\u2028\u2029]+)\\Z'
+ANSWER_LINE_RE = re.compile(r'\r\n|\n|\r')
+ANSWER_LIST_RES = (
+    ('bullet', re.compile(f"[•\\-*◦▪▫]{_JS_SPACE}{_JS_REST_OF_LINE}")),
+    ('number', re.compile(f"[0-9]+[.)]{_JS_SPACE}{_JS_REST_OF_LINE}")),
+    ('letter', re.compile(f"[a-zA-Z][.)]{_JS_SPACE}{_JS_REST_OF_LINE}"))
+)
+
+
+def _js_string(value: Any) -> str:
+    """String(value) for a JSON scalar, as the page would show it."""
+    if isinstance(value, str):
+        return value
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def answer_list_html(answer: Any) -> Optional[str]:
+    """Lay out an answer with list lines as exam-style HTML, or return None if it has none.
+
+    Bullet, numbered and lettered lines become lists and other lines one
+    <div class="formatted-answer"> each. The text is HTML-escaped and math
+    references (MATH_REF) are kept for the page to resolve. Cards ship this as
+    answerHtml, so the page does no line parsing when a card is shown.
+    """
+    if answer in (None, '', 0):
+        return None
+    escaped = _js_string(answer).replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+    parts = []
+    list_type = None
+    has_list = False
+    for line in ANSWER_LINE_RE.split(escaped):
+        line = line.strip(JS_WHITESPACE)
+        if not line:
+            continue
+        for item_type, pattern in ANSWER_LIST_RES:
+            match = pattern.match(line)
+            if match:
+                if list_type != item_type:
+                    parts.append('</ul><ul>' if list_type else '<ul>')
+                    list_type = item_type
+                    has_list = True
+                parts.append(f"<li>{match.group(1)}</li>")
+                break
+        else:
+            if list_type:
+                parts.append('</ul>')
+                list_type = None
+            parts.append(f'<div class="formatted-answer">{line}</div>')
+    if not has_list:
+        return None
+    if list_type:
+        parts.append('</ul>')
+    return ''.join(parts)
+
+
+def format_answer_html(answer: Any) -> str:
+    """The answer HTML the page shows: answer_list_html, or the text with <br> line breaks."""
+    html = answer_list_html(answer)
+    if html is not None or answer in (None, '', 0):
+        return html or ''
+    escaped = _js_string(answer).replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+    return '<div class="formatted-answer">' + escaped.replace('\n', '<br>') + '</div>'
+
+
+def with_answer_html(card: dict) -> dict:
+    """Add answerHtml to a card whose answer has list lines (see answer_list_html), in place."""
+    html = answer_list_html(card['answer'])
+    if html is not None:
+        card['answerHtml'] = html
+    return card
+
+
+# Same delimiters, in the same order, as renderMath() in FLASHCARDS_SCRIPT
+MATH_DELIMITERS = (('$$', '$$', True), ('$', '$', False), ('\\(', '\\)', False), ('\\[', '\\]', True))
+MATH_LEFT_RE = re.compile('|'.join(re.escape(left) for left, _, _ in MATH_DELIMITERS))
+MATH_SPECIAL_RE = re.compile(r'[\\{}]')
+LINE_BREAK_RE = re.compile(r'(\r\n|\r|\n)')
+MATH_REF = '\ue000{}\ue001'
+MAX_MATH_MEMO = 50000
+
+KATEX_WORKER_JS = r"""
+const readline = require('readline');
+const reply = (message) => process.stdout.write(JSON.stringify(message) + '\n');
+let katex;
+try {
+  katex = require(process.argv[1]);
+} catch (error) {
+  reply({ ready: false, error: String(error) });
+  process.exit(1);
+}
+if (typeof katex.renderToString !== 'function') {
+  reply({ ready: false, error: 'katex.min.js does not export renderToString' });
+  process.exit(1);
+}
+reply({ ready: true });
+
+readline.createInterface({ input: process.stdin }).on('line', (line) => {
+  if (!line.trim()) return;
+  const request = JSON.parse(line);
+  reply({ html: request.formulas.map(([tex, displayMode]) => {
+    try {
+      return katex.renderToString(tex, { displayMode, throwOnError: true });
+    } catch (error) {
+      return null;
+    }
+  }) });
+});
+"""
+
+
+def _find_end_of_math(delimiter: str, text: str, start: int) -> int:
+    # Port of auto-render's findEndOfMath: skip escaped characters and braced groups
+    end = text.find(delimiter, start)
+    if end != -1 and not MATH_SPECIAL_RE.search(text, start, end):
+        return end
+    index = start
+    braces = 0
+    while index < len(text):
+        if braces <= 0 and text.startswith(delimiter, index):
+            return index
+        character = text[index]
+        if character == '\\':
+            index += 1
+        elif character == '{':
+            braces += 1
+        elif character == '}':
+            braces -= 1
+        index += 1
+    return -1
+
+
+def split_math(text: str) -> list[Union[str, tuple[str, str, bool]]]:
+    """Split text at math delimiters exactly as KaTeX auto-render does.
+
+    Returns plain text strings and (tex, raw, display) tuples, raw being the
+    formula with its delimiters.
+    """
+    parts: list[Union[str, tuple[str, str, bool]]] = []
+    while True:
+        match = MATH_LEFT_RE.search(text)
+        if not match:
+            break
+        if match.start():
+            parts.append(text[:match.start()])
+            text = text[match.start():]
+        left, right, display = next(delimiter for delimiter in MATH_DELIMITERS if text.startswith(delimiter[0]))
+        end = _find_end_of_math(right, text, len(left))
+        if end == -1:
+            break
+        parts.append((text[len(left):end], text[:end + len(right)], display))
+        text = text[end + len(right):]
+    if text:
+        parts.append(text)
+    return parts
+
+
+class MathRenderCache:
+    """Persistent store of KaTeX output shared by every deck and skill on this machine.
+
+    Entries are keyed by TeX, display mode and KaTeX version. Once the entries
+    exceed max_bytes the least recently used are evicted, and lifetime hit and
+    miss counts are kept next to them.
+    """
+
+    def __init__(self, version: str, path: Path = MATH_CACHE_PATH, max_bytes: int = MATH_CACHE_MAX_BYTES):
+        self.version = version
+        self.max_bytes = max_bytes
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=30)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS renders (
+                tex TEXT NOT NULL,
+                display INTEGER NOT NULL,
+                version TEXT NOT NULL,
+                html TEXT,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (tex, display, version)
+            );
+            CREATE INDEX IF NOT EXISTS renders_last_used ON renders (last_used);
+            CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+            INSERT OR IGNORE INTO counters VALUES ('hits', 0), ('misses', 0);
+        """)
+
+    def get(self, formulas: list[tuple[str, bool]]) -> dict[tuple[str, bool], Optional[str]]:
+        """Return the cached formulas (None for TeX KaTeX rejected) and mark them used."""
+        found = {}
+        for tex, display in formulas:
+            row = self.db.execute(
+                'SELECT html FROM renders WHERE tex = ? AND display = ? AND version = ?',
+                (tex, display, self.version)
+            ).fetchone()
+            if row:
+                found[(tex, display)] = row[0]
+        if found:
+            with self.db:
+                self.db.executemany(
+                    'UPDATE renders SET last_used = ?, hits = hits + 1 WHERE tex = ? AND display = ? AND version = ?',
+                    [(time.time(), tex, display, self.version) for tex, display in found]
+                )
+        return found
+
+    def put(self, rendered: dict[tuple[str, bool], Optional[str]], hits: int, misses: int) -> None:
+        """Store newly rendered formulas and add a render call's hit and miss counts."""
+        now = time.time()
+        with self.db:
+            self.db.executemany(
+                'INSERT OR REPLACE INTO renders (tex, display, version, html, size, last_used) VALUES (?, ?, ?, ?, ?, ?)',
+                [
+                    (tex, display, self.version, html_out, len(tex) + len(html_out or ''), now)
+                    for (tex, display), html_out in rendered.items()
+                ]
+            )
+            self.db.execute("UPDATE counters SET value = value + ? WHERE name = 'hits'", (hits,))
+            self.db.execute("UPDATE counters SET value = value + ? WHERE name = 'misses'", (misses,))
+        if rendered:
+            self.prune(self.max_bytes)
+
+    def prune(self, max_bytes: int) -> int:
+        """Evict least recently used entries until at most max_bytes remain; returns the count."""
+        total = self.db.execute('SELECT COALESCE(SUM(size), 0) FROM renders').fetchone()[0]
+        if total <= max_bytes:
+            return 0
+        evict = []
+        for rowid, size in self.db.execute('SELECT rowid, size FROM renders ORDER BY last_used'):
+            if total <= max_bytes:
+                break
+            evict.append((rowid,))
+            total -= size
+        with self.db:
+            self.db.executemany('DELETE FROM renders WHERE rowid = ?', evict)
+        return len(evict)
+
+    def stats(self) -> dict:
+        entries, size = self.db.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM renders').fetchone()
+        counters = dict(self.db.execute('SELECT name, value FROM counters'))
+        return {
+            'entries': entries,
+            'bytes': size,
+            'hits': counters['hits'],
+            'misses': counters['misses'],
+            'versions': self.db.execute(
+                'SELECT version, COUNT(*) FROM renders GROUP BY version ORDER BY COUNT(*) DESC'
+            ).fetchall(),
+            'top': self.db.execute(
+                'SELECT tex, hits FROM renders ORDER BY hits DESC, last_used DESC LIMIT 10'
+            ).fetchall()
+        }
+
+    def close(self) -> None:
+        self.db.close()
+
+
+def katex_version(dist: Path) -> str:
+    """KaTeX version from the install's package.json, else its location and mtime."""
+    try:
+        return json.loads((dist.parent / 'package.json').read_text(encoding='utf-8'))['version']
+    except (OSError, ValueError, KeyError, TypeError):
+        return f"{dist}@{_mtime(dist)}"
+
+
+def open_math_cache(version: str) -> Optional[MathRenderCache]:
+    try:
+        return MathRenderCache(version)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"⚠ KaTeX render cache unavailable: {e}")
+        return None
+
+
+class KatexWorker:
+    """Long-lived Node process that renders TeX with the local KaTeX build.
+
+    Results are memoised by (tex, display mode) for the life of the process and
+    looked up in the persistent render cache, so a formula repeated across
+    cards, decks or runs is only rendered once. Node is only started once a
+    formula misses both.
+    """
+
+    def __init__(self, katex_js: Path, cache: Optional[MathRenderCache] = None):
+        self.katex_js = katex_js
+        self.cache = cache
+        self.process: Optional[subprocess.Popen] = None
+        self.memo: dict[tuple[str, bool], Optional[str]] = {}
+        self.failed = False
+        self.hits = 0
+        self.misses = 0
+
+    def start(self) -> None:
+        self.process = subprocess.Popen(
+            [shutil.which('node') or 'node', '-e', KATEX_WORKER_JS, str(self.katex_js)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding='utf-8',
+            bufsize=1
+        )
+        ready = self._read()
+        if not ready.get('ready'):
+            raise RuntimeError(ready.get('error', 'worker failed to start'))
+
+    def _read(self) -> dict:
+        line = self.process.stdout.readline()
+        if not line:
+            raise RuntimeError('KaTeX worker exited unexpectedly')
+        return json.loads(line)
+
+    def render(self, formulas: Iterable[tuple[str, bool]]) -> dict[tuple[str, bool], Optional[str]]:
+        """Map each (tex, display) to KaTeX HTML, or None for TeX left to the browser.
+
+        None marks TeX KaTeX rejects, and every uncached formula once the worker
+        has failed.
+        """
+        formulas = list(dict.fromkeys(formulas))
+        if len(self.memo) > MAX_MATH_MEMO:
+            self.memo.clear()
+        missing = [formula for formula in formulas if formula not in self.memo]
+        if missing and self.cache:
+            try:
+                self.memo.update(self.cache.get(missing))
+            except sqlite3.Error as e:
+                self._drop_cache(e)
+            missing = [formula for formula in missing if formula not in self.memo]
+        hits = len(formulas) - len(missing)
+        self.hits += hits
+        self.misses += len(missing)
+
+        rendered = {}
+        if missing and not self.failed:
+            try:
+                if not self.process:
+                    self.start()
+                self.process.stdin.write(json.dumps({'formulas': missing}) + '\n')
+                self.process.stdin.flush()
+                rendered = dict(zip(missing, self._read()['html']))
+                self.memo.update(rendered)
+            except (OSError, RuntimeError, ValueError) as e:
+                logger.warning(f"⚠ KaTeX worker failed, remaining math renders in the browser: {e}")
+                self.failed = True
+        if self.cache and formulas:
+            try:
+                self.cache.put(rendered, hits, len(missing))
+            except sqlite3.Error as e:
+                self._drop_cache(e)
+        return {formula: self.memo.get(formula) for formula in formulas}
+
+    def _drop_cache(self, error: Exception) -> None:
+        logger.warning(f"⚠ KaTeX render cache failed, continuing without it: {error}")
+        self.cache.close()
+        self.cache = None
+
+    def close(self) -> None:
+        if self.cache:
+            self.cache.close()
+        if not self.process:
+            return
+        if self.process.poll() is None:
+            try:
+                self.process.stdin.close()
+                self.process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+                self.process.wait()
+        self.process = None
+
+
+def get_katex_worker() -> Optional[KatexWorker]:
+    """Create the KaTeX worker once per process; None when Node or a local KaTeX is missing."""
+    global _katex_worker, _katex_worker_started
+    if _katex_worker_started:
+        return _katex_worker
+    _katex_worker_started = True
+
+    dist = find_katex_dist()
+    if not dist or not (dist / 'katex.min.js').exists() or not shutil.which('node'):
+        logger.warning("⚠ Math prerendering needs Node and a local KaTeX install; math renders in the browser")
+        return None
+    _katex_worker = KatexWorker(dist / 'katex.min.js', open_math_cache(katex_version(dist)))
+    return _katex_worker
+
+
+def show_math_cache(prune_to_mb: Optional[float] = None) -> None:
+    """Log the KaTeX render cache's size and counters, optionally pruning it first."""
+    dist = find_katex_dist()
+    cache = open_math_cache(katex_version(dist) if dist else 'none')
+    if not cache:
+        return
+    try:
+        if prune_to_mb is not None:
+            removed = cache.prune(int(prune_to_mb * (1 << 20)))
+            logger.info(f"✓ Pruned {removed} entries from {MATH_CACHE_PATH}")
+        stats = cache.stats()
+    finally:
+        cache.close()
+    lookups = stats['hits'] + stats['misses']
+    hit_rate = f"{stats['hits'] / lookups:.1%}" if lookups else 'n/a'
+    logger.info(f"KaTeX render cache: {MATH_CACHE_PATH}")
+    logger.info(
+        f"  {stats['entries']} entries, {stats['bytes'] / (1 << 20):.1f} MB "
+        f"of {MATH_CACHE_MAX_BYTES / (1 << 20):.0f} MB"
     )
+    logger.info(f"  {stats['hits']} hits, {stats['misses']} misses ({hit_rate} hit rate)")
+    for version, count in stats['versions']:
+        logger.info(f"  KaTeX {version}: {count} entries")
+    for tex, hits in stats['top']:
+        logger.info(f"  {hits:>8} hits  {tex[:60]}")
+
+
+def prerender_cards(cards: list, worker: KatexWorker, math_refs: dict[str, int], math_table: list) -> bool:
+    """Swap the formulas in each card for references to KaTeX HTML in math_table, in place.
+
+    Cards are plain text, so the page escapes them and then resolves the
+    references (see withMath() in FLASHCARDS_SCRIPT); math_table holds one
+    [raw TeX, HTML] entry per distinct formula, found through math_refs. Answers
+    are split into lines first, as the page lays them out line by line. Returns
+    True when TeX KaTeX rejects is left for the browser.
+    """
+    fields = []
+    for card in cards:
+        for name in ('question', 'answer'):
+            text = card.get(name)
+            if not isinstance(text, str) or not MATH_LEFT_RE.search(text):
+                continue
+            lines = LINE_BREAK_RE.split(text) if name == 'answer' else [text]
+            # Odd items of the split are the line breaks themselves
+            lines = [split_math(line) if index % 2 == 0 else [line] for index, line in enumerate(lines)]
+            if any(isinstance(part, tuple) for parts in lines for part in parts):
+                fields.append((card, name, [part for parts in lines for part in parts]))
+
+    rendered = worker.render(
+        (part[0], part[2]) for _, _, parts in fields for part in parts if isinstance(part, tuple)
+    )
+    runtime_math = False
+    for card, name, parts in fields:
+        output = []
+        for part in parts:
+            if isinstance(part, str):
+                output.append(part)
+            elif rendered[(part[0], part[2])] is None:
+                runtime_math = True
+                output.append(part[1])
+            else:
+                if part[1] not in math_refs:
+                    math_refs[part[1]] = len(math_table)
+                    # auto-render wraps each formula in a span as well
+                    math_table.append([part[1], f"<span>{rendered[(part[0], part[2])]}</span>"])
+                output.append(MATH_REF.format(math_refs[part[1]]))
+        card[name] = ''.join(output)
+    return runtime_math
+
+
+def without_katex_runtime(katex_assets: dict, shared_urls: Optional[dict] = None) -> tuple[dict, Optional[dict]]:
+    """Assets for a page whose math is all prerendered: KaTeX CSS and fonts, no scripts."""
+    if shared_urls:
+        shared_urls = {name: url for name, url in shared_urls.items() if name not in ('katex_js', 'auto_render_js')}
+    return {**katex_assets, 'scripts': ''}, shared_urls
+
+
+def srs_day(day: Optional[date] = None) -> int:
+    """Days since 1970-01-01 of a local calendar date, as the page counts them."""
+    return ((day or date.today()) - SRS_EPOCH).days
+
+
+def sm2_review(state: Optional[list], grade: int, day: int, timestamp: int) -> list:
+    """Apply one review to [reps, interval, ease, due, lapses, last review ms].
+
+    Mirrors sm2() in FLASHCARDS_SCRIPT, so replaying a page's review log gives
+    the same schedule the page computed.
+    """
+    reps, interval, ease, due, lapses = state[:5] if state else (0, 0, 2.5, day, 0)
+    if grade < 3:
+        reps, interval, lapses, due = 0, 1, lapses + 1, day
+    else:
+        # Math.round, not Python's round-half-to-even
+        interval = 1 if reps == 0 else 6 if reps == 1 else int(interval * ease + 0.5)
+        reps += 1
+        due = day + interval
+    ease = max(1.3, ease + 0.1 - (5 - grade) * (0.08 + (5 - grade) * 0.02))
+    return [reps, interval, ease, due, lapses, timestamp]
+
+
+def read_review_logs(paths: Iterable[str]) -> dict[str, list]:
+    """Replay review logs downloaded from the page (JSON Lines) into SM-2 state per card.
+
+    Logs may overlap (each download holds the whole history); repeated reviews
+    are counted once.
+    """
+    reviews = set()
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    review = json.loads(line)
+                    reviews.add((int(review['ts']), str(review['card']), int(review['day']), int(review['grade'])))
+                except (ValueError, KeyError, TypeError) as e:
+                    raise ValueError(f"{path}:{line_number}: invalid review record ({type(e).__name__}: {e})") from None
+
+    states: dict[str, list] = {}
+    for timestamp, key, day, grade in sorted(reviews):
+        states[key] = sm2_review(states.get(key), grade, day, timestamp)
+    return states
+
+
+def srs_card_key(card: dict, seen: set) -> str:
+    """Stable key a card's review state is stored under: its 'id', or a hash of the question."""
+    if 'id' in card:
+        base = str(card['id'])
+    else:
+        base = hashlib.sha1(str(card['question']).encode('utf-8')).hexdigest()[:12]
+    key, copy = base, 1
+    while key in seen:
+        copy += 1
+        key = f"{base}~{copy}"
+    seen.add(key)
+    return key
+
+
+def schedule_rows(batch: list, new_before: int, srs: dict) -> Iterator[dict]:
+    """Rows of the --export-schedule file for a batch of cards, new_before never-reviewed cards into the deck.
+
+    The page introduces new cards per day of review, so their due dates here
+    are a projection: new_per_day a day, in deck order, reviewing daily from
+    the build date.
+    """
+    for card in batch:
+        state = srs['reviews'].get(card['key'])
+        if state:
+            due = state[3]
+        else:
+            due = srs['start'] + new_before // srs['new_per_day']
+            new_before += 1
+        yield {
+            'card': card['key'],
+            'question': card['question'],
+            'reps': state[0] if state else 0,
+            'interval': state[1] if state else 0,
+            'ease': round(state[2], 4) if state else 2.5,
+            'lapses': state[4] if state else 0,
+            'due': (SRS_EPOCH + timedelta(days=due)).isoformat(),
+            'last_review': datetime.fromtimestamp(state[5] / 1000).isoformat(timespec='seconds') if state else None
+        }
+
+
+def _spool_cards(spool: BinaryIO, batch: list, written: int) -> None:
+    """Append a batch of cards that follows `written` earlier ones to the spool."""
+    # Serialising a whole batch per call is much faster than one dumps per card;
+    # its brackets are dropped so the batches join into one array
+    spool.write(b', ' if written else b'[')
+    spool.write(_script_json(batch)[1:-1].encode('utf-8'))
+
+
+FLASHCARD_DATA_SENTINEL = '\x00flashcard-data\x00'
+
 
-    with open(output_path, 'w', encoding='utf-8') as f:
+def stream_flashcards_html(
+    json_path: str,
+    output_path: str,
+    katex_assets: dict,
+    shared_urls: Optional[dict] = None,
+    prerender_math: bool = False,
+    srs: Optional[dict] = None,
+    background_format: str = 'png'
+) -> tuple[int, str]:
+    """Write the flashcard page one card at a time; returns (card count, title).
+
+    Cards are validated and serialised into a spool file in batches of
+    STREAM_BATCH_SIZE as they are parsed, so memory is bounded by a batch rather
+    than the deck.
+
+    With prerender_math each batch's formulas are rendered to KaTeX HTML by the
+    KaTeX worker, and the page ships no KaTeX scripts if none are left.
+
+    srs enables the spaced-repetition review mode: {'new_per_day': new cards
+    introduced per day, 'reviews': SM-2 state per card key (see read_review_logs),
+    'schedule_path': optional JSON Lines file to write every card's schedule to}.
+    background_format is the image format of inlined card backgrounds.
+    """
+    output = Path(output_path)
+    title = "Flashcards"
+    count = 0
+    worker = get_katex_worker() if prerender_math else None
+    runtime_math = False
+    math_refs: dict[str, int] = {}
+    math_table: list = []
+    card_keys: set = set()
+    new_cards = 0
+    if worker:
+        hits, misses = worker.hits, worker.misses
+    if srs is not None:
+        srs = {**srs, 'start': srs_day()}
+    with ExitStack() as stack:
+        spool = stack.enter_context(tempfile.TemporaryFile('w+b', dir=output.parent))
+        schedule = None
+        if srs and srs.get('schedule_path'):
+            schedule = stack.enter_context(open(srs['schedule_path'], 'w', encoding='utf-8'))
+
+        def flush(batch: list) -> bool:
+            """Export the batch's schedule, prerender its math and lay out its answers.
+
+            Returns True if math is left for the browser.
+            """
+            nonlocal new_cards
+            if schedule:
+                for row in schedule_rows(batch, new_cards, srs):
+                    schedule.write(json.dumps(row, ensure_ascii=False) + '\n')
+                new_cards += sum(1 for card in batch if card['key'] not in srs['reviews'])
+            runtime = bool(worker) and prerender_cards(batch, worker, math_refs, math_table)
+            for card in batch:
+                with_answer_html(card)
+            return runtime
+
+        batch = []
+        for kind, value in iter_json_records(json_path, 'flashcards'):
+            if kind == 'field':
+                key, field_value = value
+                if key == 'title':
+                    title = field_value
+                elif key == 'flashcards':
+                    raise ValueError("Invalid JSON format. Expected array or {flashcards: [], title: ''}")
+                continue
+            validate_card(value, count + 1)
+            if srs is not None:
+                value['key'] = srs_card_key(value, card_keys)
+            batch.append(value)
+            count += 1
+            if len(batch) == STREAM_BATCH_SIZE:
+                runtime_math |= flush(batch)
+                _spool_cards(spool, batch, count - len(batch))
+                batch = []
+        if batch:
+            runtime_math |= flush(batch)
+        if batch or not count:
+            _spool_cards(spool, batch, count - len(batch))
+        spool.write(b']')
+
+        if not count:
+            raise ValueError("No flashcards found in JSON")
+
+        if worker:
+            logger.info(f"Math prerendered: {worker.hits - hits} formulas cached, {worker.misses - misses} rendered")
+        if worker and not runtime_math:
+            katex_assets, shared_urls = without_katex_runtime(katex_assets, shared_urls)
+        srs_json = 'null'
+        if srs is not None:
+            reviewed = {key: state for key, state in srs['reviews'].items() if key in card_keys}
+            due_today = sum(1 for state in reviewed.values() if state[3] <= srs['start'])
+            logger.info(
+                f"Spaced repetition: {len(reviewed)} of {count} cards have review history "
+                f"({due_today} due today), {srs['new_per_day']} new cards a day"
+            )
+            srs_json = _script_json({
+                'deck': title,
+                'newPerDay': srs['new_per_day'],
+                'cards': reviewed,
+                'logFilename': f"{title}_reviews.jsonl"
+            })
+        page = render_flashcards_page(
+            title, count, FLASHCARD_DATA_SENTINEL, katex_assets, shared_urls, _script_json(math_table), srs_json,
+            background_format
+        )
+        head, tail = page.split(FLASHCARD_DATA_SENTINEL.encode('utf-8'))
+
+        spool.seek(0)
+        tmp_path = output.with_name(f".{output.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(head)
+                shutil.copyfileobj(spool, f, STREAM_READ_SIZE)
+                f.write(tail)
+            os.replace(tmp_path, output)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+    return count, title
+
+
+def _script_json(value) -> str:
+    # "</" would end the surrounding <script> element early
+    return json.dumps(value).replace('</', '<\\/')
+
+
+def generate_notebooklm_html(
+    flashcards: list,
+    output_path: str,
+    title: str = "Flashcards",
+    katex_assets: Optional[dict] = None,
+    shared_urls: Optional[dict] = None
+) -> None:
+    """Generate interactive flashcard HTML.
+
+    With shared_urls (see shared_asset_urls) the page links the shared CSS/JS files
+    instead of inlining them.
+    """
+
+    logger.info(f"Generating HTML for {len(flashcards)} flashcards...")
+
+    html = render_flashcards_html(flashcards, title, katex_assets or get_katex_assets(), shared_urls)
+
+    with open(output_path, 'wb') as f:
         f.write(html)
 
     logger.info(f"✓ Flashcards saved: {output_path}")
 
 
-def convert_json_to_flashcards(json_path: str, output_path: str) -> str:
-    """Convert JSON flashcards to interactive HTML."""
+def render_flashcards_html(
+    flashcards: list,
+    title: str,
+    katex_assets: dict,
+    shared_urls: Optional[dict] = None
+) -> bytes:
+    """Return the flashcard page for an in-memory deck as UTF-8."""
+    cards = [with_answer_html(dict(card)) for card in flashcards]
+    return render_flashcards_page(title, len(cards), _script_json(cards), katex_assets, shared_urls)
+
+
+def render_flashcards_page(
+    title: str,
+    total: int,
+    flashcards_json: str,
+    katex_assets: dict,
+    shared_urls: Optional[dict] = None,
+    math_json: str = '[]',
+    srs_json: str = 'null',
+    background_format: str = 'png'
+) -> bytes:
+    """Fill the page template around already serialised flashcard data; returns UTF-8.
+
+    math_json is the serialised table of prerendered formulas (see prerender_cards),
+    srs_json the spaced-repetition settings and schedule, or null to leave it out.
+    """
+
+    page = compiled_flashcards_page(katex_assets, shared_urls, background_format)
+    return fill_page(page, {
+        'TITLE': str(title),
+        'TOTAL': str(total),
+        'FLASHCARDS_JSON': flashcards_json,
+        'CSV_FILENAME_JSON': json.dumps(f"{title}_flashcards.csv"),
+        'MATH_JSON': math_json,
+        'SRS_JSON': srs_json
+    })
+
+
+def compiled_flashcards_page(
+    katex_assets: dict,
+    shared_urls: Optional[dict] = None,
+    background_format: str = 'png'
+) -> tuple[list[bytes], list[str]]:
+    """Return the page template with its asset slots filled, compiled once per asset set."""
+
+    key = (
+        katex_assets['styles'],
+        katex_assets['scripts'],
+        tuple(shared_urls.items()) if shared_urls else None,
+        background_format
+    )
+    page = _compiled_pages.get(key)
+    if page is not None:
+        return page
+
+    katex_styles = katex_assets['styles']
+    katex_scripts = katex_assets['scripts']
+
+    if shared_urls:
+        styles = f"    <link rel=\"stylesheet\" href=\"{shared_urls['flashcards_css']}\">"
+        inline_script = ''
+        external_script = f"\n    <script src=\"{shared_urls['flashcards_js']}\"></script>"
+        if 'katex_css' in shared_urls:
+            katex_styles = f"<link rel=\"stylesheet\" href=\"{shared_urls['katex_css']}\">"
+        if 'katex_js' in shared_urls:
+            katex_scripts = (
+                f"<script src=\"{shared_urls['katex_js']}\"></script>\n"
+                f"<script src=\"{shared_urls['auto_render_js']}\"></script>"
+            )
+    else:
+        styles = f"    <style>\n{load_flashcard_styles(background_format)}    </style>"
+        inline_script = FLASHCARDS_SCRIPT
+        external_script = ''
+
+    page = compile_page(FLASHCARDS_PAGE_TEMPLATE, {
+        'STYLES': styles,
+        'KATEX_STYLES': katex_styles,
+        'KATEX_SCRIPTS': katex_scripts,
+        'INLINE_SCRIPT': inline_script,
+        'EXTERNAL_SCRIPT': external_script
+    })
+    if len(_compiled_pages) >= MAX_COMPILED_PAGES:
+        _compiled_pages.clear()
+    _compiled_pages[key] = page
+    return page
+
+
+def write_compressed_siblings(output_path: str, formats: Iterable[str] = (), levels: Optional[dict] = None) -> dict:
+    """Write <output>.gz / <output>.br next to output_path for static servers and return the sizes.
+
+    levels maps a format to its level (gzip 1-9, brotli 0-11); formats not in
+    it use their best (gzip 9, brotli 11). Siblings of formats
+    that are not requested are removed, so a rebuilt page never has a stale one.
+    """
+    global _brotli_missing_warned
+    output = Path(output_path)
+    sizes = {'raw': output.stat().st_size}
+    for fmt, (suffix, best) in COMPRESSIONS.items():
+        target = output.with_name(output.name + suffix)
+        brotli = None
+        if fmt == 'brotli' and fmt in formats:
+            try:
+                import brotli
+            except ImportError:
+                if not _brotli_missing_warned:
+                    logger.warning("⚠ brotli is not installed (pip install brotli), skipping .br files")
+                    _brotli_missing_warned = True
+        if fmt not in formats or (fmt == 'brotli' and brotli is None):
+            target.unlink(missing_ok=True)
+            continue
+
+        level = (levels or {}).get(fmt, best)
+        tmp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        try:
+            with open(output, 'rb') as src, open(tmp_path, 'wb') as f:
+                if brotli:
+                    compressor = brotli.Compressor(quality=level)
+                    for block in iter(lambda: src.read(STREAM_READ_SIZE), b''):
+                        f.write(compressor.process(block))
+                    f.write(compressor.finish())
+                else:
+                    # mtime=0 keeps the bytes reproducible, so unchanged pages give unchanged siblings
+                    with gzip.GzipFile(filename='', mode='wb', fileobj=f, compresslevel=level, mtime=0) as gz:
+                        shutil.copyfileobj(src, gz, STREAM_READ_SIZE)
+            os.replace(tmp_path, target)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        sizes[fmt] = target.stat().st_size
+    return sizes
+
+
+def writable_compressions(formats: Iterable[str]) -> list[str]:
+    """Return the formats write_compressed_siblings can write here (brotli needs its module)."""
+    writable = []
+    for fmt in sorted(formats):
+        if fmt == 'brotli':
+            try:
+                import brotli  # noqa: F401
+            except ImportError:
+                continue
+        writable.append(fmt)
+    return writable
+
+
+def compression_report(sizes: dict) -> str:
+    """Format write_compressed_siblings sizes as 'raw 120.0 KB, gzip 30.0 KB (25%), ...'."""
+    raw = sizes['raw']
+    parts = [f"raw {raw / 1024:.1f} KB"]
+    for fmt in COMPRESSIONS:
+        if fmt in sizes:
+            parts.append(f"{fmt} {sizes[fmt] / 1024:.1f} KB ({sizes[fmt] / max(raw, 1):.0%})")
+    return ', '.join(parts)
+
+
+# Bulk export: the page's CSV download, plus TSV, JSON Lines and Anki packages, written
+# server-side one card at a time so any number of decks can be exported with bounded memory
+EXPORT_FORMATS = ('csv', 'tsv', 'jsonl', 'apkg')
+# Stable ids, so re-importing an export updates the notes instead of duplicating them
+ANKI_MODEL_ID = 1718000000001
+ANKI_MODEL_NAME = 'Open Exam Skills Basic'
+ANKI_SCHEMA = """
+CREATE TABLE col (
+    id integer primary key, crt integer not null, mod integer not null, scm integer not null,
+    ver integer not null, dty integer not null, usn integer not null, ls integer not null,
+    conf text not null, models text not null, decks text not null, dconf text not null, tags text not null
+);
+CREATE TABLE notes (
+    id integer primary key, guid text not null, mid integer not null, mod integer not null,
+    usn integer not null, tags text not null, flds text not null, sfld integer not null,
+    csum integer not null, flags integer not null, data text not null
+);
+CREATE TABLE cards (
+    id integer primary key, nid integer not null, did integer not null, ord integer not null,
+    mod integer not null, usn integer not null, type integer not null, queue integer not null,
+    due integer not null, ivl integer not null, factor integer not null, reps integer not null,
+    lapses integer not null, left integer not null, odue integer not null, odid integer not null,
+    flags integer not null, data text not null
+);
+CREATE TABLE revlog (
+    id integer primary key, cid integer not null, usn integer not null, ease integer not null,
+    ivl integer not null, lastIvl integer not null, factor integer not null, time integer not null,
+    type integer not null
+);
+CREATE TABLE graves (usn integer not null, oid integer not null, type integer not null);
+CREATE INDEX ix_notes_usn on notes (usn);
+CREATE INDEX ix_cards_usn on cards (usn);
+CREATE INDEX ix_revlog_usn on revlog (usn);
+CREATE INDEX ix_cards_nid on cards (nid);
+CREATE INDEX ix_cards_sched on cards (did, queue, due);
+CREATE INDEX ix_revlog_cid on revlog (cid);
+CREATE INDEX ix_notes_csum on notes (csum);
+"""
+ANKI_CSS = """.card {
+    font-family: arial;
+    font-size: 20px;
+    text-align: center;
+    color: black;
+    background-color: white;
+}
+.formatted-answer, ul {
+    text-align: left;
+    display: inline-block;
+}
+"""
+ANKI_DECK_CONFIG = {
+    'id': 1, 'name': 'Default', 'mod': 0, 'usn': 0, 'maxTaken': 60, 'autoplay': True, 'timer': 0,
+    'replayq': True, 'dyn': False,
+    'new': {'bury': True, 'delays': [1, 10], 'initialFactor': 2500, 'ints': [1, 4, 7], 'order': 1, 'perDay': 20,
+            'separate': True},
+    'lapse': {'delays': [10], 'leechAction': 0, 'leechFails': 8, 'minInt': 1, 'mult': 0},
+    'rev': {'bury': True, 'ease4': 1.3, 'fuzz': 0.05, 'ivlFct': 1, 'maxIvl': 36500, 'minSpace': 1, 'perDay': 100}
+}
+
+
+def anki_math(text: str) -> str:
+    """Rewrite the page's math delimiters ($...$, $$...$$) as Anki's MathJax ones (\\(...\\), \\[...\\])."""
+    if not MATH_LEFT_RE.search(text):
+        return text
+    parts = []
+    for part in split_math(text):
+        if isinstance(part, str):
+            parts.append(part)
+        else:
+            tex, _, display = part
+            parts.append(f"\\[{tex}\\]" if display else f"\\({tex}\\)")
+    return ''.join(parts)
+
+
+def anki_fields(card: dict) -> tuple[str, str]:
+    """Front and back HTML of a card's Anki note, laid out as the page shows them."""
+    question = anki_math(_js_string(card['question']))
+    question = question.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+    answer = card['answer']
+    if isinstance(answer, str):
+        answer = anki_math(answer)
+    return question.replace('\n', '<br>'), format_answer_html(answer)
+
+
+def _anki_id(name: str) -> int:
+    # In the range of the millisecond timestamps Anki itself uses as ids
+    return 1 << 40 | int(hashlib.sha1(name.encode('utf-8')).hexdigest()[:10], 16)
+
+
+class AnkiPackage:
+    """An Anki .apkg (a zipped collection.anki2 SQLite database) written one note at a time.
+
+    Notes go straight into the database on disk; close() adds the collection
+    row, which needs the deck title that may only follow the cards in the JSON.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.db_path = path.with_name(f".{path.name}.{os.getpid()}.anki2")
+        self.db_path.unlink(missing_ok=True)
+        self.db = sqlite3.connect(self.db_path)
+        # A scratch file until it is zipped: nothing to recover after a crash
+        self.db.execute('PRAGMA journal_mode = OFF')
+        self.db.execute('PRAGMA synchronous = OFF')
+        self.db.executescript(ANKI_SCHEMA)
+        self.now = int(time.time())
+        self.next_id = int(time.time() * 1000)
+        self.count = 0
+        self.keys: set = set()
+
+    def add(self, card: dict) -> None:
+        front, back = anki_fields(card)
+        sort_field = re.sub(r'<[^>]*>', '', front)
+        note_id = self.next_id + self.count
+        self.count += 1
+        guid = base64.b64encode(hashlib.sha1(srs_card_key(card, self.keys).encode('utf-8')).digest()[:8]).decode()
+        self.db.execute(
+            "INSERT INTO notes VALUES (?, ?, ?, ?, -1, ?, ?, ?, ?, 0, '')",
+            (note_id, guid, ANKI_MODEL_ID, self.now, '', f"{front}\x1f{back}", sort_field,
+             int(hashlib.sha1(sort_field.encode('utf-8')).hexdigest()[:8], 16))
+        )
+        # A new card, due in deck order; the deck id is filled in by close()
+        self.db.execute(
+            "INSERT INTO cards VALUES (?, ?, 0, 0, ?, -1, 0, 0, ?, 0, 0, 0, 0, 0, 0, 0, 0, '')",
+            (note_id, note_id, self.now, self.count)
+        )
+
+    def close(self, title: str) -> None:
+        """Write the collection row and zip the package over path."""
+        deck_id = _anki_id(title)
+        deck = {
+            'id': deck_id, 'name': title, 'desc': '', 'mod': self.now, 'usn': -1, 'dyn': 0, 'conf': 1,
+            'collapsed': False, 'browserCollapsed': False, 'extendNew': 0, 'extendRev': 0,
+            'newToday': [0, 0], 'revToday': [0, 0], 'lrnToday': [0, 0], 'timeToday': [0, 0]
+        }
+        default_deck = {**deck, 'id': 1, 'name': 'Default', 'mod': 0, 'usn': 0}
+        model = {
+            'id': ANKI_MODEL_ID, 'name': ANKI_MODEL_NAME, 'type': 0, 'mod': self.now, 'usn': -1, 'sortf': 0,
+            'did': deck_id, 'tags': [], 'vers': [], 'css': ANKI_CSS, 'req': [[0, 'any', [0]]],
+            'latexPre': '\\documentclass[12pt]{article}\n\\special{papersize=3in,5in}\n\\usepackage{amssymb,amsmath}\n'
+                        '\\pagestyle{empty}\n\\setlength{\\parindent}{0in}\n\\begin{document}\n',
+            'latexPost': '\\end{document}',
+            'flds': [
+                {'name': name, 'ord': index, 'sticky': False, 'rtl': False, 'font': 'Arial', 'size': 20, 'media': []}
+                for index, name in enumerate(('Front', 'Back'))
+            ],
+            'tmpls': [{
+                'name': 'Card 1', 'ord': 0, 'did': None, 'bqfmt': '', 'bafmt': '',
+                'qfmt': '{{Front}}', 'afmt': '{{FrontSide}}\n\n<hr id=answer>\n\n{{Back}}'
+            }]
+        }
+        conf = {
+            'activeDecks': [deck_id], 'curDeck': deck_id, 'curModel': ANKI_MODEL_ID, 'nextPos': self.count + 1,
+            'newSpread': 0, 'collapseTime': 1200, 'timeLim': 0, 'estTimes': True, 'dueCounts': True,
+            'sortType': 'noteFld', 'sortBackwards': False, 'addToCur': True
+        }
+        try:
+            with self.db:
+                self.db.execute('UPDATE cards SET did = ?', (deck_id,))
+                self.db.execute(
+                    "INSERT INTO col VALUES (1, ?, ?, ?, 11, 0, 0, 0, ?, ?, ?, ?, '{}')",
+                    (self.now, self.now * 1000, self.now * 1000, json.dumps(conf),
+                     json.dumps({str(ANKI_MODEL_ID): model}),
+                     json.dumps({'1': default_deck, str(deck_id): deck}),
+                     json.dumps({'1': ANKI_DECK_CONFIG}))
+                )
+            self.db.close()
+            tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+            try:
+                with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED) as package:
+                    package.write(self.db_path, 'collection.anki2')
+                    package.writestr('media', '{}')
+                os.replace(tmp_path, self.path)
+            finally:
+                tmp_path.unlink(missing_ok=True)
+        finally:
+            self.discard()
+
+    def discard(self) -> None:
+        self.db.close()
+        self.db_path.unlink(missing_ok=True)
+
+
+def export_flashcards(json_path: str, output_base: str, formats: Iterable[str]) -> tuple[int, dict[str, int]]:
+    """Stream a deck into <output_base>.csv/.tsv/.jsonl/.apkg in one pass; returns (card count, {format: bytes}).
+
+    The CSV has the page's downloadCSV() layout (question,answer, every field
+    quoted); the TSV has the same columns. JSON Lines keeps each card as given
+    and ends with a {"title": ...} line, so it reads back as a deck. Each file
+    is written next to its target and renamed over it once the deck is done.
+    """
+    formats = [fmt for fmt in EXPORT_FORMATS if fmt in formats]
+    targets = {fmt: Path(output_base).with_suffix(f'.{fmt}') for fmt in formats}
+    tmp_paths = {fmt: target.with_name(f".{target.name}.{os.getpid()}.tmp") for fmt, target in targets.items()}
+    title = "Flashcards"
+    count = 0
+    package = None
+    try:
+        with ExitStack() as stack:
+            files = {
+                fmt: stack.enter_context(open(tmp_paths[fmt], 'w', encoding='utf-8', newline=''))
+                for fmt in formats if fmt != 'apkg'
+            }
+            writers = {}
+            if 'csv' in files:
+                writers['csv'] = csv.writer(files['csv'], quoting=csv.QUOTE_ALL, lineterminator='\n')
+            if 'tsv' in files:
+                writers['tsv'] = csv.writer(files['tsv'], delimiter='\t', lineterminator='\n')
+            # Header unquoted, as in the page's download
+            if 'csv' in files:
+                files['csv'].write('question,answer\n')
+            if 'tsv' in files:
+                files['tsv'].write('question\tanswer\n')
+            jsonl = files.get('jsonl')
+            if 'apkg' in formats:
+                package = AnkiPackage(targets['apkg'])
+
+            for kind, value in iter_json_records(json_path, 'flashcards'):
+                if kind == 'field':
+                    key, field_value = value
+                    if key == 'title':
+                        title = str(field_value)
+                    elif key == 'flashcards':
+                        raise ValueError("Invalid JSON format. Expected array or {flashcards: [], title: ''}")
+                    continue
+                validate_card(value, count + 1)
+                count += 1
+                if writers:
+                    row = (_js_string(value['question']), _js_string(value['answer']))
+                    for writer in writers.values():
+                        writer.writerow(row)
+                if jsonl:
+                    jsonl.write(json.dumps(value, ensure_ascii=False) + '\n')
+                if package:
+                    package.add(value)
+            if not count:
+                raise ValueError("No flashcards found in JSON")
+            if jsonl:
+                jsonl.write(json.dumps({'title': title}, ensure_ascii=False) + '\n')
+
+        for fmt in files:
+            os.replace(tmp_paths[fmt], targets[fmt])
+        if package:
+            package.close(title)
+            package = None
+    finally:
+        if package:
+            package.discard()
+        for tmp_path in tmp_paths.values():
+            tmp_path.unlink(missing_ok=True)
+    return count, {fmt: target.stat().st_size for fmt, target in targets.items()}
+
+
+def converter_version() -> str:
+    """Digest of this converter's source, so any code change invalidates earlier builds."""
+    global _converter_version
+    if _converter_version is None:
+        _converter_version = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:16]
+    return _converter_version
+
+
+def asset_version() -> str:
+    """Identify the KaTeX install and confetti images pages are built against."""
+    dist = find_katex_dist()
+    katex = f"{dist}@{_mtime(dist)}" if dist else 'cdn'
+    script_dir = Path(__file__).parent
+    confetti = [_mtime(script_dir / name) for name in ("Confetti_black.png", "Confetti_white.png")]
+    return f"{katex}; confetti@{confetti}"
+
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_build_manifest(output_dir: Path) -> dict:
+    try:
+        return json.loads((output_dir / BUILD_MANIFEST_NAME).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+def write_build_manifest(output_dir: Path, manifest: dict) -> None:
+    path = output_dir / BUILD_MANIFEST_NAME
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        tmp_path.write_text(json.dumps(manifest, sort_keys=True), encoding='utf-8')
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"⚠ Build manifest not saved: {e}")
+
+
+def check_build(
+    input_path: str,
+    output_path: str,
+    options: dict,
+    manifest: dict,
+    force: bool = False
+) -> tuple[Optional[str], Optional[dict]]:
+    """Return (reason to rebuild or None if current, build state to record).
+
+    The input is only re-hashed when its size or mtime changed since the last build.
+    Missing siblings that can be written now (see writable_compressions) also
+    trigger a rebuild.
+    The output is also rebuilt when a file the build deployed (see deployed_files) is gone.
+    """
+    previous = manifest.get(Path(output_path).name)
+    try:
+        stat = Path(input_path).stat()
+        input_stat = [stat.st_size, stat.st_mtime_ns]
+        if previous and previous.get('input_stat') == input_stat:
+            digest = previous['input']
+        else:
+            digest = _file_digest(Path(input_path))
+    except OSError:
+        return 'input unreadable', None
+
+    state = {
+        'input': digest,
+        'input_stat': input_stat,
+        'converter': converter_version(),
+        'assets': asset_version(),
+        'options': options
+    }
+    if force:
+        return 'forced', state
+    if not previous:
+        return 'not built before', state
+    for field in ('input', 'converter', 'assets', 'options'):
+        if previous.get(field) != state[field]:
+            return f"{field} changed", state
+    written = previous.get('compressed', [])
+    if set(options['compress']) - set(written):
+        # e.g. brotli was missing at build time and has been installed since
+        added = sorted(set(writable_compressions(options['compress'])) - set(written))
+        if added:
+            return f"{', '.join(added)} sibling not written yet", state
+    try:
+        output_stat = Path(output_path).stat()
+    except OSError:
+        return 'output missing', state
+    if previous.get('output_stat') != [output_stat.st_size, output_stat.st_mtime_ns]:
+        return 'output modified', state
+    output_dir = Path(output_path).resolve().parent
+    for name in previous.get('files', []):
+        if not os.path.exists(output_dir / name):
+            return f"{name} missing", state
+    return None, state
+
+
+def deployed_files(
+    output_path: str,
+    katex_assets: dict,
+    sizes: dict,
+    fonts_root: Optional[str] = None,
+    shared_assets: Optional[dict] = None
+) -> list[str]:
+    """List the files deployed along with the page, relative to its directory.
+
+    These are the compressed siblings in sizes, the shared assets (card
+    backgrounds included) and the KaTeX fonts.
+    """
+    output = Path(output_path).resolve()
+    files = [output.with_name(output.name + COMPRESSIONS[fmt][0]) for fmt in sizes if fmt != 'raw']
+    fonts_base = None
+    if shared_assets:
+        assets_root = Path(shared_assets['root'])
+        files += [assets_root / filename for filename in shared_assets['files'].values()]
+        files += [assets_root / filename for filename in shared_assets['images']]
+        if 'katex_css' in shared_assets['files']:
+            fonts_base = assets_root
+    else:
+        fonts_base = Path(fonts_root).resolve() if fonts_root else output.parent
+    fonts_dir = katex_assets.get('fonts_dir')
+    if fonts_base and fonts_dir and fonts_dir.exists():
+        files += [fonts_base / 'fonts' / font.name for font in fonts_dir.glob('*') if font.is_file()]
+    return sorted(Path(os.path.relpath(path, output.parent)).as_posix() for path in files)
+
+
+def record_build(
+    output_path: str,
+    state: dict,
+    manifest: dict,
+    files: Iterable[str] = (),
+    sizes: Optional[dict] = None
+) -> None:
+    """Add the build of output_path to manifest, with its deployed files and the siblings in sizes."""
+    stat = Path(output_path).stat()
+    manifest[Path(output_path).name] = {
+        **state,
+        'output_stat': [stat.st_size, stat.st_mtime_ns],
+        'files': list(files),
+        'compressed': sorted(fmt for fmt in sizes or () if fmt != 'raw')
+    }
+
+
+def convert_json_to_flashcards(
+    json_path: str,
+    output_path: str,
+    katex_assets: Optional[dict] = None,
+    fonts_mode: str = 'link',
+    fonts_root: Optional[str] = None,
+    asset_mode: str = 'inline',
+    assets_dir: Optional[str] = None,
+    force: bool = False,
+    dry_run: bool = False,
+    prerender_math: bool = False,
+    spaced_repetition: bool = False,
+    new_per_day: int = SRS_NEW_PER_DAY,
+    review_logs: Optional[list[str]] = None,
+    schedule_path: Optional[str] = None,
+    background_format: str = 'png',
+    compress: Iterable[str] = (),
+    compress_levels: Optional[dict] = None
+) -> str:
+    """Convert JSON flashcards to interactive HTML.
+
+    asset_mode='shared' writes the CSS/JS/KaTeX files once into assets_dir
+    (default: <output dir>/assets) and links them from the page. prerender_math
+    renders formulas to KaTeX HTML at build time (see stream_flashcards_html).
+
+    spaced_repetition adds the SM-2 review mode, introducing new_per_day new cards
+    a day and starting from the reviews in review_logs; schedule_path also writes
+    each card's schedule as JSON Lines (and always rebuilds).
+
+    background_format ('png', 'webp' or 'avif') is the image format of the card
+    backgrounds; see card_background.
+
+    compress lists the precompressed siblings ('gzip', 'brotli') to write next
+    to the page, at compress_levels (default: each format's best).
+
+    The build is skipped when the output directory's build manifest shows the
+    output is current; force rebuilds anyway and dry_run only reports.
+    """
 
     logger.info("=" * 60)
     logger.info("FLASHCARDS CONVERSION STARTED")
@@ -685,35 +2646,82 @@ def convert_json_to_flashcards(json_path: str, output_path: str) -> str:
     if not os.path.exists(json_path):
         raise FileNotFoundError(f"Input file not found: {json_path}")
 
-    # Load JSON
-    with open(json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    # Validate structure
-    if isinstance(data, dict) and 'flashcards' in data:
-        flashcards = data['flashcards']
-        title = data.get('title', 'Flashcards')
-    elif isinstance(data, list):
-        flashcards = data
-        title = "Flashcards"
+    output_dir = Path(output_path).resolve().parent
+    if asset_mode == 'shared':
+        assets_dir = assets_dir or str(output_dir / 'assets')
     else:
-        raise ValueError("Invalid JSON format. Expected array or {flashcards: [], title: ''}")
-
-    if not flashcards:
-        raise ValueError("No flashcards found in JSON")
-
-    # Validate each flashcard has question and answer
-    for i, card in enumerate(flashcards):
-        if 'question' not in card or 'answer' not in card:
-            raise ValueError(f"Card {i+1} missing 'question' or 'answer' field")
-
-    logger.info(f"Loaded {len(flashcards)} flashcards")
+        assets_dir = None
+    options = {
+        'fonts_mode': fonts_mode,
+        'fonts_root': str(Path(fonts_root).resolve()) if fonts_root else None,
+        'asset_mode': asset_mode,
+        'assets_dir': str(Path(assets_dir).resolve()) if assets_dir else None,
+        'prerender_math': prerender_math,
+        'spaced_repetition': {
+            'new_per_day': new_per_day,
+            'review_logs': [_file_digest(Path(path)) for path in review_logs or ()]
+        } if spaced_repetition else None,
+        'background_format': background_format,
+        'compress': sorted(compress),
+        'compress_levels': compress_levels or None
+    }
+    reason, state = check_build(
+        json_path, output_path, options, read_build_manifest(output_dir), force or bool(schedule_path)
+    )
+    if reason is None:
+        logger.info(f"✓ Up to date: {output_path}")
+        return output_path
+    if dry_run:
+        logger.info(f"Would rebuild: {output_path} ({reason})")
+        return output_path
+
+    srs = None
+    if spaced_repetition:
+        srs = {
+            'new_per_day': new_per_day,
+            'reviews': read_review_logs(review_logs or ()),
+            'schedule_path': schedule_path
+        }
+
+    # Stream, validate and write the cards
+    katex_assets = katex_assets or get_katex_assets()
+    if asset_mode == 'shared':
+        shared_assets = publish_shared_assets(katex_assets, assets_dir, fonts_mode, background_format)
+        count, title = stream_flashcards_html(
+            json_path,
+            output_path,
+            katex_assets,
+            shared_asset_urls(shared_assets, output_path),
+            prerender_math,
+            srs
+        )
+    else:
+        shared_assets = None
+        count, title = stream_flashcards_html(
+            json_path,
+            output_path,
+            localize_katex_assets(katex_assets, output_path, fonts_root),
+            prerender_math=prerender_math,
+            srs=srs,
+            background_format=background_format
+        )
+        ensure_katex_fonts(output_path, katex_assets['fonts_dir'], fonts_mode, fonts_root)
+
+    logger.info(f"Wrote {count} flashcards")
     logger.info(f"Title: {title}")
-
-    # Generate HTML
-    katex_assets = get_katex_assets()
-    generate_notebooklm_html(flashcards, output_path, title, katex_assets)
-    ensure_katex_fonts(output_path, katex_assets['fonts_dir'])
+    if schedule_path:
+        logger.info(f"✓ Review schedule saved: {schedule_path}")
+    sizes = write_compressed_siblings(output_path, compress, compress_levels)
+    if compress:
+        logger.info(f"Compressed: {compression_report(sizes)}")
+
+    # Re-read so builds of sibling outputs finished meanwhile are kept
+    build_manifest = read_build_manifest(output_dir)
+    record_build(
+        output_path, state, build_manifest,
+        deployed_files(output_path, katex_assets, sizes, fonts_root, shared_assets), sizes
+    )
+    write_build_manifest(output_dir, build_manifest)
 
     file_size = os.path.getsize(output_path) / 1024
 
@@ -725,6 +2733,129 @@ def convert_json_to_flashcards(json_path: str, output_path: str) -> str:
     return output_path
 
 
+def collect_batch_jobs(
+    output_dir: str,
+    input_dir: Optional[str] = None,
+    pattern: str = '*.json',
+    manifest: Optional[str] = None
+) -> list[tuple[str, str]]:
+    """Pair every batch input with its output HTML path under output_dir.
+
+    Raises ValueError if two inputs would write the same output, or an output
+    would land outside output_dir (a manifest entry with '..').
+    """
+    output_root = Path(output_dir)
+    resolved_root = output_root.resolve()
+    jobs = []
+    sources: dict[Path, Path] = {}
+
+    def add_job(input_path: Path, relative: Path) -> None:
+        output_path = output_root / relative.with_suffix('.html')
+        resolved = output_path.resolve()
+        if not resolved.is_relative_to(resolved_root):
+            raise ValueError(f"{input_path}: output {output_path} is outside {output_dir}")
+        source = input_path.resolve()
+        if resolved in sources:
+            if sources[resolved] != source:
+                raise ValueError(f"{input_path} and {sources[resolved]} would both write {output_path}")
+            return  # the same input listed twice
+        sources[resolved] = source
+        jobs.append((str(input_path), str(output_path)))
+
+    if input_dir:
+        input_root = Path(input_dir)
+        for input_path in sorted(input_root.glob(pattern)):
+            if input_path.is_file() and input_path.name != BUILD_MANIFEST_NAME:
+                relative = input_path.relative_to(input_root)
+                add_job(input_path, relative)
+
+    if manifest:
+        manifest_path = Path(manifest)
+        for line in manifest_path.read_text(encoding='utf-8').splitlines():
+            entry = line.strip()
+            if not entry or entry.startswith('#'):
+                continue
+            input_path = Path(entry)
+            if input_path.is_absolute():
+                relative = Path(input_path.name)
+            else:
+                relative = input_path
+                input_path = manifest_path.parent / input_path
+            add_job(input_path, relative)
+
+    return jobs
+
+
+_batch_export_formats: tuple[str, ...] = ()
+
+
+def _init_export_worker(formats: tuple[str, ...]) -> None:
+    global _batch_export_formats
+    _batch_export_formats = formats
+
+
+def _export_batch_job(job: tuple[str, str]) -> tuple[str, str, float, Optional[str], int, Optional[dict]]:
+    input_path, output_path = job
+    start = time.perf_counter()
+    try:
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        count, sizes = export_flashcards(input_path, output_path, _batch_export_formats)
+    except Exception as e:
+        return input_path, output_path, time.perf_counter() - start, f"{type(e).__name__}: {e}", 0, None
+    return input_path, output_path, time.perf_counter() - start, None, count, sizes
+
+
+def export_flashcards_batch(
+    jobs: list[tuple[str, str]],
+    formats: Iterable[str],
+    workers: Optional[int] = None
+) -> list[tuple[str, str, float, Optional[str], int, Optional[dict]]]:
+    """Export many decks on a process pool, each streamed by one worker (see export_flashcards).
+
+    Each result is (input, output, seconds, error, card count, {format: bytes}).
+    Exports are always rewritten; they are cheap next to building the pages.
+    """
+    started = time.perf_counter()
+    formats = tuple(fmt for fmt in EXPORT_FORMATS if fmt in formats)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    logger.info(f"Exporting {len(jobs)} decks to {', '.join(formats)} with {workers} worker(s)")
+
+    if workers == 1:
+        _init_export_worker(formats)
+        results = [_export_batch_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_export_worker, initargs=(formats,)) as executor:
+            results = list(executor.map(_export_batch_job, jobs, chunksize=16))
+
+    totals: dict[str, int] = {}
+    cards = 0
+    for input_path, output_path, elapsed, error, count, sizes in results:
+        if error:
+            logger.error(f"✗ {input_path}: {error}")
+            continue
+        report = ', '.join(f"{fmt} {size / 1024:.1f} KB" for fmt, size in sizes.items())
+        logger.info(f"✓ {input_path} → {Path(output_path).with_suffix('')}.* ({count} cards, {elapsed * 1000:.1f} ms; {report})")
+        cards += count
+        for fmt, size in sizes.items():
+            totals[fmt] = totals.get(fmt, 0) + size
+
+    timings = [elapsed for _, _, elapsed, error, _, _ in results if not error]
+    failed = len(results) - len(timings)
+    total = time.perf_counter() - started
+    if timings:
+        logger.info(
+            f"Per-deck export: mean {sum(timings) / len(timings) * 1000:.1f} ms, "
+            f"max {max(timings) * 1000:.1f} ms; {cards} cards, {cards / max(total, 1e-9):.0f} cards/s"
+        )
+        logger.info("Exported total: " + ', '.join(f"{fmt} {size / 1024:.1f} KB" for fmt, size in totals.items()))
+    summary = f"Export finished: {len(timings)} exported, {failed} failed in {total:.2f}s"
+    if failed:
+        logger.warning(summary)
+    else:
+        logger.success(summary)
+    return results
+
+
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -732,7 +2863,6 @@ def main():
     )
     parser.add_argument(
         "--input", "-i",
-        required=True,
         help="Input JSON file path"
     )
     parser.add_argument(
@@ -740,11 +2870,206 @@ def main():
         default="flashcards.html",
         help="Output HTML file path (default: flashcards.html)"
     )
+    parser.add_argument(
+        "--export",
+        nargs="+",
+        choices=EXPORT_FORMATS,
+        help="Write the deck as CSV, TSV, JSON Lines and/or an Anki package next to --output instead of the page"
+    )
+    parser.add_argument(
+        "--input-dir",
+        help="Batch export: every matching JSON file in this directory (needs --export)"
+    )
+    parser.add_argument(
+        "--glob",
+        default="*.json",
+        help="Batch export: file pattern inside --input-dir (default: *.json)"
+    )
+    parser.add_argument(
+        "--manifest",
+        help="Batch export: text file listing input JSON files, one per line"
+    )
+    parser.add_argument(
+        "--output-dir",
+        help="Batch export: directory for the exported files"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Batch export: worker processes (default: CPU count)"
+    )
+    parser.add_argument(
+        "--fonts-mode",
+        choices=FONT_MODES,
+        default="link",
+        help="How KaTeX fonts are deployed: hard link from the shared store (default), symlink, or copy"
+    )
+    parser.add_argument(
+        "--fonts-root",
+        help="Deploy KaTeX fonts once into <dir>/fonts and reference them from the page"
+    )
+    parser.add_argument(
+        "--asset-mode",
+        choices=ASSET_MODES,
+        default="inline",
+        help="inline: self-contained page (default); shared: link content-hashed CSS/JS/KaTeX files"
+    )
+    parser.add_argument(
+        "--assets-dir",
+        help="Shared asset mode: directory for the asset files (default: assets/ next to the output)"
+    )
+    parser.add_argument(
+        "--prerender-math",
+        action="store_true",
+        help="Render formulas to KaTeX HTML at build time (needs Node and a local KaTeX install)"
+    )
+    parser.add_argument(
+        "--background-format",
+        choices=BACKGROUND_FORMATS,
+        default="png",
+        help="Card background image format; webp/avif need cwebp/avifenc and fall back to png (default: png)"
+    )
+    parser.add_argument(
+        "--spaced-repetition",
+        action="store_true",
+        help="Add an SM-2 review mode that schedules cards and keeps progress in the browser"
+    )
+    parser.add_argument(
+        "--new-per-day",
+        type=int,
+        default=SRS_NEW_PER_DAY,
+        help=f"Spaced repetition: new cards introduced per day (default: {SRS_NEW_PER_DAY})"
+    )
+    parser.add_argument(
+        "--review-log",
+        action="append",
+        metavar="PATH",
+        help="Spaced repetition: review log downloaded from the page to start from (repeatable)"
+    )
+    parser.add_argument(
+        "--export-schedule",
+        metavar="PATH",
+        help="Spaced repetition: also write every card's schedule to PATH as JSON Lines"
+    )
+    parser.add_argument(
+        "--compress",
+        nargs="+",
+        choices=tuple(COMPRESSIONS),
+        default=[],
+        help="Also write precompressed <output>.gz and/or <output>.br for static file servers"
+    )
+    parser.add_argument(
+        "--gzip-level",
+        type=int,
+        help="gzip level 1-9 for --compress (default: 9)"
+    )
+    parser.add_argument(
+        "--brotli-level",
+        type=int,
+        help="brotli quality 0-11 for --compress (default: 11)"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rebuild even when the build manifest says the output is current"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Report whether the output would be rebuilt, without writing anything"
+    )
+    parser.add_argument(
+        "--refresh-asset-cache",
+        action="store_true",
+        help="Re-resolve cached KaTeX asset locations"
+    )
+    parser.add_argument(
+        "--math-cache-stats",
+        action="store_true",
+        help="Show the size and hit rate of the KaTeX render cache used by --prerender-math"
+    )
+    parser.add_argument(
+        "--prune-math-cache",
+        type=float,
+        metavar="MB",
+        help="Evict least recently used KaTeX renders until the cache is at most MB (0 empties it)"
+    )
 
     args = parser.parse_args()
 
+    if args.refresh_asset_cache:
+        refresh_asset_cache()
+    if args.math_cache_stats or args.prune_math_cache is not None:
+        show_math_cache(args.prune_math_cache)
+    if args.refresh_asset_cache or args.math_cache_stats or args.prune_math_cache is not None:
+        if not (args.input or args.input_dir or args.manifest):
+            return
+
+    if args.input_dir or args.manifest:
+        if args.input:
+            parser.error("--input cannot be combined with --input-dir/--manifest")
+        if not args.export:
+            parser.error("--export is required with --input-dir/--manifest (batch mode exports decks)")
+        if not args.output_dir:
+            parser.error("--output-dir is required in batch mode")
+        if args.workers is not None and args.workers < 1:
+            parser.error("--workers must be at least 1")
+        try:
+            jobs = collect_batch_jobs(args.output_dir, args.input_dir, args.glob, args.manifest)
+        except ValueError as e:
+            parser.error(str(e))
+        if not jobs:
+            parser.error("No input files found for batch mode")
+        results = export_flashcards_batch(jobs, args.export, args.workers)
+        if any(error for _, _, _, error, _, _ in results):
+            sys.exit(1)
+        return
+
+    if not args.input:
+        parser.error("--input is required")
+    if (args.review_log or args.export_schedule) and not args.spaced_repetition:
+        parser.error("--review-log and --export-schedule need --spaced-repetition")
+    if args.new_per_day < 1:
+        parser.error("--new-per-day must be at least 1")
+    if args.gzip_level is not None and not 1 <= args.gzip_level <= 9:
+        parser.error("--gzip-level must be between 1 and 9")
+    if args.brotli_level is not None and not 0 <= args.brotli_level <= 11:
+        parser.error("--brotli-level must be between 0 and 11")
+    compress_levels = {
+        fmt: level for fmt, level in (("gzip", args.gzip_level), ("brotli", args.brotli_level)) if level is not None
+    }
+    if args.asset_mode == "shared" and args.fonts_root:
+        parser.error("--fonts-root cannot be combined with --asset-mode shared (fonts go to <assets-dir>/fonts)")
+
     try:
-        result = convert_json_to_flashcards(args.input, args.output)
+        if args.export:
+            count, sizes = export_flashcards(args.input, args.output, args.export)
+            for fmt, size in sizes.items():
+                print(f"✓ {fmt.upper()} export: {Path(args.output).with_suffix(f'.{fmt}')} ({size / 1024:.1f} KB)")
+            print(f"✓ {count} flashcards exported")
+            return
+
+        result = convert_json_to_flashcards(
+            args.input,
+            args.output,
+            fonts_mode=args.fonts_mode,
+            fonts_root=args.fonts_root,
+            asset_mode=args.asset_mode,
+            assets_dir=args.assets_dir,
+            force=args.force,
+            dry_run=args.dry_run,
+            prerender_math=args.prerender_math,
+            spaced_repetition=args.spaced_repetition,
+            new_per_day=args.new_per_day,
+            review_logs=args.review_log,
+            schedule_path=args.export_schedule,
+            background_format=args.background_format,
+            compress=args.compress,
+            compress_levels=compress_levels
+        )
+        if args.dry_run:
+            return
 
         if os.path.exists(result):
             size = os.path.getsize(result) / 1024
@@ -756,6 +3081,8 @@ def main():
             print("  • Press Space to flip")
             print("  • Press ← → to navigate")
             print("  • Click download icon for CSV export")
+            if args.spaced_repetition:
+                print("  • Click the calendar icon to review due cards (grade with 1-4)")
         else:
             print(f"✗ Error: File not created at {result}")
             sys.exit(1)
@@ -4,25 +4,50 @@ Pure frontend conversion - no LLM required
 """
 
 import argparse
+import gzip
+import hashlib
+import html
+import json
 import os
+import queue
 import subprocess
 import sys
 import re
 import shutil
+import threading
+import time
+import unicodedata
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from html.parser import HTMLParser
 from pathlib import Path
+from typing import Callable, Iterable, Optional
 from loguru import logger
 
 logger.remove()
 logger.add(sys.stderr, level="INFO")
 
+CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')) / 'open-exam-skills'
+ASSET_INDEX_PATH = CACHE_DIR / 'asset-index.json'
+FONT_STORE_DIR = CACHE_DIR / 'fonts'
+FONT_MODES = ('link', 'symlink', 'copy')
+ASSET_MODES = ('inline', 'shared')
+BUILD_MANIFEST_NAME = '.build-manifest.json'
+NPM_CACHE = Path.home() / '.npm' / '_npx'
+COMPRESSIONS = {'gzip': ('.gz', 9), 'brotli': ('.br', 11)}
+STREAM_READ_SIZE = 1 << 16
 
-def inject_custom_features(html_path: str) -> None:
-    """Inject custom JavaScript for default collapse and export functionality."""
+_lookup_memo: dict[str, Optional[Path]] = {}
+_font_digests: dict[tuple[str, int, float], str] = {}
+_shared_asset_names: dict[tuple[str, str], str] = {}
+_converter_version: Optional[str] = None
+_brotli_missing_warned = False
 
-    logger.info("Injecting custom features...")
 
-    with open(html_path, 'r', encoding='utf-8') as f:
-        html_content = f.read()
+def inject_custom_features(html_content: str) -> str:
+    """Inject custom JavaScript for export and click-to-discuss functionality."""
+
+    logger.info("Injecting custom features...")
 
     # Custom JavaScript to add features
     custom_script = """
@@ -170,37 +195,6 @@ def inject_custom_features(html_path: str) -> None:
       document.body.removeChild(link);
     }
 
-    // Collapse to first level only on load
-    function collapseToFirstLevel() {
-      const svg = document.querySelector('svg');
-      if (!svg) return;
-
-      const allNodes = svg.querySelectorAll('g[data-depth]');
-      allNodes.forEach(node => {
-        const depth = parseInt(node.getAttribute('data-depth'));
-        // Collapse everything except root (depth 0) and first level (depth 1)
-        if (depth > 1) {
-          const circle = node.querySelector('circle');
-          if (circle && circle.classList.contains('markmap-node')) {
-            // Trigger collapse by simulating click
-            const nodeData = node.__data__;
-            if (nodeData && nodeData.children && nodeData.p) {
-              nodeData.p = nodeData.children;
-              delete nodeData.children;
-            }
-          }
-        }
-      });
-
-      // Force redraw if markmap instance is available
-      if (mm && mm.Markmap) {
-        const svg = document.querySelector('svg');
-        if (svg && svg.__markmap) {
-          svg.__markmap.fit();
-        }
-      }
-    }
-
     function svgToDataUrl(svgString) {
       const encoded = btoa(unescape(encodeURIComponent(svgString)));
       return `data:image/svg+xml;base64,${encoded}`;
@@ -429,17 +423,6 @@ def inject_custom_features(html_path: str) -> None:
       });
     }, 500);
 
-    // Initial collapse to first level - wait for SVG to be ready
-    function tryCollapse() {
-      const svg = document.querySelector('svg');
-      if (svg) {
-        collapseToFirstLevel();
-      } else {
-        setTimeout(tryCollapse, 100);
-      }
-    }
-    setTimeout(tryCollapse, 100);
-
 })(); // End of IIFE
 </script>
 """
@@ -447,11 +430,100 @@ def inject_custom_features(html_path: str) -> None:
     # Insert custom script before closing body tag
     html_content = html_content.replace('</body>', f'{custom_script}</body>')
 
-    # Write modified HTML back
-    with open(html_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-
     logger.info("✓ Custom features injected")
+    return html_content
+
+
+def _mtime(path: Path) -> Optional[float]:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return None
+
+
+def _read_asset_index() -> dict:
+    try:
+        return json.loads(ASSET_INDEX_PATH.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_asset_index(index: dict) -> None:
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = ASSET_INDEX_PATH.with_name(f"{ASSET_INDEX_PATH.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(index, indent=2), encoding='utf-8')
+        os.replace(tmp_path, ASSET_INDEX_PATH)
+    except OSError as e:
+        logger.debug(f"Asset index not saved: {e}")
+
+
+def _indexed_lookup(
+    key: str,
+    roots: list[Path],
+    resolve: Callable[[], Optional[Path]],
+    refresh: bool = False
+) -> Optional[Path]:
+    """Reuse a previous glob result while its search roots and the result itself are unchanged.
+
+    Results are memoised per process and indexed on disk, shared with the quiz and
+    flashcards skills, so repeated runs skip globbing the npx cache.
+    """
+    if not refresh and key in _lookup_memo:
+        return _lookup_memo[key]
+
+    stamp = {str(root): _mtime(root) for root in roots}
+    index = _read_asset_index()
+    entry = index.get(key)
+    if not refresh and entry and entry.get('roots') == stamp:
+        cached = Path(entry['path']) if entry.get('path') else None
+        if cached is None or _mtime(cached) == entry.get('mtime'):
+            _lookup_memo[key] = cached
+            return cached
+
+    result = resolve()
+    index[key] = {
+        'roots': stamp,
+        'path': str(result) if result else None,
+        'mtime': _mtime(result) if result else None
+    }
+    _write_asset_index(index)
+    _lookup_memo[key] = result
+    return result
+
+
+def _latest_npx_match(pattern: str) -> Optional[Path]:
+    if not NPM_CACHE.exists():
+        return None
+    candidates = list(NPM_CACHE.glob(pattern))
+    if not candidates:
+        return None
+    return max(candidates, key=lambda path: path.stat().st_mtime)
+
+
+def find_markmap_cli(refresh: bool = False) -> Optional[Path]:
+    return _indexed_lookup(
+        'markmap-cli',
+        [NPM_CACHE],
+        lambda: _latest_npx_match('*/node_modules/markmap-cli/bin/cli.js'),
+        refresh
+    )
+
+
+def find_markmap_katex_fonts(refresh: bool = False) -> Optional[Path]:
+    return _indexed_lookup(
+        'markmap-katex-fonts',
+        [NPM_CACHE],
+        lambda: _latest_npx_match('*/node_modules/markmap-cli/dist/assets/katex@*/dist/fonts'),
+        refresh
+    )
+
+
+def refresh_asset_cache() -> None:
+    """Forget cached markmap-cli/KaTeX lookups and resolve them again."""
+    cli_js = find_markmap_cli(refresh=True)
+    fonts = find_markmap_katex_fonts(refresh=True)
+    logger.success(f"Asset cache refreshed: markmap-cli={cli_js or 'npx'}, KaTeX fonts={fonts or 'not found'}")
 
 
 def get_markmap_command() -> list[str]:
@@ -461,51 +533,1421 @@ def get_markmap_command() -> list[str]:
     if markmap_bin:
         return [markmap_bin]
 
-    npm_cache = Path.home() / '.npm' / '_npx'
-    if npm_cache.exists():
-        candidates = list(npm_cache.glob('*/node_modules/markmap-cli/bin/cli.js'))
-        if candidates:
-            latest = max(candidates, key=lambda path: path.stat().st_mtime)
-            node_bin = shutil.which('node') or 'node'
-            return [node_bin, str(latest)]
+    cli_js = find_markmap_cli()
+    if cli_js:
+        node_bin = shutil.which('node') or 'node'
+        return [node_bin, str(cli_js)]
 
     return ['npx', '-y', 'markmap-cli']
 
 
-def ensure_katex_fonts(html_path: str) -> None:
-    """Copy KaTeX fonts next to the output HTML if needed."""
+def _font_digest(font_file: Path) -> str:
+    stat = font_file.stat()
+    key = (str(font_file), stat.st_size, stat.st_mtime)
+    if key not in _font_digests:
+        _font_digests[key] = hashlib.sha256(font_file.read_bytes()).hexdigest()
+    return _font_digests[key]
+
+
+def _store_font(font_file: Path) -> Path:
+    """Place a font in the content-addressed store once and return the stored path."""
+    stored = FONT_STORE_DIR / f"{_font_digest(font_file)}{font_file.suffix}"
+    if not stored.exists():
+        FONT_STORE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = stored.with_name(f"{stored.name}.{os.getpid()}.tmp")
+        shutil.copy2(font_file, tmp_path)
+        os.replace(tmp_path, stored)
+    return stored
+
+
+def _font_is_current(dest: Path, source: Path) -> bool:
+    try:
+        dest_stat = dest.stat()
+    except OSError:
+        return False
+    source_stat = source.stat()
+    if os.path.samestat(dest_stat, source_stat):
+        return True
+    if dest_stat.st_size != source_stat.st_size:
+        return False
+    if dest_stat.st_mtime == source_stat.st_mtime:
+        return True
+    return hashlib.sha256(dest.read_bytes()).hexdigest() == _font_digest(source)
+
+
+def _deploy_font(font_file: Path, dest: Path, mode: str) -> str:
+    """Put one font at dest; returns 'unchanged', 'linked', 'symlinked' or 'copied'."""
+    source = font_file
+    if mode != 'copy':
+        try:
+            source = _store_font(font_file)
+        except OSError as e:
+            logger.debug(f"Font store unavailable, copying instead: {e}")
+            mode = 'copy'
+
+    if _font_is_current(dest, source):
+        return 'unchanged'
+
+    tmp_path = dest.with_name(f".{dest.name}.{os.getpid()}.tmp")
+    tmp_path.unlink(missing_ok=True)
+    result = 'copied'
+    try:
+        if mode == 'link':
+            os.link(source, tmp_path)
+            result = 'linked'
+        elif mode == 'symlink':
+            os.symlink(source, tmp_path)
+            result = 'symlinked'
+    except OSError:
+        # Hard links cannot cross filesystems; symlinks may be disallowed
+        result = 'copied'
+    if result == 'copied':
+        shutil.copy2(font_file, tmp_path)
+    os.replace(tmp_path, dest)
+    return result
+
+
+def deploy_fonts(fonts_dir: Path, dest_dir: Path, mode: str = 'link') -> dict:
+    """Deploy every font in fonts_dir into dest_dir, skipping files that are already current."""
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    counts: dict[str, int] = {}
+    for font_file in sorted(fonts_dir.glob('*')):
+        if font_file.is_file():
+            state = _deploy_font(font_file, dest_dir / font_file.name, mode)
+            counts[state] = counts.get(state, 0) + 1
+    return counts
 
-    with open(html_path, 'r', encoding='utf-8') as f:
-        html_content = f.read()
+
+def ensure_katex_fonts(
+    html_content: str,
+    html_path: str,
+    mode: str = 'link',
+    fonts_root: Optional[str] = None,
+    deployed: Optional[list] = None
+) -> str:
+    """Deploy KaTeX fonts next to the output HTML (or under fonts_root) if the page uses them.
+
+    Returns the page, with font URLs pointed at fonts_root when one is given.
+    A caller passing deployed gets the font paths appended to it.
+    """
 
     if 'katex' not in html_content or 'fonts/KaTeX_' not in html_content:
-        return
+        return html_content
 
     output_dir = Path(html_path).resolve().parent
-    fonts_dir = output_dir / 'fonts'
+    base_dir = Path(fonts_root).resolve() if fonts_root else output_dir
+    fonts_dir = base_dir / 'fonts'
 
-    npm_cache = Path.home() / '.npm' / '_npx'
-    if not npm_cache.exists():
+    if not NPM_CACHE.exists():
         logger.warning("KaTeX fonts not copied: npm cache not found")
-        return
+        return html_content
 
-    font_paths = list(npm_cache.glob('*/node_modules/markmap-cli/dist/assets/katex@*/dist/fonts'))
-    if not font_paths:
+    source_fonts = find_markmap_katex_fonts()
+    if not source_fonts:
         logger.warning("KaTeX fonts not copied: markmap-cli assets not found")
+        return html_content
+
+    counts = deploy_fonts(source_fonts, fonts_dir, mode)
+    if deployed is not None:
+        deployed.extend(fonts_dir / font.name for font in source_fonts.glob('*') if font.is_file())
+
+    prefix = Path(os.path.relpath(base_dir, output_dir)).as_posix()
+    if prefix != '.':
+        html_content = html_content.replace('url(fonts/', f'url({prefix}/fonts/')
+
+    summary = ', '.join(f"{count} {state}" for state, count in sorted(counts.items()))
+    logger.info(f"✓ KaTeX fonts deployed to: {fonts_dir} ({summary})")
+    return html_content
+
+
+def write_atomic(path: str, content: str) -> None:
+    """Write content to a sibling temp file and rename it over path."""
+
+    target = Path(path)
+    tmp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, target)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def write_compressed_siblings(output_path: str, formats: Iterable[str] = (), levels: Optional[dict] = None) -> dict:
+    """Write <output>.gz / <output>.br next to output_path for static servers and return the sizes.
+
+    levels maps a format to its level (gzip 1-9, brotli 0-11); formats not in
+    it use their best (gzip 9, brotli 11). Siblings of formats
+    that are not requested are removed, so a rebuilt page never has a stale one.
+    """
+    global _brotli_missing_warned
+    output = Path(output_path)
+    sizes = {'raw': output.stat().st_size}
+    for fmt, (suffix, best) in COMPRESSIONS.items():
+        target = output.with_name(output.name + suffix)
+        brotli = None
+        if fmt == 'brotli' and fmt in formats:
+            try:
+                import brotli
+            except ImportError:
+                if not _brotli_missing_warned:
+                    logger.warning("⚠ brotli is not installed (pip install brotli), skipping .br files")
+                    _brotli_missing_warned = True
+        if fmt not in formats or (fmt == 'brotli' and brotli is None):
+            target.unlink(missing_ok=True)
+            continue
+
+        level = (levels or {}).get(fmt, best)
+        tmp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        try:
+            with open(output, 'rb') as src, open(tmp_path, 'wb') as f:
+                if brotli:
+                    compressor = brotli.Compressor(quality=level)
+                    for block in iter(lambda: src.read(STREAM_READ_SIZE), b''):
+                        f.write(compressor.process(block))
+                    f.write(compressor.finish())
+                else:
+                    # mtime=0 keeps the bytes reproducible, so unchanged pages give unchanged siblings
+                    with gzip.GzipFile(filename='', mode='wb', fileobj=f, compresslevel=level, mtime=0) as gz:
+                        shutil.copyfileobj(src, gz, STREAM_READ_SIZE)
+            os.replace(tmp_path, target)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        sizes[fmt] = target.stat().st_size
+    return sizes
+
+
+def writable_compressions(formats: Iterable[str]) -> list[str]:
+    """Return the formats write_compressed_siblings can write here (brotli needs its module)."""
+    writable = []
+    for fmt in sorted(formats):
+        if fmt == 'brotli':
+            try:
+                import brotli  # noqa: F401
+            except ImportError:
+                continue
+        writable.append(fmt)
+    return writable
+
+
+def compression_report(sizes: dict) -> str:
+    """Format write_compressed_siblings sizes as 'raw 120.0 KB, gzip 30.0 KB (25%), ...'."""
+    raw = sizes['raw']
+    parts = [f"raw {raw / 1024:.1f} KB"]
+    for fmt in COMPRESSIONS:
+        if fmt in sizes:
+            parts.append(f"{fmt} {sizes[fmt] / 1024:.1f} KB ({sizes[fmt] / max(raw, 1):.0%})")
+    return ', '.join(parts)
+
+
+# Inline blocks below this size stay in the page; a request costs more than the bytes
+MIN_SHARED_ASSET_BYTES = 1024
+INLINE_ASSET_RE = re.compile(r'<(script|style)>(.*?)</\1>', re.S)
+
+
+def write_shared_asset(assets_root: Path, name: str, suffix: str, content: str) -> str:
+    """Write content once as <name>.<hash><suffix> in assets_root and return the file name."""
+    key = (str(assets_root), content)
+    if key in _shared_asset_names:
+        return _shared_asset_names[key]
+
+    data = content.encode('utf-8')
+    filename = f"{name}.{hashlib.sha256(data).hexdigest()[:16]}{suffix}"
+    path = assets_root / filename
+    if not path.exists():
+        assets_root.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{filename}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    _shared_asset_names[key] = filename
+    return filename
+
+
+def externalize_page_assets(
+    html_content: str,
+    html_path: str,
+    assets_dir: str,
+    fonts_mode: str = 'link',
+    deployed: Optional[list] = None
+) -> str:
+    """Move the page's static <style>/<script> blocks into content-hashed files under assets_dir.
+
+    The block that embeds this page's mind map data stays inline, as do tiny blocks.
+    KaTeX fonts go to <assets_dir>/fonts, next to the externalised KaTeX CSS.
+    A caller passing deployed gets the asset and font paths appended to it.
+    """
+
+    assets_root = Path(assets_dir).resolve()
+    ensure_katex_fonts(html_content, str(assets_root / 'index.html'), fonts_mode, deployed=deployed)
+    prefix = Path(os.path.relpath(assets_root, Path(html_path).resolve().parent)).as_posix()
+
+    def externalize(match: re.Match) -> str:
+        tag, body = match.group(1), match.group(2)
+        if len(body) < MIN_SHARED_ASSET_BYTES or 'Markmap.create' in body:
+            return match.group(0)
+        if tag == 'style':
+            filename = write_shared_asset(assets_root, 'mindmap', '.css', body)
+            if deployed is not None:
+                deployed.append(assets_root / filename)
+            return f'<link rel="stylesheet" href="{prefix}/{filename}">'
+        filename = write_shared_asset(assets_root, 'mindmap', '.js', body)
+        if deployed is not None:
+            deployed.append(assets_root / filename)
+        return f'<script src="{prefix}/{filename}"></script>'
+
+    return INLINE_ASSET_RE.sub(externalize, html_content)
+
+
+MARKMAP_TIMEOUT = 60
+
+# Node side of MarkmapWorker: one JSON request per stdin line, one JSON reply per stdout line.
+# console output from markmap-cli is diverted to stderr so it cannot corrupt the protocol.
+MARKMAP_WORKER_JS = r"""
+const { pathToFileURL } = require('url');
+const readline = require('readline');
+const reply = (message) => process.stdout.write(JSON.stringify(message) + '\n');
+console.log = console.info = (...args) => process.stderr.write(args.join(' ') + '\n');
+
+(async () => {
+  const mod = await import(pathToFileURL(process.argv[1]).href);
+  const createMarkmap = mod.createMarkmap || (mod.default && mod.default.createMarkmap);
+  if (typeof createMarkmap !== 'function') {
+    reply({ ready: false, error: 'markmap-cli does not export createMarkmap' });
+    process.exit(1);
+  }
+  reply({ ready: true });
+
+  for await (const line of readline.createInterface({ input: process.stdin })) {
+    if (!line.trim()) continue;
+    const request = JSON.parse(line);
+    try {
+      await createMarkmap({ content: request.content, output: request.output, offline: true, open: false });
+      reply({ id: request.id, ok: true });
+    } catch (error) {
+      reply({ id: request.id, ok: false, error: String((error && error.stack) || error) });
+    }
+  }
+})().catch((error) => {
+  reply({ ready: false, error: String((error && error.stack) || error) });
+  process.exit(1);
+});
+"""
+
+
+def find_markmap_package() -> Optional[Path]:
+    """Locate the installed markmap-cli package directory (global bin or npx cache)."""
+
+    candidates = []
+    markmap_bin = shutil.which("markmap")
+    if markmap_bin:
+        candidates.append(Path(markmap_bin).resolve())
+    cli_js = find_markmap_cli()
+    if cli_js:
+        candidates.append(cli_js)
+
+    for cli in candidates:
+        package_dir = cli.parent.parent
+        if cli.name == 'cli.js' and (package_dir / 'package.json').exists():
+            return package_dir
+    return None
+
+
+def find_markmap_entry() -> Optional[Path]:
+    """Locate markmap-cli's library entry point, which the render worker imports."""
+
+    package_dir = find_markmap_package()
+    if not package_dir:
+        return None
+    try:
+        package = json.loads((package_dir / 'package.json').read_text(encoding='utf-8'))
+    except ValueError:
+        return None
+    entry = package_dir / (package.get('main') or 'dist/index.js')
+    return entry if entry.exists() else None
+
+
+class MarkmapWorker:
+    """Long-lived Node process that renders Markdown documents through markmap-cli.
+
+    Starting Node and resolving markmap-cli dominates a per-file subprocess, so batch
+    conversions stream every document through one worker instead. A worker that dies
+    or hangs is restarted and the document is retried once.
+    """
+
+    def __init__(self, entry: Path, timeout: float = MARKMAP_TIMEOUT):
+        self.entry = entry
+        self.timeout = timeout
+        self.process: Optional[subprocess.Popen] = None
+        self.restarts = 0
+        self._replies: queue.Queue = queue.Queue()
+        self._exited = threading.Event()
+        self._next_id = 0
+
+    @classmethod
+    def create(cls, timeout: float = MARKMAP_TIMEOUT) -> Optional['MarkmapWorker']:
+        """Start a worker, or return None when only the npx fallback is available."""
+        entry = find_markmap_entry()
+        if not entry or not shutil.which('node'):
+            return None
+        worker = cls(entry, timeout)
+        try:
+            worker.start()
+        except RuntimeError as e:
+            logger.warning(f"markmap worker unavailable, using markmap-cli per file: {e}")
+            worker.close()
+            return None
+        return worker
+
+    def start(self) -> None:
+        self._replies = queue.Queue()
+        self._exited = threading.Event()
+        self.process = subprocess.Popen(
+            [shutil.which('node') or 'node', '-e', MARKMAP_WORKER_JS, str(self.entry)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding='utf-8',
+            bufsize=1
+        )
+        threading.Thread(
+            target=self._read_replies,
+            args=(self.process, self._replies, self._exited),
+            daemon=True
+        ).start()
+
+        ready = self._wait_for(lambda message: 'ready' in message)
+        if not ready.get('ready'):
+            raise RuntimeError(ready.get('error', 'worker failed to start'))
+        logger.info(f"✓ markmap worker started (pid {self.process.pid})")
+
+    @staticmethod
+    def _read_replies(process: subprocess.Popen, replies: queue.Queue, exited: threading.Event) -> None:
+        for line in process.stdout:
+            try:
+                replies.put(json.loads(line))
+            except ValueError:
+                continue
+        exited.set()
+        replies.put(None)
+
+    def _wait_for(self, matches: Callable[[dict], bool]) -> dict:
+        deadline = time.monotonic() + self.timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise subprocess.TimeoutExpired('markmap worker', self.timeout)
+            try:
+                message = self._replies.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            if message is None:
+                raise RuntimeError('markmap worker exited unexpectedly')
+            if matches(message):
+                return message
+
+    def render(self, content: str, output_path: str) -> None:
+        """Render one Markdown document to an offline HTML file."""
+        try:
+            reply = self._request(content, output_path)
+        except (OSError, RuntimeError, subprocess.TimeoutExpired) as e:
+            logger.warning(f"markmap worker failed ({e}), restarting")
+            self.restart()
+            reply = self._request(content, output_path)
+
+        if not reply.get('ok'):
+            raise RuntimeError(f"Failed to generate HTML: {reply.get('error')}")
+
+    def _request(self, content: str, output_path: str) -> dict:
+        if not self.process or self._exited.is_set() or self.process.poll() is not None:
+            raise RuntimeError('markmap worker is not running')
+        self._next_id += 1
+        request_id = self._next_id
+        request = {'id': request_id, 'content': content, 'output': str(Path(output_path).resolve())}
+        self.process.stdin.write(json.dumps(request) + '\n')
+        self.process.stdin.flush()
+        return self._wait_for(lambda message: message.get('id') == request_id)
+
+    def restart(self) -> None:
+        self.close()
+        self.restarts += 1
+        self.start()
+
+    def close(self) -> None:
+        if not self.process:
+            return
+        if self.process.poll() is None:
+            try:
+                self.process.stdin.close()
+                self.process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+                self.process.wait()
+        self.process = None
+
+    def __enter__(self) -> 'MarkmapWorker':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+RENDERERS = ('auto', 'python', 'cli')
+# Levels below the root shown when a page opens; -1 shows the whole map
+DEFAULT_INITIAL_DEPTH = 1
+MARKMAP_CDN_VERSION = '0.18'
+
+HEADING_RE = re.compile(r'^(#{1,6})[ \t]+(.*?)(?:[ \t]+#+)?[ \t]*$')
+LIST_ITEM_RE = re.compile(r'^([ \t]*)([-*+]|\d{1,9}[.)])[ \t]+(.*)$')
+UNSUPPORTED_BLOCK_RE = re.compile(r'^[ \t]*(```|~~~|>|\||<|!\[|\$\$|(?:[-*_=][ \t]*){3,}$)')
+UNSUPPORTED_INLINE_RE = re.compile(r'[<>\\$]|&#?\w+;|!\[')
+CODE_SPAN_RE = re.compile(r'`([^`]+)`')
+LINK_RE = re.compile(r'\[([^\[\]]+)\]\(([^()\s]+)\)')
+STRONG_RE = re.compile(r'\*\*([^*\s](?:[^*]*[^*\s])?)\*\*')
+EM_RE = re.compile(r'(?<![*\w])\*([^*\s](?:[^*]*[^*\s])?)\*(?![*\w])')
+MARKMAP_ROOT_RE = re.compile(r'\(\) => window\.markmap,\s*(?:null|[\w.]+),\s*')
+
+MARKMAP_HTML_TEMPLATE = """<!doctype html>
+<html>
+<head>
+<meta charset="UTF-8">
+<meta http-equiv="X-UA-Compatible" content="IE=edge">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<title>Markmap</title>
+<style>
+* {
+  margin: 0;
+  padding: 0;
+}
+#mindmap {
+  display: block;
+  width: 100vw;
+  height: 100vh;
+}
+</style>
+@@STYLES@@
+</head>
+<body>
+<svg id="mindmap"></svg>
+@@SCRIPTS@@
+<script>((getMarkmap, getOptions, root2, jsonOptions) => {
+  const markmap = getMarkmap();
+  window.mm = markmap.Markmap.create(
+    "svg#mindmap",
+    (getOptions || markmap.deriveOptions)(jsonOptions),
+    root2
+  );
+})(() => window.markmap, null, @@ROOT@@, {})</script>
+</body>
+</html>
+"""
+
+MARKMAP_TOOLBAR_SCRIPT = """<script>((r) => {
+  setTimeout(r);
+})(() => {
+  const { markmap, mm } = window;
+  const { el } = markmap.Toolbar.create(mm);
+  el.setAttribute("style", "position:absolute;bottom:20px;right:20px");
+  document.body.append(el);
+})</script>"""
+
+_markmap_assets_memo: dict[bool, Optional[dict]] = {}
+
+
+class UnsupportedMarkdownError(ValueError):
+    """Raised when Markdown uses constructs the in-process renderer does not handle."""
+
+
+def _render_inline(text: str, line_number: int) -> str:
+    """Render the inline Markdown subset markmap headings and list items typically use."""
+
+    code_spans = []
+
+    def stash_code(match: re.Match) -> str:
+        code_spans.append(f"<code>{html.escape(match.group(1), quote=True)}</code>")
+        return f"\x00{len(code_spans) - 1}\x00"
+
+    rendered = CODE_SPAN_RE.sub(stash_code, text)
+    if UNSUPPORTED_INLINE_RE.search(rendered):
+        raise UnsupportedMarkdownError(f"line {line_number}: inline HTML, escapes or math")
+
+    rendered = html.escape(rendered, quote=True)
+    rendered = LINK_RE.sub(r'<a href="\2">\1</a>', rendered)
+    rendered = STRONG_RE.sub(r'<strong>\1</strong>', rendered)
+    rendered = EM_RE.sub(r'<em>\1</em>', rendered)
+
+    leftover = re.sub(r'<a href="[^"]*">|</?(?:a|strong|em)>', '', rendered)
+    if re.search(r'[*`\[\]~]|(?<!\w)_|_(?!\w)', leftover):
+        raise UnsupportedMarkdownError(f"line {line_number}: emphasis or link syntax")
+
+    return re.sub(r'\x00(\d+)\x00', lambda match: code_spans[int(match.group(1))], rendered)
+
+
+def build_markmap_tree(markdown_content: str) -> dict:
+    """Parse headings and lists into markmap's node tree ({content, children, payload}).
+
+    Raises UnsupportedMarkdownError for anything beyond that subset (code blocks,
+    tables, HTML, math, multi-line or indented paragraphs, ...) so callers can
+    fall back to markmap-cli, which understands full Markdown.
+    """
+
+    root = {'content': '', 'children': [], 'payload': {}}
+    headings = [(0, root)]
+    list_items: list[tuple[int, dict]] = []
+    previous_kind = 'blank'
+
+    lines = markdown_content.splitlines()
+    if lines and lines[0].strip() == '---':
+        raise UnsupportedMarkdownError("line 1: front matter")
+
+    for index, line in enumerate(lines):
+        line_number = index + 1
+        if not line.strip():
+            previous_kind = 'blank'
+            continue
+        if UNSUPPORTED_BLOCK_RE.match(line):
+            raise UnsupportedMarkdownError(f"line {line_number}: unsupported block syntax")
+
+        heading = HEADING_RE.match(line)
+        item = LIST_ITEM_RE.match(line)
+        if heading:
+            level = len(heading.group(1))
+            while headings[-1][0] >= level:
+                headings.pop()
+            node = {
+                'content': _render_inline(heading.group(2), line_number),
+                'children': [],
+                'payload': {'tag': f'h{level}', 'lines': f'{index},{index + 1}'}
+            }
+            headings[-1][1]['children'].append(node)
+            headings.append((level, node))
+            list_items = []
+            previous_kind = 'heading'
+        elif item:
+            indent = len(item.group(1).expandtabs(4))
+            content = item.group(3)
+            if re.match(r'\[[ xX]\]', content):
+                raise UnsupportedMarkdownError(f"line {line_number}: task list")
+            if item.group(2)[0].isdigit():
+                content = f"{item.group(2)[:-1]}. {content}"
+            while list_items and list_items[-1][0] >= indent:
+                list_items.pop()
+            parent = list_items[-1][1] if list_items else headings[-1][1]
+            node = {
+                'content': _render_inline(content, line_number),
+                'children': [],
+                'payload': {'tag': 'li', 'lines': f'{index},{index + 1}'}
+            }
+            parent['children'].append(node)
+            list_items.append((indent, node))
+            previous_kind = 'item'
+        else:
+            # An indented paragraph may continue a list item or be a code block; either
+            # way it is not a node of its own
+            if previous_kind in ('paragraph', 'item') or line[0] in ' \t':
+                raise UnsupportedMarkdownError(f"line {line_number}: multi-line or indented paragraph")
+            node = {
+                'content': _render_inline(line.strip(), line_number),
+                'children': [],
+                'payload': {'tag': 'p', 'lines': f'{index},{index + 1}'}
+            }
+            headings[-1][1]['children'].append(node)
+            list_items = []
+            previous_kind = 'paragraph'
+
+    # Like markmap-lib, a document with a single top-level node uses it as the root
+    if len(root['children']) == 1:
+        return root['children'][0]
+    return root
+
+
+def find_markmap_assets(allow_cdn: bool = False) -> Optional[dict]:
+    """Load the d3/markmap-view/toolbar bundles markmap-cli ships for --offline output.
+
+    Returns None when no local markmap-cli assets exist, unless allow_cdn is set,
+    in which case the page links the CDN builds instead.
+    """
+
+    if allow_cdn in _markmap_assets_memo:
+        return _markmap_assets_memo[allow_cdn]
+
+    assets = None
+    package_dir = find_markmap_package()
+    assets_dir = package_dir / 'dist' / 'assets' if package_dir else None
+
+    def latest(pattern: str) -> Optional[Path]:
+        matches = list(assets_dir.glob(pattern)) if assets_dir and assets_dir.exists() else []
+        return max(matches, key=lambda path: path.stat().st_mtime) if matches else None
+
+    d3_js = latest('d3@*/dist/d3.min.js')
+    view_js = latest('markmap-view@*/dist/browser/index.js')
+    if d3_js and view_js:
+        toolbar_js = latest('markmap-toolbar@*/dist/index.js')
+        toolbar_css = latest('markmap-toolbar@*/dist/style.css')
+        scripts = [
+            f"<script>{d3_js.read_text(encoding='utf-8')}</script>",
+            f"<script>{view_js.read_text(encoding='utf-8')}</script>"
+        ]
+        styles = []
+        if toolbar_js and toolbar_css:
+            scripts.append(f"<script>{toolbar_js.read_text(encoding='utf-8')}</script>")
+            scripts.append(MARKMAP_TOOLBAR_SCRIPT)
+            styles.append(f"<style>{toolbar_css.read_text(encoding='utf-8')}</style>")
+        assets = {'styles': '\n'.join(styles), 'scripts': '\n'.join(scripts)}
+    elif allow_cdn:
+        cdn = 'https://cdn.jsdelivr.net/npm'
+        assets = {
+            'styles': f'<link rel="stylesheet" href="{cdn}/markmap-toolbar@{MARKMAP_CDN_VERSION}/dist/style.css">',
+            'scripts': '\n'.join([
+                f'<script src="{cdn}/d3@7"></script>',
+                f'<script src="{cdn}/markmap-view@{MARKMAP_CDN_VERSION}/dist/browser/index.js"></script>',
+                f'<script src="{cdn}/markmap-toolbar@{MARKMAP_CDN_VERSION}/dist/index.js"></script>',
+                MARKMAP_TOOLBAR_SCRIPT
+            ])
+        }
+
+    _markmap_assets_memo[allow_cdn] = assets
+    return assets
+
+
+def _markmap_root_json(tree: dict) -> str:
+    return json.dumps(tree, ensure_ascii=False).replace('</', '<\\/')
+
+
+def render_markmap_html(tree: dict, assets: dict) -> str:
+    """Embed a markmap node tree in the same page shell markmap-cli produces."""
+
+    return (
+        MARKMAP_HTML_TEMPLATE
+        .replace('@@STYLES@@', assets['styles'])
+        .replace('@@SCRIPTS@@', assets['scripts'])
+        .replace('@@ROOT@@', _markmap_root_json(tree))
+    )
+
+
+def _find_markmap_tree(page: str) -> Optional[tuple[dict, int, int]]:
+    match = MARKMAP_ROOT_RE.search(page)
+    if not match:
+        return None
+    try:
+        tree, end = json.JSONDecoder().raw_decode(page, match.end())
+    except ValueError:
+        return None
+    return (tree, match.end(), end) if isinstance(tree, dict) else None
+
+
+def markmap_tree_from_html(page: str) -> Optional[dict]:
+    """The node tree a markmap page passes to Markmap.create, or None if the page has none."""
+    found = _find_markmap_tree(page)
+    return found[0] if found else None
+
+
+def fold_markmap_tree(tree: dict, initial_depth: int) -> int:
+    """Fold every branch initial_depth or more levels below the root; returns how many were folded.
+
+    markmap skips the children of nodes whose payload has fold set, so the page
+    lays out only what is visible. Folds already in the tree are kept.
+    """
+
+    if initial_depth < 0:
+        return 0
+    folded = 0
+    stack = [(tree, 0)]
+    while stack:
+        node, depth = stack.pop()
+        children = node.get('children')
+        if not children:
+            continue
+        if depth >= initial_depth:
+            payload = node.get('payload') or {}
+            if not payload.get('fold'):
+                node['payload'] = {**payload, 'fold': 1}
+                folded += 1
+        stack.extend((child, depth + 1) for child in children)
+    return folded
+
+
+def fold_markmap_page(page: str, initial_depth: int) -> str:
+    """Set the fold flags of fold_markmap_tree in a page rendered by markmap-cli."""
+
+    if initial_depth < 0:
+        return page
+    found = _find_markmap_tree(page)
+    if not found:
+        logger.warning("⚠ No markmap data found in the page, it opens fully expanded")
+        return page
+    tree, start, end = found
+    if not fold_markmap_tree(tree, initial_depth):
+        return page
+    return page[:start] + _markmap_root_json(tree) + page[end:]
+
+
+# Sharded maps: the top of a large tree stays in the page, deeper branches load on expand.
+# Shards are scripts rather than .json so pages opened from file:// can load them too.
+SHARD_PLACEHOLDER = {'content': '…', 'children': [], 'payload': {}}
+MARKMAP_SHARD_SCRIPT = """<script>
+(() => {
+  // Branches with payload.shard have their children in a sidecar script, loaded on first expand
+  const mm = window.mm;
+  if (!mm || typeof mm.toggleNode !== 'function') return;
+  const loading = {};
+  const resolvers = {};
+  window.markmapShard = (src, children) => {
+    if (resolvers[src]) resolvers[src](children);
+  };
+
+  function loadShard(src) {
+    if (!loading[src]) {
+      loading[src] = new Promise((resolve, reject) => {
+        const script = document.createElement('script');
+        resolvers[src] = resolve;
+        script.src = src;
+        script.onload = () => script.remove();
+        script.onerror = () => {
+          delete loading[src];
+          script.remove();
+          reject(new Error('Failed to load ' + src));
+        };
+        document.head.appendChild(script);
+      });
+    }
+    return loading[src];
+  }
+
+  const toggleNode = mm.toggleNode.bind(mm);
+  mm.toggleNode = async (node, recursive) => {
+    const src = node.payload && node.payload.shard;
+    if (!src) return toggleNode(node, recursive);
+    const children = await loadShard(src);
+    const { shard, ...payload } = node.payload;
+    node.children = children;
+    node.payload = { ...payload, fold: 0 };
+    await mm.setData(mm.state.data);
+  };
+})();
+</script>
+"""
+
+
+def shard_markmap_tree(tree: dict, shard_nodes: int, shard_url: str) -> tuple[dict, list[list[dict]]]:
+    """Split a markmap tree into the part kept in the page and shards of at most shard_nodes nodes.
+
+    The page and every shard are filled breadth first: a branch's children are
+    kept while they fit in the budget, counting a placeholder for each child that
+    has children of its own. A branch whose children do not fit is folded, shows
+    one placeholder child and has payload.shard set to shard_url with the index of
+    the shard holding its children. The page always keeps the root's children
+    and a shard its top level, so a branch wider than the budget still makes one
+    (larger) shard. Returns (page tree, shards); the input tree is not modified.
+    """
+
+    shards: list[list[dict]] = []
+
+    def cut(nodes: list[dict]) -> list[dict]:
+        copies = [dict(node) for node in nodes]
+        pending = deque(zip(nodes, copies))
+        used = len(nodes) + sum(1 for node in nodes if node.get('children'))
+        while pending:
+            node, copy = pending.popleft()
+            children = node.get('children')
+            if not children:
+                continue
+            # The children replace this branch's placeholder and bring their own
+            cost = len(children) + sum(1 for child in children if child.get('children')) - 1
+            if used + cost <= shard_nodes:
+                used += cost
+                copy['children'] = [dict(child) for child in children]
+                pending.extend(zip(children, copy['children']))
+                continue
+            index = len(shards)
+            shards.append([])
+            shards[index] = cut(children)
+            copy['children'] = [dict(SHARD_PLACEHOLDER)]
+            copy['payload'] = {**(node.get('payload') or {}), 'fold': 1, 'shard': shard_url.format(index)}
+        return copies
+
+    page = dict(tree)
+    if tree.get('children'):
+        page['children'] = cut(tree['children'])
+    return page, shards
+
+
+def shard_dir(output_path: str) -> Path:
+    """Directory holding a page's shards: mindmap.html -> mindmap.shards/."""
+    target = Path(output_path)
+    return target.with_name(f"{target.stem}.shards")
+
+
+def write_markmap_shards(output_path: str, shards: list[list[dict]]) -> None:
+    """Write a page's shard scripts and remove ones left over from an earlier build."""
+
+    directory = shard_dir(output_path)
+    if not shards and not directory.exists():
         return
+    directory.mkdir(parents=True, exist_ok=True)
+    written = set()
+    for index, children in enumerate(shards):
+        name = f"{index}.js"
+        src = json.dumps(f"{directory.name}/{name}")
+        write_atomic(str(directory / name), f"markmapShard({src}, {json.dumps(children, ensure_ascii=False)});\n")
+        written.add(name)
+    for stale in directory.iterdir():
+        if stale.name not in written:
+            stale.unlink()
+    if not shards:
+        directory.rmdir()
+
+
+def shard_markmap_page(page: str, output_path: str, shard_nodes: int) -> str:
+    """Move the deep branches of a page's mind map into shard scripts next to output_path.
+
+    Returns the page with the trimmed tree and the shard loader; shard_nodes 0
+    only removes shards of an earlier build.
+    """
+
+    found = _find_markmap_tree(page) if shard_nodes else None
+    if shard_nodes and not found:
+        logger.warning("⚠ No markmap data found in the page, it is not sharded")
+    if not found:
+        write_markmap_shards(output_path, [])
+        return page
+
+    tree, start, end = found
+    shard_url = f"{shard_dir(output_path).name}/{{}}.js"
+    inline, shards = shard_markmap_tree(tree, shard_nodes, shard_url)
+    write_markmap_shards(output_path, shards)
+    if not shards:
+        return page
+    logger.info(f"✓ Sharded: {len(shards)} shards of up to {shard_nodes} nodes in {shard_dir(output_path).name}/")
+    page = page[:start] + _markmap_root_json(inline) + page[end:]
+    return page.replace('</body>', f'{MARKMAP_SHARD_SCRIPT}</body>', 1)
+
+
+def render_markdown_in_process(
+    markdown_content: str,
+    required: bool = False,
+    initial_depth: int = DEFAULT_INITIAL_DEPTH
+) -> Optional[str]:
+    """Build the mind map HTML without Node; returns None when markmap-cli is needed instead."""
+
+    try:
+        tree = build_markmap_tree(markdown_content)
+    except UnsupportedMarkdownError as e:
+        if required:
+            raise
+        logger.info(f"Falling back to markmap-cli ({e})")
+        return None
+
+    assets = find_markmap_assets(allow_cdn=required)
+    if not assets:
+        logger.info("Falling back to markmap-cli (no local markmap assets for offline output)")
+        return None
+    if required and '<script src=' in assets['scripts']:
+        logger.warning("Local markmap assets not found, linking CDN builds (page needs network access)")
+
+    fold_markmap_tree(tree, initial_depth)
+    logger.info("✓ Rendered in-process")
+    return render_markmap_html(tree, assets)
+
+
+def render_markdown_with_cli(
+    markdown_path: str,
+    markdown_content: str,
+    output_path: str,
+    worker: Optional[MarkmapWorker] = None
+) -> str:
+    """Render through markmap-cli (worker or subprocess) into a scratch file and return the HTML."""
+
+    target = Path(output_path)
+    raw_path = target.with_name(f".{target.name}.{os.getpid()}.markmap.html")
+    try:
+        if worker:
+            worker.render(markdown_content, str(raw_path))
+        else:
+            markmap_cmd = get_markmap_command()
+            cmd = [
+                *markmap_cmd,
+                '--offline',  # Include all assets for offline viewing
+                markdown_path,
+                '-o', str(raw_path)
+            ]
+
+            logger.info(f"Running: {' '.join(cmd)}")
+
+            result = subprocess.run(
+                cmd,
+                capture_output=True,
+                text=True,
+                timeout=MARKMAP_TIMEOUT
+            )
+
+            if result.returncode != 0:
+                logger.error(f"markmap-cli error: {result.stderr}")
+                raise RuntimeError(f"Failed to generate HTML: {result.stderr}")
+
+        if not raw_path.exists():
+            raise FileNotFoundError(f"Output file not created: {output_path}")
 
-    source_fonts = max(font_paths, key=lambda path: path.stat().st_mtime)
-    fonts_dir.mkdir(parents=True, exist_ok=True)
+        with open(raw_path, 'r', encoding='utf-8') as f:
+            return f.read()
+    finally:
+        raw_path.unlink(missing_ok=True)
+
+
+# Static images: markmap's horizontal tree laid out in Python, so thumbnails need no browser
+IMAGE_FORMATS = ('svg', 'png', 'pdf')
+SVG_FONT_SIZE = 16
+SVG_NODE_HEIGHT = 24
+SVG_PADDING_X = 8
+SVG_SPACING_X = 80
+SVG_SPACING_Y = 5
+SVG_MARGIN = 20
+# d3.schemeCategory10, which markmap cycles through by default
+SVG_COLORS = (
+    '#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd',
+    '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf'
+)
+NARROW_CHARS = frozenset("iIjl.,:;!|'`()[]{}ft")
+WIDE_CHARS = frozenset('mwMW@%')
+
+_char_widths: dict[str, float] = {}
+_svg_rasteriser: Optional[str] = None
+_svg_rasteriser_checked = False
+
+
+class _NodeTextParser(HTMLParser):
+    """Plain text of a node's HTML content; KaTeX output is reduced to its TeX source."""
+
+    def __init__(self):
+        super().__init__()
+        self.parts: list[str] = []
+        self.skip_depth = 0
+        self.in_tex = False
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        attributes = dict(attrs)
+        if self.skip_depth:
+            if tag not in ('br', 'img', 'hr'):
+                self.skip_depth += 1
+            if tag == 'annotation' and attributes.get('encoding') == 'application/x-tex':
+                self.in_tex = True
+        elif tag == 'math' or 'katex-html' in (attributes.get('class') or '').split():
+            self.skip_depth = 1
+
+    def handle_endtag(self, tag: str) -> None:
+        if self.skip_depth:
+            self.skip_depth -= 1
+            if tag == 'annotation':
+                self.in_tex = False
+
+    def handle_data(self, data: str) -> None:
+        if self.in_tex:
+            self.parts.append(f"${data}$")
+        elif not self.skip_depth:
+            self.parts.append(data)
+
+
+def node_text(content: str) -> str:
+    """Plain one-line text for a markmap node's HTML content."""
+    if '<' not in content and '&' not in content:
+        return content
+    parser = _NodeTextParser()
+    parser.feed(content)
+    parser.close()
+    return ' '.join(''.join(parser.parts).split())
+
+
+def _char_em(char: str) -> float:
+    if unicodedata.east_asian_width(char) in 'WF':
+        return 1.0
+    if char in NARROW_CHARS or char == ' ':
+        return 0.3
+    if char in WIDE_CHARS:
+        return 0.85
+    return 0.68 if char.isupper() else 0.53
+
+
+def _text_width(text: str) -> float:
+    """Approximate rendered width of text in the SVG font; there are no font metrics here."""
+    em = 0.0
+    for char in text:
+        width = _char_widths.get(char)
+        if width is None:
+            width = _char_widths[char] = _char_em(char)
+        em += width
+    return em * SVG_FONT_SIZE
+
+
+def layout_mindmap(tree: dict) -> list[dict]:
+    """Place every node of a markmap tree left to right, as the page does when fully expanded.
+
+    Returns nodes in depth-first order as {text, depth, x, y, width, parent, color,
+    has_children}, where (x, y) is the top left corner of the node's box. A child
+    starts SVG_SPACING_X right of its parent's box; leaves take consecutive rows
+    and each parent is centred on its children, so subtrees never overlap.
+    """
+    nodes: list[dict] = []
+    next_row = 0.0
+    # Iterative depth-first walk; deep outlines would hit the recursion limit
+    stack = [(tree, None, 0, 0.0, False)]
+    while stack:
+        source, parent, depth, x, done = stack.pop()
+        if done:
+            node = nodes[source]
+            first, last = node['children'][0], node['children'][-1]
+            node['y'] = (nodes[first]['y'] + nodes[last]['y']) / 2
+            continue
+        text = node_text(source.get('content', ''))
+        index = len(nodes)
+        node = {
+            'text': text,
+            'depth': depth,
+            'x': x,
+            'y': 0.0,
+            'width': _text_width(text) + 2 * SVG_PADDING_X,
+            'parent': parent,
+            'color': SVG_COLORS[index % len(SVG_COLORS)],
+            'children': []
+        }
+        nodes.append(node)
+        if parent is not None:
+            nodes[parent]['children'].append(index)
+        children = source.get('children') or []
+        if children:
+            stack.append((index, None, depth, x, True))
+            child_x = x + node['width'] + SVG_SPACING_X
+            for child in reversed(children):
+                stack.append((child, index, depth + 1, child_x, False))
+        else:
+            node['y'] = next_row
+            next_row += SVG_NODE_HEIGHT + SVG_SPACING_Y
+
+    for node in nodes:
+        node['has_children'] = bool(node.pop('children'))
+    return nodes
+
+
+def render_mindmap_svg(tree: dict) -> str:
+    """Draw a markmap tree as a standalone SVG: curved links, underlined labels, branch dots."""
+    nodes = layout_mindmap(tree)
+    right = max(node['x'] + node['width'] for node in nodes)
+    bottom = max(node['y'] for node in nodes) + SVG_NODE_HEIGHT
+    width = right + 2 * SVG_MARGIN
+    height = bottom + 2 * SVG_MARGIN
+
+    links, lines, dots, labels = [], [], [], []
+    for node in nodes:
+        x, y, node_width = node['x'], node['y'], node['width']
+        base = y + SVG_NODE_HEIGHT
+        if node['parent'] is not None:
+            parent = nodes[node['parent']]
+            x1, y1 = parent['x'] + parent['width'], parent['y'] + SVG_NODE_HEIGHT
+            middle = (x1 + x) / 2
+            links.append(
+                f'<path d="M{x1:.1f},{y1:.1f}C{middle:.1f},{y1:.1f} {middle:.1f},{base:.1f} {x:.1f},{base:.1f}" '
+                f'stroke="{node["color"]}"/>'
+            )
+        lines.append(f'<line x1="{x:.1f}" y1="{base:.1f}" x2="{x + node_width:.1f}" y2="{base:.1f}" stroke="{node["color"]}"/>')
+        if node['has_children']:
+            dots.append(f'<circle cx="{x + node_width:.1f}" cy="{base:.1f}" r="4" stroke="{node["color"]}"/>')
+        if node['text']:
+            labels.append(f'<text x="{x + SVG_PADDING_X:.1f}" y="{base - 6:.1f}">{html.escape(node["text"], quote=False)}</text>')
+
+    return ''.join([
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}" height="{height:.0f}" '
+        f'viewBox="{-SVG_MARGIN} {-SVG_MARGIN} {width:.0f} {height:.0f}">',
+        f'<rect x="{-SVG_MARGIN}" y="{-SVG_MARGIN}" width="100%" height="100%" fill="#fff"/>',
+        '<g fill="none" stroke-width="1.5">', *links, *lines, '</g>',
+        '<g fill="#fff" stroke-width="1.5">', *dots, '</g>',
+        f'<g font-family="sans-serif" font-size="{SVG_FONT_SIZE}" fill="#333">', *labels, '</g>',
+        '</svg>\n'
+    ])
+
+
+def find_svg_rasteriser() -> Optional[str]:
+    """'rsvg-convert' when it is on PATH, else 'cairosvg' when importable, else None."""
+    global _svg_rasteriser, _svg_rasteriser_checked
+    if not _svg_rasteriser_checked:
+        _svg_rasteriser_checked = True
+        if shutil.which('rsvg-convert'):
+            _svg_rasteriser = 'rsvg-convert'
+        else:
+            try:
+                import cairosvg  # noqa: F401
+                _svg_rasteriser = 'cairosvg'
+            except ImportError:
+                logger.warning("⚠ Neither rsvg-convert nor cairosvg is available, writing SVG only")
+    return _svg_rasteriser
+
+
+def rasterise_svg(svg_path: Path, output_path: Path, image_format: str, png_width: Optional[int] = None) -> bool:
+    """Convert an SVG file to PNG or PDF with the local rasteriser; returns False if there is none."""
+    rasteriser = find_svg_rasteriser()
+    if not rasteriser:
+        return False
+    tmp_path = output_path.with_name(f".{output_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    width = png_width if image_format == 'png' else None
+    try:
+        if rasteriser == 'rsvg-convert':
+            command = ['rsvg-convert', '-f', image_format, '-o', str(tmp_path)]
+            if width:
+                command += ['-w', str(width), '--keep-aspect-ratio']
+            subprocess.run([*command, str(svg_path)], check=True, capture_output=True, timeout=MARKMAP_TIMEOUT)
+        else:
+            import cairosvg
+            convert = cairosvg.svg2png if image_format == 'png' else cairosvg.svg2pdf
+            convert(url=str(svg_path), write_to=str(tmp_path), output_width=width)
+        os.replace(tmp_path, output_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return True
+
+
+def write_mindmap_images(
+    output_path: str,
+    tree: dict,
+    image_formats: Iterable[str],
+    png_width: Optional[int] = None
+) -> dict[str, float]:
+    """Write <output>.svg (and .png/.pdf) next to output_path; returns milliseconds per step.
+
+    PNG and PDF are rasterised from the SVG, which is written in any case.
+    """
+    timings = {}
+    started = time.perf_counter()
+    svg = render_mindmap_svg(tree)
+    timings['layout'] = (time.perf_counter() - started) * 1000
+    svg_path = Path(output_path).with_suffix('.svg')
+    write_atomic(str(svg_path), svg)
+    for image_format in image_formats:
+        if image_format == 'svg':
+            continue
+        started = time.perf_counter()
+        if rasterise_svg(svg_path, svg_path.with_suffix(f'.{image_format}'), image_format, png_width):
+            timings[image_format] = (time.perf_counter() - started) * 1000
+    return timings
+
+
+def image_report(timings: dict[str, float]) -> str:
+    """Format write_mindmap_images timings as 'svg 3.1 ms, png 41.0 ms'."""
+    parts = [f"svg {timings['layout']:.1f} ms"]
+    parts += [f"{image_format} {ms:.1f} ms" for image_format, ms in timings.items() if image_format != 'layout']
+    return ', '.join(parts)
+
+
+def converter_version() -> str:
+    """Digest of this converter's source, so any code change invalidates earlier builds."""
+    global _converter_version
+    if _converter_version is None:
+        _converter_version = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:16]
+    return _converter_version
+
+
+def asset_version() -> str:
+    """Identify the markmap-cli install that renders pages and supplies their assets."""
+    package_dir = find_markmap_package()
+    if package_dir:
+        return f"{package_dir}@{_mtime(package_dir / 'package.json')}"
+    return ' '.join(get_markmap_command())
+
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_build_manifest(output_dir: Path) -> dict:
+    try:
+        return json.loads((output_dir / BUILD_MANIFEST_NAME).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+def write_build_manifest(output_dir: Path, manifest: dict) -> None:
+    path = output_dir / BUILD_MANIFEST_NAME
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        tmp_path.write_text(json.dumps(manifest, sort_keys=True), encoding='utf-8')
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"⚠ Build manifest not saved: {e}")
+
+
+def check_build(
+    input_path: str,
+    output_path: str,
+    options: dict,
+    manifest: dict,
+    force: bool = False,
+    existing: Optional[set] = None
+) -> tuple[Optional[str], Optional[dict]]:
+    """Return (reason to rebuild or None if current, build state to record).
+
+    The input is only re-hashed when its size or mtime changed since the last build.
+    Missing siblings that can be written now (see writable_compressions) also
+    trigger a rebuild.
+    The output is also rebuilt when a file the build deployed (see deployed_files)
+    is gone; existing caches paths already found, for batches sharing fonts/assets.
+    """
+    previous = manifest.get(Path(output_path).name)
+    try:
+        stat = Path(input_path).stat()
+        input_stat = [stat.st_size, stat.st_mtime_ns]
+        if previous and previous.get('input_stat') == input_stat:
+            digest = previous['input']
+        else:
+            digest = _file_digest(Path(input_path))
+    except OSError:
+        return 'input unreadable', None
+
+    state = {
+        'input': digest,
+        'input_stat': input_stat,
+        'converter': converter_version(),
+        'assets': asset_version(),
+        'options': options
+    }
+    if force:
+        return 'forced', state
+    if not previous:
+        return 'not built before', state
+    for field in ('input', 'converter', 'assets', 'options'):
+        if previous.get(field) != state[field]:
+            return f"{field} changed", state
+    written = previous.get('compressed', [])
+    if set(options['compress']) - set(written):
+        # e.g. brotli was missing at build time and has been installed since
+        added = sorted(set(writable_compressions(options['compress'])) - set(written))
+        if added:
+            return f"{', '.join(added)} sibling not written yet", state
+    try:
+        output_stat = Path(output_path).stat()
+    except OSError:
+        return 'output missing', state
+    if previous.get('output_stat') != [output_stat.st_size, output_stat.st_mtime_ns]:
+        return 'output modified', state
+    output_dir = Path(output_path).resolve().parent
+    for name in previous.get('files', []):
+        path = os.path.normpath(output_dir / name)
+        if existing is not None and path in existing:
+            continue
+        if not os.path.exists(path):
+            return f"{name} missing", state
+        if existing is not None:
+            existing.add(path)
+    return None, state
+
+
+def deployed_files(
+    output_path: str,
+    paths: Iterable[Path] = (),
+    sizes: Optional[dict] = None,
+    image_timings: Optional[dict] = None
+) -> list[str]:
+    """List the files deployed along with the page, relative to its directory.
+
+    paths are the shards, shared assets and KaTeX fonts written for it; the
+    compressed siblings in sizes and the images in image_timings (as returned by
+    write_compressed_siblings and write_mindmap_images) are added.
+    """
+    output = Path(output_path).resolve()
+    files = list(paths)
+    files += [output.with_name(output.name + COMPRESSIONS[fmt][0]) for fmt in sizes or () if fmt != 'raw']
+    files += [output.with_suffix('.svg' if step == 'layout' else f'.{step}') for step in image_timings or ()]
+    return sorted({Path(os.path.relpath(path, output.parent)).as_posix() for path in files})
+
+
+def record_build(
+    output_path: str,
+    state: dict,
+    manifest: dict,
+    files: Iterable[str] = (),
+    sizes: Optional[dict] = None
+) -> None:
+    """Add the build of output_path to manifest, with its deployed files and the siblings in sizes."""
+    stat = Path(output_path).stat()
+    manifest[Path(output_path).name] = {
+        **state,
+        'output_stat': [stat.st_size, stat.st_mtime_ns],
+        'files': list(files),
+        'compressed': sorted(fmt for fmt in sizes or () if fmt != 'raw')
+    }
 
-    for font_file in source_fonts.glob('*'):
-        if font_file.is_file():
-            shutil.copy2(font_file, fonts_dir / font_file.name)
 
-    logger.info(f"✓ KaTeX fonts copied to: {fonts_dir}")
+def _build_options(
+    fonts_mode: str,
+    fonts_root: Optional[str],
+    renderer: str,
+    asset_mode: str,
+    assets_dir: Optional[str],
+    compress: Iterable[str] = (),
+    compress_levels: Optional[dict] = None,
+    image_formats: Iterable[str] = (),
+    png_width: Optional[int] = None,
+    initial_depth: int = DEFAULT_INITIAL_DEPTH,
+    shard_nodes: int = 0
+) -> dict:
+    return {
+        'fonts_mode': fonts_mode,
+        'fonts_root': str(Path(fonts_root).resolve()) if fonts_root else None,
+        'renderer': renderer,
+        'asset_mode': asset_mode,
+        'assets_dir': str(Path(assets_dir).resolve()) if assets_dir else None,
+        'compress': sorted(compress),
+        'compress_levels': compress_levels or None,
+        'image_formats': sorted(image_formats),
+        'png_width': png_width,
+        'initial_depth': initial_depth,
+        'shard_nodes': shard_nodes
+    }
 
 
-def convert_markdown_to_mindmap(markdown_path: str, output_path: str) -> str:
-    """Convert Markdown file to interactive HTML mind map using markmap-cli."""
+def convert_markdown_to_mindmap(
+    markdown_path: str,
+    output_path: str,
+    fonts_mode: str = 'link',
+    fonts_root: Optional[str] = None,
+    worker: Optional[MarkmapWorker] = None,
+    renderer: str = 'auto',
+    asset_mode: str = 'inline',
+    assets_dir: Optional[str] = None,
+    force: bool = False,
+    dry_run: bool = False,
+    build_manifest: Optional[dict] = None,
+    compress: Iterable[str] = (),
+    compress_levels: Optional[dict] = None,
+    image_formats: Iterable[str] = (),
+    png_width: Optional[int] = None,
+    initial_depth: int = DEFAULT_INITIAL_DEPTH,
+    shard_nodes: int = 0,
+    deferred: Optional[list] = None
+) -> str:
+    """Convert Markdown file to interactive HTML mind map using markmap-cli.
+
+    With renderer 'auto', headings-and-lists documents are rendered in-process
+    and anything else goes through markmap-cli; 'python' and 'cli' force one
+    path. When a MarkmapWorker is given, CLI renders go through that long-lived
+    process instead of spawning markmap-cli. asset_mode='shared' moves the
+    markmap/KaTeX/control-panel assets into assets_dir (default: <output dir>/assets).
+    The page opens with branches initial_depth levels below the root folded
+    (see fold_markmap_tree); -1 opens it fully expanded. With shard_nodes set,
+    branches beyond that many nodes load on expand from scripts in
+    <output stem>.shards/ (see shard_markmap_tree).
+
+    The build is skipped when the output directory's build manifest shows the
+    output is current; force rebuilds anyway and dry_run only reports. A caller
+    passing build_manifest owns it: the build is recorded there, not saved.
+    The manifest entry lists the files deployed with the page (see deployed_files).
+
+    compress lists the precompressed siblings ('gzip', 'brotli') to write next to
+    the page. image_formats ('svg', 'png', 'pdf') also draws the map as static
+    images next to it (see write_mindmap_images), PNGs png_width pixels wide.
+    A caller passing deferred gets that work appended as (function, args) pairs
+    instead of run, to schedule itself (see convert_mindmap_batch).
+    """
 
     logger.info("=" * 60)
     logger.info("MIND MAP CONVERSION STARTED")
@@ -515,6 +1957,24 @@ def convert_markdown_to_mindmap(markdown_path: str, output_path: str) -> str:
     if not os.path.exists(markdown_path):
         raise FileNotFoundError(f"Input file not found: {markdown_path}")
 
+    output_dir = Path(output_path).resolve().parent
+    if asset_mode == 'shared':
+        assets_dir = assets_dir or str(output_dir / 'assets')
+    else:
+        assets_dir = None
+    options = _build_options(
+        fonts_mode, fonts_root, renderer, asset_mode, assets_dir, compress, compress_levels, image_formats, png_width,
+        initial_depth, shard_nodes
+    )
+    manifest = build_manifest if build_manifest is not None else read_build_manifest(output_dir)
+    reason, state = check_build(markdown_path, output_path, options, manifest, force)
+    if reason is None:
+        logger.info(f"✓ Up to date: {output_path}")
+        return output_path
+    if dry_run:
+        logger.info(f"Would rebuild: {output_path} ({reason})")
+        return output_path
+
     # Read markdown to verify it's not empty
     with open(markdown_path, 'r', encoding='utf-8') as f:
         markdown_content = f.read()
@@ -527,33 +1987,50 @@ def convert_markdown_to_mindmap(markdown_path: str, output_path: str) -> str:
     logger.info("Converting Markdown to interactive HTML using Markmap...")
 
     try:
-        markmap_cmd = get_markmap_command()
-        cmd = [
-            *markmap_cmd,
-            '--offline',  # Include all assets for offline viewing
-            markdown_path,
-            '-o', output_path
-        ]
-
-        logger.info(f"Running: {' '.join(cmd)}")
-
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
-
-        if result.returncode != 0:
-            logger.error(f"markmap-cli error: {result.stderr}")
-            raise RuntimeError(f"Failed to generate HTML: {result.stderr}")
-
-        if not os.path.exists(output_path):
-            raise FileNotFoundError(f"Output file not created: {output_path}")
-
-        # Inject custom features
-        inject_custom_features(output_path)
-        ensure_katex_fonts(output_path)
+        html_content = None
+        if renderer != 'cli':
+            html_content = render_markdown_in_process(markdown_content, renderer == 'python', initial_depth)
+        if html_content is None:
+            html_content = render_markdown_with_cli(markdown_path, markdown_content, output_path, worker)
+            html_content = fold_markmap_page(html_content, initial_depth)
+        tree = markmap_tree_from_html(html_content) if image_formats else None
+        if image_formats and tree is None:
+            logger.warning(f"⚠ No markmap data found in the page, skipping images for {output_path}")
+
+        # Post-process in memory and write the final page once; shards are written first
+        html_content = shard_markmap_page(html_content, output_path, shard_nodes)
+        deployed = sorted(shard_dir(output_path).glob('*.js'))
+        html_content = inject_custom_features(html_content)
+        if asset_mode == 'shared':
+            html_content = externalize_page_assets(html_content, output_path, assets_dir, fonts_mode, deployed)
+        else:
+            html_content = ensure_katex_fonts(html_content, output_path, fonts_mode, fonts_root, deployed)
+        write_atomic(output_path, html_content)
+        jobs = [(write_compressed_siblings, (output_path, compress, compress_levels))]
+        if tree is not None:
+            jobs.append((write_mindmap_images, (output_path, tree, image_formats, png_width)))
+        if deferred is not None:
+            # The caller adds the siblings and images to the manifest entry once written
+            deferred.extend(jobs)
+            sizes = None
+            files = deployed_files(output_path, deployed)
+        else:
+            sizes = write_compressed_siblings(*jobs[0][1])
+            if compress:
+                logger.info(f"Compressed: {compression_report(sizes)}")
+            image_timings = None
+            if tree is not None:
+                image_timings = write_mindmap_images(*jobs[1][1])
+                logger.info(f"Images: {image_report(image_timings)}")
+            files = deployed_files(output_path, deployed, sizes, image_timings)
+
+        if build_manifest is not None:
+            record_build(output_path, state, build_manifest, files, sizes)
+        else:
+            # Re-read so builds of sibling outputs finished meanwhile are kept
+            manifest = read_build_manifest(output_dir)
+            record_build(output_path, state, manifest, files, sizes)
+            write_build_manifest(output_dir, manifest)
 
         file_size = os.path.getsize(output_path) / 1024
 
@@ -565,7 +2042,7 @@ def convert_markdown_to_mindmap(markdown_path: str, output_path: str) -> str:
         return output_path
 
     except subprocess.TimeoutExpired:
-        logger.error("Conversion timed out after 60 seconds")
+        logger.error(f"Conversion timed out after {MARKMAP_TIMEOUT} seconds")
         raise RuntimeError("Conversion timed out")
     except Exception as e:
         logger.error("=" * 60)
@@ -575,6 +2052,227 @@ def convert_markdown_to_mindmap(markdown_path: str, output_path: str) -> str:
         raise
 
 
+def collect_batch_jobs(
+    output_dir: str,
+    input_dir: Optional[str] = None,
+    pattern: str = '*.md',
+    manifest: Optional[str] = None
+) -> list[tuple[str, str]]:
+    """Pair every batch input with its output HTML path under output_dir.
+
+    Raises ValueError if two inputs would write the same output, or an output
+    would land outside output_dir (a manifest entry with '..').
+    """
+    output_root = Path(output_dir)
+    resolved_root = output_root.resolve()
+    jobs = []
+    sources: dict[Path, Path] = {}
+
+    def add_job(input_path: Path, relative: Path) -> None:
+        output_path = output_root / relative.with_suffix('.html')
+        resolved = output_path.resolve()
+        if not resolved.is_relative_to(resolved_root):
+            raise ValueError(f"{input_path}: output {output_path} is outside {output_dir}")
+        source = input_path.resolve()
+        if resolved in sources:
+            if sources[resolved] != source:
+                raise ValueError(f"{input_path} and {sources[resolved]} would both write {output_path}")
+            return  # the same input listed twice
+        sources[resolved] = source
+        jobs.append((str(input_path), str(output_path)))
+
+    if input_dir:
+        input_root = Path(input_dir)
+        for input_path in sorted(input_root.glob(pattern)):
+            if input_path.is_file():
+                relative = input_path.relative_to(input_root)
+                add_job(input_path, relative)
+
+    if manifest:
+        manifest_path = Path(manifest)
+        for line in manifest_path.read_text(encoding='utf-8').splitlines():
+            entry = line.strip()
+            if not entry or entry.startswith('#'):
+                continue
+            input_path = Path(entry)
+            if input_path.is_absolute():
+                relative = Path(input_path.name)
+            else:
+                relative = input_path
+                input_path = manifest_path.parent / input_path
+            add_job(input_path, relative)
+
+    return jobs
+
+
+def _run_deferred(work: list) -> list:
+    """Run the (function, args) pairs convert_markdown_to_mindmap deferred; returns their results."""
+    return [function(*args) for function, args in work]
+
+
+def convert_mindmap_batch(
+    jobs: list[tuple[str, str]],
+    fonts_mode: str = 'link',
+    fonts_root: Optional[str] = None,
+    use_worker: bool = True,
+    renderer: str = 'auto',
+    assets_dir: Optional[str] = None,
+    force: bool = False,
+    dry_run: bool = False,
+    compress: Iterable[str] = (),
+    compress_levels: Optional[dict] = None,
+    image_formats: Iterable[str] = (),
+    png_width: Optional[int] = None,
+    initial_depth: int = DEFAULT_INITIAL_DEPTH,
+    shard_nodes: int = 0
+) -> list[tuple[str, str, float, Optional[str]]]:
+    """Convert many Markdown files, streaming CLI renders through one markmap worker when possible.
+
+    With assets_dir set, every page links the shared asset files written there.
+    compress siblings and image_formats images are written on a thread pool while
+    the next page renders (zlib, brotli and the rasteriser release the GIL), and
+    their sizes and timings are reported per map.
+    Outputs the build manifests show as current are skipped unless force is set;
+    dry_run only reports what would be rebuilt.
+    """
+    started = time.perf_counter()
+    asset_mode = 'shared' if assets_dir else 'inline'
+    compress = tuple(compress)
+    image_formats = tuple(image_formats)
+    options = _build_options(
+        fonts_mode, fonts_root, renderer, asset_mode, assets_dir, compress, compress_levels, image_formats, png_width,
+        initial_depth, shard_nodes
+    )
+    build_manifests: dict[Path, dict] = {}
+    existing: set[str] = set()
+    pending = []
+    for input_path, output_path in jobs:
+        output_dir = Path(output_path).resolve().parent
+        if output_dir not in build_manifests:
+            build_manifests[output_dir] = read_build_manifest(output_dir)
+        reason, _ = check_build(input_path, output_path, options, build_manifests[output_dir], force, existing)
+        if reason is None:
+            continue
+        if dry_run:
+            logger.info(f"Would rebuild: {output_path} ({reason})")
+        pending.append((input_path, output_path))
+
+    up_to_date = len(jobs) - len(pending)
+    if dry_run:
+        logger.success(f"Dry run: {len(pending)} to rebuild, {up_to_date} up to date")
+        return []
+    jobs = pending
+
+    use_worker = use_worker and renderer != 'python' and bool(jobs)
+    worker = MarkmapWorker.create() if use_worker else None
+    if use_worker and not worker:
+        logger.warning("markmap worker unavailable, spawning markmap-cli per file")
+    logger.info(f"Converting {len(jobs)} mind maps, {up_to_date} up to date")
+
+    results = []
+    finishing: dict[str, Future] = {}
+    pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1) if (compress or image_formats) and jobs else None
+    try:
+        for input_path, output_path in jobs:
+            file_started = time.perf_counter()
+            deferred = [] if pool else None
+            try:
+                Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+                convert_markdown_to_mindmap(
+                    input_path,
+                    output_path,
+                    fonts_mode,
+                    fonts_root,
+                    worker,
+                    renderer,
+                    asset_mode,
+                    assets_dir,
+                    force=True,
+                    build_manifest=build_manifests[Path(output_path).resolve().parent],
+                    compress=compress,
+                    compress_levels=compress_levels,
+                    image_formats=image_formats,
+                    png_width=png_width,
+                    initial_depth=initial_depth,
+                    shard_nodes=shard_nodes,
+                    deferred=deferred
+                )
+                if deferred:
+                    finishing[output_path] = pool.submit(_run_deferred, deferred)
+                error = None
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            results.append((input_path, output_path, time.perf_counter() - file_started, error))
+    finally:
+        if worker:
+            worker.close()
+        if pool:
+            pool.shutdown()
+            # A page whose siblings or images could not be written is rebuilt next time
+            for output_path, future in finishing.items():
+                build_manifest = build_manifests[Path(output_path).resolve().parent]
+                if future.exception():
+                    build_manifest.pop(Path(output_path).name, None)
+                elif Path(output_path).name in build_manifest:
+                    entry = build_manifest[Path(output_path).name]
+                    sizes = future.result()[0]
+                    entry['files'] = sorted({*entry['files'], *deployed_files(output_path, (), *future.result())})
+                    entry['compressed'] = sorted(fmt for fmt in sizes if fmt != 'raw')
+        for output_dir, build_manifest in build_manifests.items():
+            if output_dir.exists():
+                write_build_manifest(output_dir, build_manifest)
+
+    compressed_totals: dict[str, int] = {}
+    image_timings = []
+    for index, (input_path, output_path, elapsed, error) in enumerate(results):
+        report = ''
+        if not error and output_path in finishing:
+            try:
+                sizes, *images = finishing[output_path].result()
+            except Exception as e:
+                error = f"writing compressed copies or images failed: {type(e).__name__}: {e}"
+                results[index] = (input_path, output_path, elapsed, error)
+            else:
+                if compress:
+                    report += f"; {compression_report(sizes)}"
+                    for fmt, size in sizes.items():
+                        compressed_totals[fmt] = compressed_totals.get(fmt, 0) + size
+                if images:
+                    report += f"; {image_report(images[0])}"
+                    image_timings.append(sum(images[0].values()))
+        if error:
+            logger.error(f"✗ {input_path}: {error}")
+        else:
+            logger.info(f"✓ {input_path} → {output_path} ({elapsed * 1000:.1f} ms{report})")
+
+    timings = [elapsed for _, _, elapsed, error in results if not error]
+    failed = len(results) - len(timings)
+    total = time.perf_counter() - started
+    if timings:
+        logger.info(
+            f"Per-file render: mean {sum(timings) / len(timings) * 1000:.1f} ms, "
+            f"max {max(timings) * 1000:.1f} ms"
+        )
+    if compressed_totals:
+        logger.info(f"Compressed total: {compression_report(compressed_totals)}")
+    if image_timings:
+        logger.info(
+            f"Per-map images: mean {sum(image_timings) / len(image_timings):.1f} ms, "
+            f"max {max(image_timings):.1f} ms ({len(image_timings)} maps)"
+        )
+    if worker and worker.restarts:
+        logger.warning(f"markmap worker restarted {worker.restarts} time(s)")
+    summary = (
+        f"Batch finished: {len(timings)} converted, {up_to_date} up to date, "
+        f"{failed} failed in {total:.2f}s"
+    )
+    if failed:
+        logger.warning(summary)
+    else:
+        logger.success(summary)
+    return results
+
+
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -582,7 +2280,6 @@ def main():
     )
     parser.add_argument(
         "--input", "-i",
-        required=True,
         help="Input Markdown file path"
     )
     parser.add_argument(
@@ -590,11 +2287,194 @@ def main():
         default="mindmap.html",
         help="Output HTML file path (default: mindmap.html)"
     )
+    parser.add_argument(
+        "--fonts-mode",
+        choices=FONT_MODES,
+        default="link",
+        help="How KaTeX fonts are deployed: hard link from the shared store (default), symlink, or copy"
+    )
+    parser.add_argument(
+        "--fonts-root",
+        help="Deploy KaTeX fonts once into <dir>/fonts and reference them from the page"
+    )
+    parser.add_argument(
+        "--renderer",
+        choices=RENDERERS,
+        default="auto",
+        help="auto: in-process for headings/lists, markmap-cli otherwise (default); python or cli to force one"
+    )
+    parser.add_argument(
+        "--initial-depth",
+        type=int,
+        default=DEFAULT_INITIAL_DEPTH,
+        metavar="N",
+        help=f"Levels below the root shown when the page opens, -1 for all (default: {DEFAULT_INITIAL_DEPTH})"
+    )
+    parser.add_argument(
+        "--shard-nodes",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Keep about N nodes in the page and per sidecar shard, loading deeper branches on expand (default: 0, off)"
+    )
+    parser.add_argument(
+        "--asset-mode",
+        choices=ASSET_MODES,
+        default="inline",
+        help="inline: self-contained page (default); shared: link content-hashed markmap/KaTeX files"
+    )
+    parser.add_argument(
+        "--assets-dir",
+        help="Shared asset mode: directory for the asset files (default: assets/ next to the output)"
+    )
+    parser.add_argument(
+        "--input-dir",
+        help="Batch mode: convert every matching Markdown file in this directory"
+    )
+    parser.add_argument(
+        "--glob",
+        default="*.md",
+        help="Batch mode: file pattern inside --input-dir (default: *.md)"
+    )
+    parser.add_argument(
+        "--manifest",
+        help="Batch mode: text file listing input Markdown files, one per line"
+    )
+    parser.add_argument(
+        "--output-dir",
+        help="Batch mode: directory for the generated HTML files"
+    )
+    parser.add_argument(
+        "--no-worker",
+        action="store_true",
+        help="Batch mode: spawn markmap-cli per file instead of using a persistent worker"
+    )
+    parser.add_argument(
+        "--images",
+        nargs="+",
+        choices=IMAGE_FORMATS,
+        default=[],
+        help="Also draw the map as static images next to the HTML (png/pdf need rsvg-convert or cairosvg)"
+    )
+    parser.add_argument(
+        "--png-width",
+        type=int,
+        metavar="PX",
+        help="Scale PNG images to this width, e.g. for thumbnails (default: natural size)"
+    )
+    parser.add_argument(
+        "--compress",
+        nargs="+",
+        choices=tuple(COMPRESSIONS),
+        default=[],
+        help="Also write precompressed <output>.gz and/or <output>.br for static file servers"
+    )
+    parser.add_argument(
+        "--gzip-level",
+        type=int,
+        help="gzip level 1-9 for --compress (default: 9)"
+    )
+    parser.add_argument(
+        "--brotli-level",
+        type=int,
+        help="brotli quality 0-11 for --compress (default: 11)"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rebuild even when the build manifest says the output is current"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Report which outputs would be rebuilt, without writing anything"
+    )
+    parser.add_argument(
+        "--refresh-asset-cache",
+        action="store_true",
+        help="Re-resolve cached markmap-cli and KaTeX asset locations"
+    )
 
     args = parser.parse_args()
 
+    if args.refresh_asset_cache:
+        refresh_asset_cache()
+        if not (args.input or args.input_dir or args.manifest):
+            return
+
+    if args.gzip_level is not None and not 1 <= args.gzip_level <= 9:
+        parser.error("--gzip-level must be between 1 and 9")
+    if args.brotli_level is not None and not 0 <= args.brotli_level <= 11:
+        parser.error("--brotli-level must be between 0 and 11")
+    compress_levels = {
+        fmt: level for fmt, level in (("gzip", args.gzip_level), ("brotli", args.brotli_level)) if level is not None
+    }
+    if args.png_width is not None and args.png_width < 1:
+        parser.error("--png-width must be a positive number")
+    if args.initial_depth < -1:
+        parser.error("--initial-depth must be -1 (fully expanded) or a number of levels")
+    if args.shard_nodes < 0:
+        parser.error("--shard-nodes must be 0 (off) or a positive number")
+    if args.asset_mode == "shared" and args.fonts_root:
+        parser.error("--fonts-root cannot be combined with --asset-mode shared (fonts go to <assets-dir>/fonts)")
+
+    if args.input_dir or args.manifest:
+        if args.input:
+            parser.error("--input cannot be combined with --input-dir/--manifest")
+        if not args.output_dir:
+            parser.error("--output-dir is required in batch mode")
+        try:
+            jobs = collect_batch_jobs(args.output_dir, args.input_dir, args.glob, args.manifest)
+        except ValueError as e:
+            parser.error(str(e))
+        if not jobs:
+            parser.error("No input files found for batch mode")
+        assets_dir = None
+        if args.asset_mode == "shared":
+            assets_dir = args.assets_dir or str(Path(args.output_dir) / "assets")
+        results = convert_mindmap_batch(
+            jobs,
+            args.fonts_mode,
+            args.fonts_root,
+            not args.no_worker,
+            args.renderer,
+            assets_dir,
+            args.force,
+            args.dry_run,
+            args.compress,
+            compress_levels,
+            args.images,
+            args.png_width,
+            args.initial_depth,
+            args.shard_nodes
+        )
+        if any(error for *_, error in results):
+            sys.exit(1)
+        return
+
+    if not args.input:
+        parser.error("one of --input, --input-dir or --manifest is required")
+
     try:
-        result = convert_markdown_to_mindmap(args.input, args.output)
+        result = convert_markdown_to_mindmap(
+            args.input,
+            args.output,
+            fonts_mode=args.fonts_mode,
+            fonts_root=args.fonts_root,
+            renderer=args.renderer,
+            asset_mode=args.asset_mode,
+            assets_dir=args.assets_dir,
+            force=args.force,
+            dry_run=args.dry_run,
+            compress=args.compress,
+            compress_levels=compress_levels,
+            image_formats=args.images,
+            png_width=args.png_width,
+            initial_depth=args.initial_depth,
+            shard_nodes=args.shard_nodes
+        )
+        if args.dry_run:
+            return
 
         if os.path.exists(result):
             size = os.path.getsize(result) / 1024
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Student Exam Prep: build a study unit's mind map, flashcards and quiz in one run.
+
+A study unit is a directory holding any of:
+
+    mindmap.md                          -> mindmap.html
+    flashcards.json / .jsonl / .ndjson  -> flashcards.html
+    quiz.json / .jsonl / .ndjson        -> quiz.html
+
+The mind map (which may need a markmap-cli subprocess) is converted in a worker
+process while the quiz and flashcards render in this one, sharing one KaTeX asset
+lookup and font deployment. Each output keeps its skill's incremental-build
+behaviour and a per-stage timing breakdown is logged at the end.
+"""
+
+import argparse
+import importlib.util
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional
+
+from loguru import logger
+
+
+SKILLS_DIR = Path(__file__).resolve().parent.parent.parent
+INPUT_SUFFIXES = ('.json', '.jsonl', '.ndjson')
+
+
+def load_skill(name: str):
+    """Import skills/<name>/main.py; skills stay standalone, so they are loaded by path."""
+    spec = importlib.util.spec_from_file_location(f"{name}_main", SKILLS_DIR / name / "main.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def find_unit_inputs(unit_dir: Path) -> dict[str, Path]:
+    """Map 'mindmap', 'flashcards' and 'quiz' to the unit's source files that exist."""
+    inputs = {}
+    if (unit_dir / 'mindmap.md').is_file():
+        inputs['mindmap'] = unit_dir / 'mindmap.md'
+    for name in ('flashcards', 'quiz'):
+        for suffix in INPUT_SUFFIXES:
+            if (unit_dir / f"{name}{suffix}").is_file():
+                inputs[name] = unit_dir / f"{name}{suffix}"
+                break
+    return inputs
+
+
+def timed(stage: str, timings: dict, action: Callable[[], object]) -> Optional[str]:
+    """Run one stage, record its duration and return an error message if it failed."""
+    start = time.perf_counter()
+    try:
+        action()
+    except Exception as e:
+        logger.error(f"✗ {stage} failed: {type(e).__name__}: {e}")
+        return f"{type(e).__name__}: {e}"
+    finally:
+        timings[stage] = time.perf_counter() - start
+    return None
+
+
+def _build_mindmap(markdown_path: str, output_path: str, options: dict) -> tuple[float, Optional[str], Optional[dict]]:
+    """Convert the mind map in the worker process; returns (seconds, error, build manifest entry).
+
+    The entry is handed back instead of saved so only the parent writes the
+    output directory's manifest.
+    """
+    start = time.perf_counter()
+    mindmap = load_skill('mindmap')
+    manifest = mindmap.read_build_manifest(Path(output_path).resolve().parent)
+    try:
+        mindmap.convert_markdown_to_mindmap(markdown_path, output_path, build_manifest=manifest, **options)
+    except Exception as e:
+        return time.perf_counter() - start, f"{type(e).__name__}: {e}", None
+    return time.perf_counter() - start, None, manifest.get(Path(output_path).name)
+
+
+def build_study_unit(
+    unit_dir: str,
+    output_dir: str,
+    fonts_mode: str = 'link',
+    asset_mode: str = 'inline',
+    assets_dir: Optional[str] = None,
+    renderer: str = 'auto',
+    chunk_size: int = 0,
+    prerender_math: bool = False,
+    force: bool = False,
+    dry_run: bool = False,
+    compress: tuple[str, ...] = (),
+    compress_levels: Optional[dict] = None,
+    image_formats: tuple[str, ...] = (),
+    png_width: Optional[int] = None,
+    initial_depth: int = 1,
+    shard_nodes: int = 0
+) -> dict[str, Optional[str]]:
+    """Build every output the unit has sources for; returns {stage: error or None}."""
+
+    started = time.perf_counter()
+    inputs = find_unit_inputs(Path(unit_dir))
+    if not inputs:
+        raise FileNotFoundError(f"No mindmap.md, flashcards.json or quiz.json found in {unit_dir}")
+
+    output_root = Path(output_dir)
+    output_root.mkdir(parents=True, exist_ok=True)
+    outputs = {name: str(output_root / f"{name}.html") for name in inputs}
+    timings: dict[str, float] = {}
+    errors: dict[str, Optional[str]] = {}
+
+    with ProcessPoolExecutor(max_workers=1) as background:
+        mindmap_job = None
+        if 'mindmap' in inputs:
+            mindmap_job = background.submit(_build_mindmap, str(inputs['mindmap']), outputs['mindmap'], {
+                'fonts_mode': fonts_mode,
+                'renderer': renderer,
+                'asset_mode': asset_mode,
+                'assets_dir': assets_dir,
+                'force': force,
+                'dry_run': dry_run,
+                'compress': compress,
+                'compress_levels': compress_levels,
+                'image_formats': image_formats,
+                'png_width': png_width,
+                'initial_depth': initial_depth,
+                'shard_nodes': shard_nodes
+            })
+
+        skills = {}
+        timed('load skills', timings, lambda: skills.update(
+            (name, load_skill(name)) for name in ('quiz', 'flashcards') if name in inputs or name == 'quiz'
+        ))
+        quiz, flashcards = skills['quiz'], skills.get('flashcards')
+
+        katex_assets = {}
+        timed('katex assets', timings, lambda: katex_assets.update(quiz.get_katex_assets()))
+
+        if 'quiz' in inputs:
+            errors['quiz'] = timed('quiz', timings, lambda: quiz.convert_quiz(
+                str(inputs['quiz']),
+                outputs['quiz'],
+                katex_assets=katex_assets,
+                fonts_mode=fonts_mode,
+                asset_mode=asset_mode,
+                assets_dir=assets_dir,
+                force=force,
+                dry_run=dry_run,
+                chunk_size=chunk_size,
+                prerender_math=prerender_math,
+                compress=compress,
+                compress_levels=compress_levels
+            ))
+        if flashcards:
+            # Same KaTeX dict and output directory, so the fonts the quiz deployed are reused
+            errors['flashcards'] = timed('flashcards', timings, lambda: flashcards.convert_json_to_flashcards(
+                str(inputs['flashcards']),
+                outputs['flashcards'],
+                katex_assets=katex_assets,
+                fonts_mode=fonts_mode,
+                asset_mode=asset_mode,
+                assets_dir=assets_dir,
+                force=force,
+                dry_run=dry_run,
+                prerender_math=prerender_math,
+                compress=compress,
+                compress_levels=compress_levels
+            ))
+
+        if mindmap_job:
+            timings['mindmap'], errors['mindmap'], entry = mindmap_job.result()
+            if errors['mindmap']:
+                logger.error(f"✗ mindmap failed: {errors['mindmap']}")
+            output_dir = output_root.resolve()
+            manifest = quiz.read_build_manifest(output_dir)
+            name = Path(outputs['mindmap']).name
+            if entry and manifest.get(name) != entry:
+                manifest[name] = entry
+                quiz.write_build_manifest(output_dir, manifest)
+
+    total = time.perf_counter() - started
+    logger.info("Stage timings:")
+    for stage, seconds in timings.items():
+        suffix = ' (worker process)' if stage == 'mindmap' else ''
+        logger.info(f"  {stage:<13} {seconds * 1000:8.1f} ms{suffix}")
+    logger.info(f"  {'total':<13} {total * 1000:8.1f} ms wall, {sum(timings.values()) * 1000:.1f} ms of stages")
+
+    failed = [stage for stage, error in errors.items() if error]
+    if failed:
+        logger.warning(f"Study unit built with failures: {', '.join(failed)}")
+    else:
+        logger.success(f"Study unit ready in {output_root}: {', '.join(Path(path).name for path in outputs.values())}")
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a study unit's mind map, flashcards and quiz")
+    parser.add_argument('-i', '--input', required=True,
+                        help='Study unit directory (mindmap.md, flashcards.json, quiz.json)')
+    parser.add_argument('-o', '--output-dir', required=True, help='Directory for the generated HTML files')
+    parser.add_argument('--fonts-mode', choices=('link', 'symlink', 'copy'), default='link',
+                        help='How KaTeX fonts are deployed: hard link from the shared store (default), symlink, or copy')
+    parser.add_argument('--asset-mode', choices=('inline', 'shared'), default='inline',
+                        help='inline: self-contained pages (default); shared: link content-hashed asset files')
+    parser.add_argument('--assets-dir',
+                        help='Shared asset mode: directory for the asset files (default: assets/ in the output dir)')
+    parser.add_argument('--renderer', choices=('auto', 'python', 'cli'), default='auto',
+                        help='Mind map renderer (see the mindmap skill; default: auto)')
+    parser.add_argument('--initial-depth', type=int, default=1, metavar='N',
+                        help='Mind map levels below the root shown when it opens, -1 for all (default: 1)')
+    parser.add_argument('--shard-nodes', type=int, default=0, metavar='N',
+                        help='Load mind map branches beyond about N nodes on expand from sidecar shards (default: 0, off)')
+    parser.add_argument('--chunk-size', type=int, default=0,
+                        help='Store quiz questions in lazily parsed chunks of this many (default: 0)')
+    parser.add_argument('--prerender-math', action='store_true',
+                        help='Render quiz and flashcard formulas to KaTeX HTML at build time')
+    parser.add_argument('--compress', nargs='+', choices=('gzip', 'brotli'), default=[],
+                        help='Also write precompressed .gz and/or .br siblings of every page')
+    parser.add_argument('--gzip-level', type=int,
+                        help='gzip level 1-9 for --compress (default: 9)')
+    parser.add_argument('--brotli-level', type=int,
+                        help='brotli quality 0-11 for --compress (default: 11)')
+    parser.add_argument('--images', nargs='+', choices=('svg', 'png', 'pdf'), default=[],
+                        help='Also draw the mind map as a static mindmap.svg/.png/.pdf')
+    parser.add_argument('--png-width', type=int, metavar='PX',
+                        help='Width of the --images png in pixels (default: the SVG size)')
+    parser.add_argument('--force', action='store_true', help='Rebuild outputs even when they are current')
+    parser.add_argument('--dry-run', action='store_true', help='Report which outputs would be rebuilt')
+    args = parser.parse_args()
+
+    if args.chunk_size < 0:
+        parser.error('--chunk-size must be 0 or a positive number')
+    if args.gzip_level is not None and not 1 <= args.gzip_level <= 9:
+        parser.error('--gzip-level must be between 1 and 9')
+    if args.brotli_level is not None and not 0 <= args.brotli_level <= 11:
+        parser.error('--brotli-level must be between 0 and 11')
+    compress_levels = {
+        fmt: level for fmt, level in (('gzip', args.gzip_level), ('brotli', args.brotli_level)) if level is not None
+    }
+    if args.png_width is not None and args.png_width < 1:
+        parser.error('--png-width must be a positive number')
+    if args.initial_depth < -1:
+        parser.error('--initial-depth must be -1 (fully expanded) or a number of levels')
+    if args.shard_nodes < 0:
+        parser.error('--shard-nodes must be 0 (off) or a positive number')
+    if not Path(args.input).is_dir():
+        parser.error(f"Study unit directory not found: {args.input}")
+
+    try:
+        errors = build_study_unit(
+            args.input,
+            args.output_dir,
+            fonts_mode=args.fonts_mode,
+            asset_mode=args.asset_mode,
+            assets_dir=args.assets_dir,
+            renderer=args.renderer,
+            chunk_size=args.chunk_size,
+            prerender_math=args.prerender_math,
+            force=args.force,
+            dry_run=args.dry_run,
+            compress=tuple(args.compress),
+            compress_levels=compress_levels,
+            image_formats=tuple(args.images),
+            png_width=args.png_width,
+            initial_depth=args.initial_depth,
+            shard_nodes=args.shard_nodes
+        )
+    except FileNotFoundError as e:
+        logger.error(f"✗ {e}")
+        sys.exit(1)
+    if any(errors.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,9 +5,19 @@ Pure frontend converter - no AI/LLM required
 
 import json
 import argparse
+import hashlib
+import gzip
+import html
+import os
+import re
 import shutil
+import sqlite3
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, Optional, TextIO, Union
 from loguru import logger
 import sys
 
@@ -15,25 +25,123 @@ logger.remove()
 logger.add(sys.stderr, level="INFO")
 
 
-def find_katex_dist() -> Optional[Path]:
-    npm_cache = Path.home() / '.npm' / '_npx'
-    candidates = []
+CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')) / 'open-exam-skills'
+ASSET_INDEX_PATH = CACHE_DIR / 'asset-index.json'
+FONT_STORE_DIR = CACHE_DIR / 'fonts'
+FONT_MODES = ('link', 'symlink', 'copy')
+ASSET_MODES = ('inline', 'shared')
+BUILD_MANIFEST_NAME = '.build-manifest.json'
+MATH_CACHE_PATH = CACHE_DIR / 'katex-render-cache.sqlite3'
+MATH_CACHE_MAX_BYTES = 64 << 20
+COMPRESSIONS = {'gzip': ('.gz', 9), 'brotli': ('.br', 11)}
+
+_katex_assets_memo: Optional[dict] = None
+_lookup_memo: dict[str, Optional[Path]] = {}
+_font_digests: dict[tuple[str, int, float], str] = {}
+_shared_asset_names: dict[tuple[str, str], str] = {}
+_converter_version: Optional[str] = None
+_compiled_pages: dict[tuple, tuple[list[bytes], list[str]]] = {}
+_katex_worker: Optional['KatexWorker'] = None
+_katex_worker_started = False
+_brotli_missing_warned = False
+
+
+def _mtime(path: Path) -> Optional[float]:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return None
+
+
+def _read_asset_index() -> dict:
+    try:
+        return json.loads(ASSET_INDEX_PATH.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_asset_index(index: dict) -> None:
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = ASSET_INDEX_PATH.with_name(f"{ASSET_INDEX_PATH.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(index, indent=2), encoding='utf-8')
+        os.replace(tmp_path, ASSET_INDEX_PATH)
+    except OSError as e:
+        logger.debug(f"Asset index not saved: {e}")
+
+
+def _indexed_lookup(
+    key: str,
+    roots: list[Path],
+    resolve: Callable[[], Optional[Path]],
+    refresh: bool = False
+) -> Optional[Path]:
+    """Reuse a previous glob result while its search roots and the result itself are unchanged.
+
+    Installing a new package under ~/.npm/_npx creates a directory there, which bumps the
+    root's mtime, so a stale hit is only possible after in-place edits; use a refresh for those.
+    Results are also memoised per process, so batch jobs do not re-read the index.
+    """
+    if not refresh and key in _lookup_memo:
+        return _lookup_memo[key]
+
+    stamp = {str(root): _mtime(root) for root in roots}
+    index = _read_asset_index()
+    entry = index.get(key)
+    if not refresh and entry and entry.get('roots') == stamp:
+        cached = Path(entry['path']) if entry.get('path') else None
+        if cached is None or _mtime(cached) == entry.get('mtime'):
+            _lookup_memo[key] = cached
+            return cached
+
+    result = resolve()
+    index[key] = {
+        'roots': stamp,
+        'path': str(result) if result else None,
+        'mtime': _mtime(result) if result else None
+    }
+    _write_asset_index(index)
+    _lookup_memo[key] = result
+    return result
 
-    if npm_cache.exists():
-        candidates.extend(npm_cache.glob('*/node_modules/katex/dist'))
 
+def find_katex_dist(refresh: bool = False) -> Optional[Path]:
+    npm_cache = Path.home() / '.npm' / '_npx'
     local_node_modules = Path.cwd() / 'node_modules' / 'katex' / 'dist'
-    if local_node_modules.exists():
-        candidates.append(local_node_modules)
 
-    if not candidates:
-        return None
+    def resolve() -> Optional[Path]:
+        candidates = []
 
-    return max(candidates, key=lambda path: path.stat().st_mtime)
+        if npm_cache.exists():
+            candidates.extend(npm_cache.glob('*/node_modules/katex/dist'))
 
+        if local_node_modules.exists():
+            candidates.append(local_node_modules)
 
-def get_katex_assets() -> dict:
-    dist = find_katex_dist()
+        if not candidates:
+            return None
+
+        return max(candidates, key=lambda path: path.stat().st_mtime)
+
+    return _indexed_lookup(
+        f"katex-dist:{Path.cwd()}",
+        [npm_cache, local_node_modules],
+        resolve,
+        refresh
+    )
+
+
+def get_katex_assets(refresh: bool = False) -> dict:
+    """Resolve KaTeX styles/scripts once per process; later calls return the memoised dict."""
+    global _katex_assets_memo
+    if _katex_assets_memo is not None and not refresh:
+        return _katex_assets_memo
+
+    _katex_assets_memo = _load_katex_assets(find_katex_dist(refresh))
+    return _katex_assets_memo
+
+
+def _load_katex_assets(dist: Optional[Path]) -> dict:
     if dist:
         css_path = dist / 'katex.min.css'
         js_path = dist / 'katex.min.js'
@@ -45,7 +153,10 @@ def get_katex_assets() -> dict:
             return {
                 'styles': f"<style>{css}</style>",
                 'scripts': f"<script>{katex_js}</script>\n<script>{auto_render_js}</script>",
-                'fonts_dir': dist / 'fonts'
+                'fonts_dir': dist / 'fonts',
+                'css': css,
+                'js': katex_js,
+                'auto_render_js': auto_render_js
             }
 
     version = '0.16.18'
@@ -62,19 +173,170 @@ def get_katex_assets() -> dict:
     }
 
 
-def ensure_katex_fonts(output_path: str, fonts_dir: Optional[Path]) -> None:
+def refresh_asset_cache() -> dict:
+    """Forget cached KaTeX lookups and resolve the assets again."""
+    assets = get_katex_assets(refresh=True)
+    if assets['fonts_dir']:
+        logger.success(f"KaTeX asset cache refreshed: {assets['fonts_dir'].parent}")
+    else:
+        logger.warning("KaTeX asset cache refreshed: no local KaTeX found, using CDN")
+    return assets
+
+
+def _font_digest(font_file: Path) -> str:
+    stat = font_file.stat()
+    key = (str(font_file), stat.st_size, stat.st_mtime)
+    if key not in _font_digests:
+        _font_digests[key] = hashlib.sha256(font_file.read_bytes()).hexdigest()
+    return _font_digests[key]
+
+
+def _store_font(font_file: Path) -> Path:
+    """Place a font in the content-addressed store once and return the stored path."""
+    stored = FONT_STORE_DIR / f"{_font_digest(font_file)}{font_file.suffix}"
+    if not stored.exists():
+        FONT_STORE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = stored.with_name(f"{stored.name}.{os.getpid()}.tmp")
+        shutil.copy2(font_file, tmp_path)
+        os.replace(tmp_path, stored)
+    return stored
+
+
+def _font_is_current(dest: Path, source: Path) -> bool:
+    try:
+        dest_stat = dest.stat()
+    except OSError:
+        return False
+    source_stat = source.stat()
+    if os.path.samestat(dest_stat, source_stat):
+        return True
+    if dest_stat.st_size != source_stat.st_size:
+        return False
+    if dest_stat.st_mtime == source_stat.st_mtime:
+        return True
+    return hashlib.sha256(dest.read_bytes()).hexdigest() == _font_digest(source)
+
+
+def _deploy_font(font_file: Path, dest: Path, mode: str) -> str:
+    """Put one font at dest; returns 'unchanged', 'linked', 'symlinked' or 'copied'."""
+    source = font_file
+    if mode != 'copy':
+        try:
+            source = _store_font(font_file)
+        except OSError as e:
+            logger.debug(f"Font store unavailable, copying instead: {e}")
+            mode = 'copy'
+
+    if _font_is_current(dest, source):
+        return 'unchanged'
+
+    tmp_path = dest.with_name(f".{dest.name}.{os.getpid()}.tmp")
+    tmp_path.unlink(missing_ok=True)
+    result = 'copied'
+    try:
+        if mode == 'link':
+            os.link(source, tmp_path)
+            result = 'linked'
+        elif mode == 'symlink':
+            os.symlink(source, tmp_path)
+            result = 'symlinked'
+    except OSError:
+        # Hard links cannot cross filesystems; symlinks may be disallowed
+        result = 'copied'
+    if result == 'copied':
+        shutil.copy2(font_file, tmp_path)
+    os.replace(tmp_path, dest)
+    return result
+
+
+def deploy_fonts(fonts_dir: Path, dest_dir: Path, mode: str = 'link') -> dict:
+    """Deploy every font in fonts_dir into dest_dir, skipping files that are already current."""
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    counts: dict[str, int] = {}
+    for font_file in sorted(fonts_dir.glob('*')):
+        if font_file.is_file():
+            state = _deploy_font(font_file, dest_dir / font_file.name, mode)
+            counts[state] = counts.get(state, 0) + 1
+    return counts
+
+
+def ensure_katex_fonts(
+    output_path: str,
+    fonts_dir: Optional[Path],
+    mode: str = 'link',
+    fonts_root: Optional[str] = None
+) -> None:
     if not fonts_dir or not fonts_dir.exists():
         return
 
+    base_dir = Path(fonts_root).resolve() if fonts_root else Path(output_path).resolve().parent
+    dest_dir = base_dir / 'fonts'
+    counts = deploy_fonts(fonts_dir, dest_dir, mode)
+
+    summary = ', '.join(f"{count} {state}" for state, count in sorted(counts.items()))
+    logger.info(f"✓ KaTeX fonts deployed to: {dest_dir} ({summary})")
+
+
+def localize_katex_assets(katex_assets: dict, output_path: str, fonts_root: Optional[str]) -> dict:
+    """Point inline KaTeX font URLs at a fonts directory shared by the whole output tree."""
+    if not fonts_root or not katex_assets['fonts_dir']:
+        return katex_assets
+
     output_dir = Path(output_path).resolve().parent
-    dest_dir = output_dir / 'fonts'
-    dest_dir.mkdir(parents=True, exist_ok=True)
+    prefix = Path(os.path.relpath(Path(fonts_root).resolve(), output_dir)).as_posix()
+    if prefix == '.':
+        return katex_assets
+    return {
+        **katex_assets,
+        'styles': katex_assets['styles'].replace('url(fonts/', f'url({prefix}/fonts/')
+    }
 
-    for font_file in fonts_dir.glob('*'):
-        if font_file.is_file():
-            shutil.copy2(font_file, dest_dir / font_file.name)
 
-    logger.info(f"✓ KaTeX fonts copied to: {dest_dir}")
+def write_shared_asset(assets_root: Path, name: str, suffix: str, content: str) -> str:
+    """Write content once as <name>.<hash><suffix> in assets_root and return the file name."""
+    key = (str(assets_root), content)
+    if key in _shared_asset_names:
+        return _shared_asset_names[key]
+
+    data = content.encode('utf-8')
+    filename = f"{name}.{hashlib.sha256(data).hexdigest()[:16]}{suffix}"
+    path = assets_root / filename
+    if not path.exists():
+        assets_root.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{filename}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    _shared_asset_names[key] = filename
+    return filename
+
+
+def publish_shared_assets(katex_assets: dict, assets_dir: str, fonts_mode: str = 'link') -> dict:
+    """Write the quiz CSS/JS and local KaTeX files into assets_dir under content-hashed names.
+
+    KaTeX fonts go to <assets_dir>/fonts so the shared katex CSS resolves them.
+    """
+    assets_root = Path(assets_dir).resolve()
+    files = {
+        'quiz_css': write_shared_asset(assets_root, 'quiz', '.css', QUIZ_STYLES),
+        'quiz_js': write_shared_asset(assets_root, 'quiz', '.js', QUIZ_SCRIPT),
+    }
+    if katex_assets.get('css') is not None:
+        files['katex_css'] = write_shared_asset(assets_root, 'katex', '.css', katex_assets['css'])
+        files['katex_js'] = write_shared_asset(assets_root, 'katex', '.js', katex_assets['js'])
+        files['auto_render_js'] = write_shared_asset(
+            assets_root, 'auto-render', '.js', katex_assets['auto_render_js']
+        )
+        ensure_katex_fonts(str(assets_root / files['katex_css']), katex_assets['fonts_dir'], fonts_mode)
+
+    logger.info(f"✓ Shared assets ready in: {assets_root} ({len(files)} files)")
+    return {'root': str(assets_root), 'files': files}
+
+
+def shared_asset_urls(shared_assets: dict, output_path: str) -> dict:
+    """Map each shared asset to a URL relative to the page at output_path."""
+    output_dir = Path(output_path).resolve().parent
+    prefix = Path(os.path.relpath(shared_assets['root'], output_dir)).as_posix()
+    return {key: f"{prefix}/{filename}" for key, filename in shared_assets['files'].items()}
 
 
 def load_quiz_data(json_path: str) -> dict:
@@ -91,33 +353,146 @@ def load_quiz_data(json_path: str) -> dict:
     return data
 
 
-def generate_html(quiz_data: dict, katex_assets: dict) -> str:
-    """Generate interactive quiz HTML."""
-
-    title = quiz_data.get("title", "Quiz")
-    questions = quiz_data.get("questions", [])
-    total_questions = len(questions)
-
-    # Convert questions to JSON string for embedding
-    questions_json = json.dumps(questions, ensure_ascii=False)
-
-    katex_styles = katex_assets['styles']
-    katex_scripts = katex_assets['scripts']
-
-    html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{title}</title>
-    <style>
-        * {{
+STREAM_READ_SIZE = 1 << 16
+MAX_RECORD_CHARS = 64 << 20
+STREAM_BATCH_SIZE = 1000
+JSON_WHITESPACE_RE = re.compile(r'[ \t\r\n]*')
+NUMBER_END_RE = re.compile(r'[^0-9+\-.eE]')
+
+
+class _JsonStream:
+    """Pull tokenizer over a JSON text file that decodes one value at a time."""
+
+    def __init__(self, f: TextIO):
+        self.f = f
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(STREAM_READ_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character ('' at end of input)."""
+        while True:
+            self.pos = JSON_WHITESPACE_RE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"Expected one of {chars!r} but found {char or 'end of file'!r}")
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        if self.peek() in '-0123456789':
+            # A number is only complete once something that cannot continue it follows
+            while not NUMBER_END_RE.search(self.buf, self.pos) and self._fill():
+                pass
+        while True:
+            try:
+                value, self.pos = self.decoder.raw_decode(self.buf, self.pos)
+                return value
+            except json.JSONDecodeError:
+                # The value may simply continue in the next chunk
+                if len(self.buf) - self.pos > MAX_RECORD_CHARS or not self._fill():
+                    raise
+
+    def array_items(self) -> Iterator[tuple[str, Any]]:
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield 'item', self.value()
+            if self.expect(',]') == ']':
+                return
+
+    def events(self, list_key: str) -> Iterator[tuple[str, Any]]:
+        if self.expect('[{') == '[':
+            yield from self.array_items()
+        elif self.peek() == '}':
+            self.pos += 1
+        else:
+            while True:
+                key = self.value()
+                if not isinstance(key, str):
+                    raise ValueError(f"Expected an object key but found {key!r}")
+                self.expect(':')
+                if key == list_key and self.peek() == '[':
+                    self.pos += 1
+                    yield from self.array_items()
+                else:
+                    yield 'field', (key, self.value())
+                if self.expect(',}') == '}':
+                    break
+        if self.peek():
+            raise ValueError("Unexpected data after the JSON document")
+
+
+def iter_json_records(path: str, list_key: str) -> Iterator[tuple[str, Any]]:
+    """Stream a JSON or JSON Lines deck without loading it whole.
+
+    Yields ('item', value) for each element of a top-level array, of the list_key
+    array in a top-level object, or for each JSON Lines record, and
+    ('field', (key, value)) for the object's other fields. In JSON Lines files a
+    record of the form {"title": ...} is reported as a field.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        if Path(path).suffix.lower() not in ('.jsonl', '.ndjson'):
+            try:
+                yield from _JsonStream(f).events(list_key)
+            except ValueError as e:
+                raise ValueError(f"{path}: {e}") from None
+            return
+
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{path}:{line_number}: {e}") from None
+            if isinstance(record, dict) and list(record) == ['title']:
+                yield 'field', ('title', record['title'])
+            else:
+                yield 'item', record
+
+
+def validate_question(question: Any, number: int) -> None:
+    if not isinstance(question, dict) or 'question' not in question or not isinstance(question.get('options'), list):
+        raise ValueError(f"Question {number} needs a 'question' field and an 'options' list")
+    if not isinstance(question.get('topic', ''), str):
+        raise ValueError(f"Question {number}: 'topic' must be a string")
+
+
+def tally_topics(questions: list, totals: dict) -> None:
+    """Add each question's topic to the per-topic question counts shown on the completion screen."""
+    for question in questions:
+        topic = question.get('topic')
+        if topic:
+            totals[topic] = totals.get(topic, 0) + 1
+
+
+QUIZ_STYLES = """        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
 
-        body {{
+        body {
             font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif;
             background: #ffffff;
             min-height: 100vh;
@@ -125,9 +500,9 @@ def generate_html(quiz_data: dict, katex_assets: dict) -> str:
             justify-content: center;
             align-items: flex-start;
             padding: 24px 16px 32px;
-        }}
+        }
 
-        .quiz-container {{
+        .quiz-container {
             background: white;
             border-radius: 16px;
             box-shadow: none;
@@ -137,42 +512,42 @@ def generate_html(quiz_data: dict, katex_assets: dict) -> str:
             display: flex;
             flex-direction: column;
             min-height: 640px;
-        }}
+        }
 
-        .quiz-header {{
+        .quiz-header {
             text-align: left;
             margin-bottom: 16px;
-        }}
+        }
 
-        .quiz-title {{
+        .quiz-title {
             font-size: 22px;
             font-weight: 600;
             color: #232323;
             margin-bottom: 4px;
-        }}
+        }
 
-        .quiz-subtitle {{
+        .quiz-subtitle {
             font-size: 13px;
             color: #9d9d9d;
-        }}
+        }
 
-        .progress-text {{
+        .progress-text {
             text-align: left;
             font-size: 13px;
             color: #9d9d9d;
             margin-bottom: 12px;
             font-weight: 500;
-        }}
+        }
 
-        .question-text {{
+        .question-text {
             font-size: 16px;
             font-weight: 500;
             color: #2a2a2a;
             margin-bottom: 16px;
             line-height: 1.5;
-        }}
+        }
 
-        .options {{
+        .options {
             display: flex;
             flex-direction: column;
             gap: 10px;
@@ -180,27 +555,27 @@ def generate_html(quiz_data: dict, katex_assets: dict) -> str:
             max-height: 400px;
             overflow-y: auto;
             padding-right: 4px;
-        }}
+        }
 
-        .options::-webkit-scrollbar {{
+        .options::-webkit-scrollbar {
             width: 6px;
-        }}
+        }
 
-        .options::-webkit-scrollbar-track {{
+        .options::-webkit-scrollbar-track {
             background: #f0f0f0;
             border-radius: 3px;
-        }}
+        }
 
-        .options::-webkit-scrollbar-thumb {{
+        .options::-webkit-scrollbar-thumb {
             background: #c0c0c0;
             border-radius: 3px;
-        }}
+        }
 
-        .options::-webkit-scrollbar-thumb:hover {{
+        .options::-webkit-scrollbar-thumb:hover {
             background: #a0a0a0;
-        }}
+        }
 
-        .option {{
+        .option {
             display: flex;
             align-items: center;
             padding: 14px 16px;
@@ -209,29 +584,29 @@ def generate_html(quiz_data: dict, katex_assets: dict) -> str:
             cursor: pointer;
             transition: all 0.2s ease;
             background: #f8f8f8;
-        }}
+        }
 
-        .option:hover:not(.selected):not(.disabled) {{
+        .option:hover:not(.selected):not(.disabled) {
             border-color: #e6e6e6;
             background: #f6f6f6;
-        }}
+        }
 
-        .option.selected {{
+        .option.selected {
             border-color: #d0d0d0;
             background: #dedede;
-        }}
+        }
 
         .option.correct,
-        .option.wrong {{
+        .option.wrong {
             border-color: #f0f0f0;
             background: #f8f8f8;
-        }}
+        }
 
-        .option.disabled {{
+        .option.disabled {
             cursor: default;
-        }}
+        }
 
-        .option-label {{
+        .option-label {
             display: inline-flex;
             align-items: center;
             justify-content: center;
@@ -240,28 +615,28 @@ def generate_html(quiz_data: dict, katex_assets: dict) -> str:
             flex-shrink: 0;
             color: #9d9d9d;
             width: 22px;
-        }}
+        }
 
-        .option.selected .option-label {{
+        .option.selected .option-label {
             color: #3a3a3a;
-        }}
+        }
 
-        .option.disabled .option-text {{
+        .option.disabled .option-text {
             color: #bdbdbd;
-        }}
+        }
 
-        .option.disabled .option-label {{
+        .option.disabled .option-label {
             color: #bdbdbd;
-        }}
+        }
 
-        .option-text {{
+        .option-text {
             flex: 1;
             font-size: 15px;
             color: #3a3a3a;
-        }}
+        }
 
 
-        .feedback-card {{
+        .feedback-card {
             padding: 14px 16px;
             border-radius: 12px;
             display: flex;
@@ -270,69 +645,69 @@ def generate_html(quiz_data: dict, katex_assets: dict) -> str:
             opacity: 0;
             transform: translateY(8px);
             transition: opacity 0.25s ease, transform 0.25s ease;
-        }}
+        }
 
-        .feedback-card.show {{
+        .feedback-card.show {
             opacity: 1;
             transform: translateY(0);
-        }}
+        }
 
-        .feedback-card.correct {{
+        .feedback-card.correct {
             background: #bfeacb;
-        }}
+        }
 
-        .feedback-card.wrong {{
+        .feedback-card.wrong {
             background: #fff7f7;
-        }}
+        }
 
-        .feedback-header {{
+        .feedback-header {
             display: flex;
             align-items: center;
             gap: 10px;
             font-size: 14px;
             font-weight: 600;
-        }}
+        }
 
-        .feedback-header.correct {{
+        .feedback-header.correct {
             color: #697b6e;
-        }}
+        }
 
-        .feedback-header.wrong {{
+        .feedback-header.wrong {
             color: #a42d22;
-        }}
+        }
 
-        .feedback-icon {{
+        .feedback-icon {
             font-size: 16px;
             font-weight: 600;
-        }}
+        }
 
-        .feedback-answer {{
+        .feedback-answer {
             font-size: 15px;
             color: #2a2a2a;
-        }}
+        }
 
-        .feedback-text {{
+        .feedback-text {
             font-size: 13px;
             line-height: 1.5;
-        }}
+        }
 
-        .feedback-card.correct .feedback-text {{
+        .feedback-card.correct .feedback-text {
             color: #444443;
-        }}
+        }
 
-        .feedback-card.wrong .feedback-text {{
+        .feedback-card.wrong .feedback-text {
             color: #2e2e2f;
-        }}
+        }
 
-        .buttons {{
+        .buttons {
             display: flex;
             justify-content: space-between;
             gap: 12px;
             margin-top: 24px;
             min-height: 52px;
-        }}
+        }
 
-        .btn {{
+        .btn {
             padding: 10px 22px;
             border-radius: 999px;
             font-size: 14px;
@@ -341,113 +716,139 @@ def generate_html(quiz_data: dict, katex_assets: dict) -> str:
             border: none;
             transition: all 0.2s ease;
             min-width: 120px;
-        }}
+        }
 
-        .btn-secondary {{
+        .btn-secondary {
             background: #ffffff;
             color: #6b7280;
             border: 1px solid #e2e2e2;
-        }}
+        }
 
-        .btn-secondary:hover:not(:disabled) {{
+        .btn-secondary:hover:not(:disabled) {
             background: #e5e5e5;
-        }}
+        }
 
-        .btn-secondary:disabled {{
+        .btn-secondary:disabled {
             opacity: 0.4;
             cursor: not-allowed;
-        }}
+        }
 
-        .btn-primary {{
+        .btn-primary {
             background: #424cf7;
             color: white;
-        }}
+        }
 
-        .btn-primary:hover:not(:disabled) {{
+        .btn-primary:hover:not(:disabled) {
             opacity: 0.95;
             transform: translateY(-1px);
             box-shadow: 0 6px 16px rgba(66, 76, 247, 0.25);
-        }}
+        }
 
-        .btn-primary:disabled {{
+        .btn-primary:disabled {
             opacity: 0.4;
             cursor: not-allowed;
-        }}
+        }
 
 
-        .completion-container {{
+        .completion-container {
             text-align: center;
             display: none;
-        }}
+        }
 
-        .completion-container.show {{
+        .completion-container.show {
             display: block;
-        }}
+        }
 
-        .completion-icon {{
+        .completion-icon {
             font-size: 64px;
             margin-bottom: 20px;
-        }}
+        }
 
-        .completion-title {{
+        .completion-title {
             font-size: 28px;
             font-weight: 600;
             color: #1a1a1a;
             margin-bottom: 12px;
-        }}
+        }
 
-        .completion-subtitle {{
+        .completion-subtitle {
             font-size: 16px;
             color: #666;
             margin-bottom: 30px;
-        }}
+        }
 
-        .stats-grid {{
+        .stats-grid {
             display: grid;
             grid-template-columns: repeat(2, 1fr);
             gap: 16px;
             margin-bottom: 30px;
-        }}
+        }
 
-        .stat-card {{
+        .stat-card {
             background: #f8f9ff;
             padding: 20px;
             border-radius: 12px;
             border: 1px solid #e0e0e0;
-        }}
+        }
 
-        .stat-label {{
+        .stat-label {
             font-size: 14px;
             color: #666;
             margin-bottom: 8px;
-        }}
+        }
 
-        .stat-value {{
+        .stat-value {
             font-size: 28px;
             font-weight: 600;
             color: #1a1a1a;
-        }}
+        }
 
-        .stat-card.score {{
+        .stat-card.score {
             grid-column: 1 / -1;
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        }}
+        }
 
-        .stat-card.score .stat-label {{
+        .stat-card.score .stat-label {
             color: rgba(255, 255, 255, 0.9);
-        }}
+        }
 
-        .stat-card.score .stat-value {{
+        .stat-card.score .stat-value {
             color: white;
-        }}
+        }
+
+        .topic-breakdown {
+            text-align: left;
+            margin-bottom: 30px;
+        }
+
+        .topic-breakdown-title {
+            font-size: 14px;
+            color: #666;
+            margin-bottom: 8px;
+        }
+
+        .topic-row {
+            display: flex;
+            justify-content: space-between;
+            gap: 12px;
+            padding: 10px 0;
+            border-top: 1px solid #e0e0e0;
+            font-size: 15px;
+            color: #1a1a1a;
+        }
+
+        .topic-score {
+            font-weight: 600;
+            white-space: nowrap;
+        }
 
-        .completion-buttons {{
+        .completion-buttons {
             display: flex;
             justify-content: center;
             gap: 12px;
-        }}
+        }
 
-        .hint-toggle {{
+        .hint-toggle {
             display: inline-flex;
             align-items: center;
             gap: 6px;
@@ -457,18 +858,18 @@ def generate_html(quiz_data: dict, katex_assets: dict) -> str:
             border: none;
             padding: 0;
             cursor: pointer;
-        }}
+        }
 
-        .hint-toggle .chevron {{
+        .hint-toggle .chevron {
             display: inline-block;
             transition: transform 0.2s ease;
-        }}
+        }
 
-        .hint-toggle.open .chevron {{
+        .hint-toggle.open .chevron {
             transform: rotate(180deg);
-        }}
+        }
 
-        .hint-panel {{
+        .hint-panel {
             padding: 12px 14px;
             background: #ebecf8;
             border-radius: 12px;
@@ -476,298 +877,364 @@ def generate_html(quiz_data: dict, katex_assets: dict) -> str:
             opacity: 0;
             transform: translateY(6px);
             transition: opacity 0.2s ease, transform 0.2s ease;
-        }}
+        }
 
-        .hint-panel.show {{
+        .hint-panel.show {
             display: block;
             opacity: 1;
             transform: translateY(0);
-        }}
+        }
 
-        .hint-title {{
+        .hint-title {
             font-weight: 600;
             font-size: 13px;
             color: #4e4e4e;
             margin-bottom: 6px;
-        }}
+        }
 
-        .hint-text {{
+        .hint-text {
             font-size: 13px;
             color: #474749;
             line-height: 1.5;
-        }}
+        }
 
-        .hint-slot {{
+        .hint-slot {
             min-height: 72px;
-        }}
+        }
 
-        .quiz-footer {{
+        .quiz-footer {
             margin-top: auto;
-        }}
+        }
 
-        .question-container {{
+        .question-container {
             display: none;
-        }}
+        }
 
-        .question-container.active {{
+        .question-container.active {
             display: block;
-        }}
-    </style>
-    {katex_styles}
-</head>
-<body>
-    <div class="quiz-container">
-        <div class="quiz-header">
-            <div class="quiz-title">{title}</div>
-            <div class="quiz-subtitle">Based on 1 source</div>
-        </div>
-
-        <div id="quiz-content">
-            <!-- Questions will be rendered here -->
-        </div>
-
-        <div id="completion-screen" class="completion-container">
-            <div class="completion-icon">🎉</div>
-            <div class="completion-title">You did it! Quiz Complete.</div>
-            <div class="completion-subtitle">Here's how you performed</div>
-
-            <div class="stats-grid">
-                <div class="stat-card score">
-                    <div class="stat-label">Score</div>
-                    <div class="stat-value" id="score-value">0/{total_questions}</div>
-                </div>
-                <div class="stat-card">
-                    <div class="stat-label">Accuracy</div>
-                    <div class="stat-value" id="accuracy-value">0%</div>
-                </div>
-                <div class="stat-card">
-                    <div class="stat-label">Right</div>
-                    <div class="stat-value" id="right-value">0</div>
-                </div>
-                <div class="stat-card">
-                    <div class="stat-label">Wrong</div>
-                    <div class="stat-value" id="wrong-value">0</div>
-                </div>
-                <div class="stat-card">
-                    <div class="stat-label">Skipped</div>
-                    <div class="stat-value" id="skipped-value">0</div>
-                </div>
-            </div>
-
-            <div class="completion-buttons">
-                <button class="btn btn-secondary" onclick="reviewQuiz()">Review Quiz</button>
-                <button class="btn btn-primary" onclick="retakeQuiz()">Retake Quiz</button>
-            </div>
-        </div>
-    </div>
+        }
+"""
 
-    {katex_scripts}
-    <script>
-        const questions = {questions_json};
-        const totalQuestions = questions.length;
+QUIZ_SCRIPT = """        const totalQuestions = questions.length;
         let currentQuestionIndex = 0;
-        let userAnswers = []; // Store user's answers {{questionIndex, selectedIndex, isCorrect}}
+        let userAnswers = []; // Store user's answers {questionIndex, selectedIndex, isCorrect}
         let isReviewMode = false;
 
-        function renderMath(target) {{
+        // Running totals, updated as questions are answered so finishing never scans
+        // userAnswers; topicTotals (questions per topic) is counted at build time
+        let score = newScore();
+        let topicScores = null;
+
+        function newScore() {
+            return {correct: 0, wrong: 0, topics: new Map()};
+        }
+
+        function renderMath(target) {
             if (!target || typeof renderMathInElement !== 'function') return;
-            renderMathInElement(target, {{
+            renderMathInElement(target, {
                 delimiters: [
-                    {{left: '$$', right: '$$', display: true}},
-                    {{left: '$', right: '$', display: false}},
-                    {{left: '\\(', right: '\\)', display: false}},
-                    {{left: '\\[', right: '\\]', display: true}}
+                    {left: '$$', right: '$$', display: true},
+                    {left: '$', right: '$', display: false},
+                    {left: '\\(', right: '\\)', display: false},
+                    {left: '\\[', right: '\\]', display: true}
                 ],
                 throwOnError: false
-            }});
-        }}
+            });
+        }
 
-        function initQuiz() {{
+        function initQuiz() {
             renderQuestion();
-        }}
-
-        function renderQuestion() {{
-            const quizContent = document.getElementById('quiz-content');
-            const question = questions[currentQuestionIndex];
-            const userAnswer = userAnswers[currentQuestionIndex];
-
-            const isAnswered = userAnswer !== undefined;
-
-            // Determine button states
-            const showPrevious = currentQuestionIndex > 0;
-            const showNext = isAnswered && currentQuestionIndex < totalQuestions - 1;
-            const showFinish = isAnswered && currentQuestionIndex === totalQuestions - 1 && !isReviewMode;
-            const showFinishReview = isReviewMode && currentQuestionIndex === totalQuestions - 1;
-            const showHint = !!question.hint;
-
-            let optionsHtml = '';
-            question.options.forEach((option, index) => {{
-                const letter = String.fromCharCode(65 + index); // A, B, C, D
-
-                if (isAnswered) {{
-                    if (index === question.correctIndex) {{
-                        const correctExplain = question.correctExplanation || question.explanation || '';
-                        optionsHtml += `
-                            <div class="feedback-card correct show">
-                                <div class="feedback-answer">${{letter}}. ${{option}}</div>
-                                <div class="feedback-header correct">
-                                    <span class="feedback-icon">✓</span>
-                                    <span>Right answer</span>
-                                </div>
-                                <div class="feedback-text">${{correctExplain}}</div>
-                            </div>
-                        `;
-                        return;
-                    }}
-
-                    if (!userAnswer.isCorrect && index === userAnswer.selectedIndex) {{
-                        const wrongExplain = question.wrongExplanation || question.explanation || '';
-                        optionsHtml += `
-                            <div class="feedback-card wrong show">
-                                <div class="feedback-answer">${{letter}}. ${{option}}</div>
-                                <div class="feedback-header wrong">
-                                    <span class="feedback-icon">✕</span>
-                                    <span>Not quite</span>
-                                </div>
-                                <div class="feedback-text">${{wrongExplain}}</div>
-                            </div>
-                        `;
-                        return;
-                    }}
-
-                    optionsHtml += `
-                        <div class="option disabled" data-index="${{index}}">
-                            <span class="option-label">${{letter}}.</span>
-                            <span class="option-text">${{option}}</span>
-                        </div>
-                    `;
-                    return;
-                }}
-
-                const optionClass = index === (userAnswer ? userAnswer.selectedIndex : -1) ? 'option selected' : 'option';
-                optionsHtml += `
-                    <div class="${{optionClass}}" onclick="selectAnswer(${{index}})" data-index="${{index}}">
-                        <span class="option-label">${{letter}}.</span>
-                        <span class="option-text">${{option}}</span>
-                    </div>
-                `;
-            }});
+        }
 
-            let hintHtml = '';
-            if (showHint) {{
-                hintHtml = `
-                    <button class="hint-toggle" id="hint-toggle" onclick="toggleHint()">
-                        <span>Hint</span>
-                        <span class="chevron">⌃</span>
-                    </button>
-                    <div id="hint-panel" class="hint-panel">
-                        <div class="hint-title">Hint</div>
-                        <div class="hint-text">${{question.hint}}</div>
-                    </div>
-                `;
-            }}
+        // The page frame (progress and buttons) is built once. Each question's text,
+        // options and hint are built and math-rendered once per visit, kept for the
+        // last few questions, and answering only patches the options involved.
+        const MAX_CACHED_VIEWS = 20;
+        const questionViews = new Map();
+        let frame = null;
 
-            let buttonsHtml = `
+        function buildFrame() {
+            const quizContent = document.getElementById('quiz-content');
+            quizContent.innerHTML = `
+                <div class="progress-text"></div>
+                <div class="question-text"></div>
+                <div class="options"></div>
+                <div class="hint-slot"></div>
                 <div class="quiz-footer">
                     <div class="buttons">
                         <div style="display: flex; gap: 12px;">
-                            <button class="btn btn-secondary" onclick="previousQuestion()" ${{showPrevious ? '' : 'disabled'}}>
+                            <button class="btn btn-secondary" onclick="previousQuestion()">
                                 Previous
                             </button>
                         </div>
                         <div>
-                            ${{showNext ? '<button class="btn btn-primary" onclick="nextQuestion()">Next</button>' : ''}}
-                            ${{showFinish ? '<button class="btn btn-primary" onclick="finishQuiz()">Finish Quiz</button>' : ''}}
-                            ${{showFinishReview ? '<button class="btn btn-primary" onclick="finishReview()">Finish Review</button>' : ''}}
+                            <button class="btn btn-primary" onclick="nextQuestion()" hidden>Next</button>
+                            <button class="btn btn-primary" onclick="finishQuiz()" hidden>Finish Quiz</button>
+                            <button class="btn btn-primary" onclick="finishReview()" hidden>Finish Review</button>
                         </div>
                     </div>
                 </div>
             `;
+            const [progress, questionText, options, hintSlot] = quizContent.children;
+            const [previousButton, nextButton, finishButton, finishReviewButton] = quizContent.getElementsByTagName('button');
+            frame = {
+                progress,
+                view: {questionText, options, hintSlot},
+                previousButton,
+                nextButton,
+                finishButton,
+                finishReviewButton
+            };
+        }
 
-            quizContent.innerHTML = `
-                <div class="progress-text">${{currentQuestionIndex + 1}} / ${{totalQuestions}}</div>
-                <div class="question-text">${{question.question}}</div>
-                <div class="options">
-                    ${{optionsHtml}}
-                </div>
-                <div class="hint-slot">
-                    ${{hintHtml}}
+        function optionHtml(question, index, userAnswer) {
+            const option = question.options[index];
+            const letter = String.fromCharCode(65 + index); // A, B, C, D
+
+            if (userAnswer === undefined) {
+                return `
+                    <div class="option" onclick="selectAnswer(${index})" data-index="${index}">
+                        <span class="option-label">${letter}.</span>
+                        <span class="option-text">${option}</span>
+                    </div>
+                `;
+            }
+
+            if (index === question.correctIndex) {
+                const correctExplain = question.correctExplanation || question.explanation || '';
+                return `
+                    <div class="feedback-card correct show">
+                        <div class="feedback-answer">${letter}. ${option}</div>
+                        <div class="feedback-header correct">
+                            <span class="feedback-icon">✓</span>
+                            <span>Right answer</span>
+                        </div>
+                        <div class="feedback-text">${correctExplain}</div>
+                    </div>
+                `;
+            }
+
+            if (!userAnswer.isCorrect && index === userAnswer.selectedIndex) {
+                const wrongExplain = question.wrongExplanation || question.explanation || '';
+                return `
+                    <div class="feedback-card wrong show">
+                        <div class="feedback-answer">${letter}. ${option}</div>
+                        <div class="feedback-header wrong">
+                            <span class="feedback-icon">✕</span>
+                            <span>Not quite</span>
+                        </div>
+                        <div class="feedback-text">${wrongExplain}</div>
+                    </div>
+                `;
+            }
+
+            return `
+                <div class="option disabled" data-index="${index}">
+                    <span class="option-label">${letter}.</span>
+                    <span class="option-text">${option}</span>
                 </div>
-                ${{buttonsHtml}}
             `;
-            renderMath(quizContent);
-        }}
+        }
 
-        function selectAnswer(selectedIndex) {{
+        function buildView(index) {
+            const question = questions[index];
+            const userAnswer = userAnswers[index];
+            const view = {
+                questionText: document.createElement('div'),
+                options: document.createElement('div'),
+                hintSlot: document.createElement('div')
+            };
+
+            view.questionText.className = 'question-text';
+            view.questionText.innerHTML = question.question;
+            view.options.className = 'options';
+            view.options.innerHTML = question.options.map((option, i) => optionHtml(question, i, userAnswer)).join('');
+            view.hintSlot.className = 'hint-slot';
+            if (question.hint) {
+                view.hintSlot.innerHTML = `
+                    <button class="hint-toggle" id="hint-toggle" onclick="toggleHint()">
+                        <span>Hint</span>
+                        <span class="chevron">⌃</span>
+                    </button>
+                    <div id="hint-panel" class="hint-panel">
+                        <div class="hint-title">Hint</div>
+                        <div class="hint-text">${question.hint}</div>
+                    </div>
+                `;
+            }
+
+            // Rendered while detached, so the page lays out once when the view is shown
+            renderMath(view.questionText);
+            renderMath(view.options);
+            renderMath(view.hintSlot);
+            return view;
+        }
+
+        function questionView(index) {
+            let view = questionViews.get(index);
+            if (view) {
+                questionViews.delete(index);
+            } else {
+                view = buildView(index);
+            }
+            questionViews.set(index, view);
+            if (questionViews.size > MAX_CACHED_VIEWS) {
+                questionViews.delete(questionViews.keys().next().value);
+            }
+            return view;
+        }
+
+        function updateButtons() {
+            const isAnswered = userAnswers[currentQuestionIndex] !== undefined;
+            const isLast = currentQuestionIndex === totalQuestions - 1;
+
+            frame.previousButton.disabled = currentQuestionIndex === 0;
+            frame.nextButton.hidden = !(isAnswered && !isLast);
+            frame.finishButton.hidden = !(isAnswered && isLast && !isReviewMode);
+            frame.finishReviewButton.hidden = !(isReviewMode && isLast);
+        }
+
+        function renderQuestion() {
+            if (!frame) {
+                buildFrame();
+            }
+
+            const view = questionView(currentQuestionIndex);
+            if (frame.view !== view) {
+                frame.view.questionText.replaceWith(view.questionText);
+                frame.view.options.replaceWith(view.options);
+                frame.view.hintSlot.replaceWith(view.hintSlot);
+                frame.view = view;
+            }
+
+            // A question is always shown with its hint closed
+            const [hintToggle, hintPanel] = view.hintSlot.children;
+            if (hintPanel) {
+                hintPanel.classList.remove('show');
+                hintToggle.classList.remove('open');
+            }
+
+            const progress = `${currentQuestionIndex + 1} / ${totalQuestions}`;
+            if (frame.progress.textContent !== progress) {
+                frame.progress.textContent = progress;
+            }
+            updateButtons();
+        }
+
+        function selectAnswer(selectedIndex) {
+            if (userAnswers[currentQuestionIndex] !== undefined) return;
             const question = questions[currentQuestionIndex];
             const isCorrect = selectedIndex === question.correctIndex;
 
             // Store the answer
-            userAnswers[currentQuestionIndex] = {{
+            userAnswers[currentQuestionIndex] = {
                 questionIndex: currentQuestionIndex,
                 selectedIndex: selectedIndex,
                 isCorrect: isCorrect
-            }};
+            };
+            const result = isCorrect ? 'correct' : 'wrong';
+            score[result]++;
+            if (question.topic) {
+                if (!score.topics.has(question.topic)) {
+                    score.topics.set(question.topic, {correct: 0, wrong: 0});
+                }
+                score.topics.get(question.topic)[result]++;
+            }
 
-            // Re-render to show feedback
-            renderQuestion();
-        }}
+            // Only the right answer and a wrong pick turn into feedback cards; the
+            // other options are disabled in place
+            Array.from(frame.view.options.children).forEach((optionElement, index) => {
+                if (index === question.correctIndex || (!isCorrect && index === selectedIndex)) {
+                    const holder = document.createElement('div');
+                    holder.innerHTML = optionHtml(question, index, userAnswers[currentQuestionIndex]);
+                    const card = holder.firstElementChild;
+                    renderMath(card);
+                    optionElement.replaceWith(card);
+                } else {
+                    optionElement.classList.add('disabled');
+                    optionElement.removeAttribute('onclick');
+                }
+            });
+            updateButtons();
+        }
 
-        function toggleHint() {{
+        function toggleHint() {
             const hintPanel = document.getElementById('hint-panel');
             const hintToggle = document.getElementById('hint-toggle');
-            if (hintPanel) {{
+            if (hintPanel) {
                 hintPanel.classList.toggle('show');
-            }}
-            if (hintToggle) {{
+            }
+            if (hintToggle) {
                 hintToggle.classList.toggle('open');
-            }}
-        }}
+            }
+        }
 
-        function nextQuestion() {{
-            if (currentQuestionIndex < totalQuestions - 1) {{
+        function nextQuestion() {
+            if (currentQuestionIndex < totalQuestions - 1) {
                 currentQuestionIndex++;
                 renderQuestion();
-            }}
-        }}
+            }
+        }
 
-        function previousQuestion() {{
-            if (currentQuestionIndex > 0) {{
+        function previousQuestion() {
+            if (currentQuestionIndex > 0) {
                 currentQuestionIndex--;
                 renderQuestion();
-            }}
-        }}
+            }
+        }
 
-        function finishQuiz() {{
+        function finishQuiz() {
             showCompletionScreen();
-        }}
+        }
 
-        function showCompletionScreen() {{
+        function showCompletionScreen() {
             const quizContent = document.getElementById('quiz-content');
             const completionScreen = document.getElementById('completion-screen');
 
-            // Calculate stats
-            const answeredQuestions = userAnswers.filter(a => a !== undefined);
-            const correctAnswers = userAnswers.filter(a => a && a.isCorrect).length;
-            const wrongAnswers = userAnswers.filter(a => a && !a.isCorrect).length;
-            const skipped = totalQuestions - answeredQuestions.length;
-            const accuracy = answeredQuestions.length > 0
-                ? Math.round((correctAnswers / answeredQuestions.length) * 100)
-                : 0;
+            const answered = score.correct + score.wrong;
+            const accuracy = answered > 0 ? Math.round((score.correct / answered) * 100) : 0;
 
             // Update stats
-            document.getElementById('score-value').textContent = `${{correctAnswers}}/${{totalQuestions}}`;
-            document.getElementById('accuracy-value').textContent = `${{accuracy}}%`;
-            document.getElementById('right-value').textContent = correctAnswers;
-            document.getElementById('wrong-value').textContent = wrongAnswers;
-            document.getElementById('skipped-value').textContent = skipped;
+            document.getElementById('score-value').textContent = `${score.correct}/${totalQuestions}`;
+            document.getElementById('accuracy-value').textContent = `${accuracy}%`;
+            document.getElementById('right-value').textContent = score.correct;
+            document.getElementById('wrong-value').textContent = score.wrong;
+            document.getElementById('skipped-value').textContent = totalQuestions - answered;
+            updateTopicBreakdown();
 
             // Show completion screen
             quizContent.style.display = 'none';
             completionScreen.classList.add('show');
-        }}
+        }
 
-        function reviewQuiz() {{
+        function updateTopicBreakdown() {
+            // Rows are created on the first finish and only their scores change afterwards
+            if (!topicScores) {
+                const topics = Object.keys(topicTotals);
+                if (!topics.length) return;
+                const breakdown = document.getElementById('topic-breakdown');
+                topicScores = new Map();
+                topics.forEach(topic => {
+                    const row = document.createElement('div');
+                    row.className = 'topic-row';
+                    row.innerHTML = '<span class="topic-name"></span><span class="topic-score"></span>';
+                    row.firstElementChild.textContent = topic;
+                    breakdown.appendChild(row);
+                    topicScores.set(topic, row.lastElementChild);
+                });
+                breakdown.hidden = false;
+            }
+
+            topicScores.forEach((cell, topic) => {
+                const result = score.topics.get(topic) || {correct: 0, wrong: 0};
+                const skipped = topicTotals[topic] - result.correct - result.wrong;
+                cell.textContent = `${result.correct}/${topicTotals[topic]}` +
+                    (result.wrong ? ` · ${result.wrong} wrong` : '') +
+                    (skipped ? ` · ${skipped} skipped` : '');
+            });
+        }
+
+        function reviewQuiz() {
             isReviewMode = true;
             currentQuestionIndex = 0;
             const quizContent = document.getElementById('quiz-content');
@@ -776,59 +1243,1423 @@ def generate_html(quiz_data: dict, katex_assets: dict) -> str:
             quizContent.style.display = 'block';
             completionScreen.classList.remove('show');
             renderQuestion();
-        }}
+        }
 
-        function finishReview() {{
+        function finishReview() {
             showCompletionScreen();
-        }}
+        }
 
-        function retakeQuiz() {{
+        function retakeQuiz() {
             isReviewMode = false;
             currentQuestionIndex = 0;
             userAnswers = [];
+            score = newScore();
+            questionViews.clear();
             const quizContent = document.getElementById('quiz-content');
             const completionScreen = document.getElementById('completion-screen');
 
             quizContent.style.display = 'block';
             completionScreen.classList.remove('show');
             renderQuestion();
-        }}
+        }
 
         // Initialize quiz on page load
         initQuiz();
-    </script>
+"""
+
+
+LAZY_QUESTIONS_SCRIPT = """        const questions = ((total, chunkSize) => {
+            // Questions live in <script type="application/json"> chunks and are parsed on first access
+            const chunks = [];
+            const load = (index) => {
+                const chunk = Math.floor(index / chunkSize);
+                if (!chunks[chunk]) {
+                    chunks[chunk] = JSON.parse(document.getElementById('quiz-chunk-' + chunk).textContent);
+                }
+                return chunks[chunk][index % chunkSize];
+            };
+            return new Proxy([], {
+                get(target, key) {
+                    if (key === 'length') return total;
+                    if (typeof key === 'string' && /^\\d+$/.test(key)) {
+                        return Number(key) < total ? load(Number(key)) : undefined;
+                    }
+                    return target[key];
+                }
+            });
+        })(@@TOTAL@@, @@CHUNK_SIZE@@);"""
+
+
+QUIZ_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>@@TITLE@@</title>
+@@STYLES@@
+    @@KATEX_STYLES@@
+</head>
+<body>
+    <div class="quiz-container">
+        <div class="quiz-header">
+            <div class="quiz-title">@@TITLE@@</div>
+            <div class="quiz-subtitle">Based on 1 source</div>
+        </div>
+
+        <div id="quiz-content">
+            <!-- Questions will be rendered here -->
+        </div>
+
+        <div id="completion-screen" class="completion-container">
+            <div class="completion-icon">🎉</div>
+            <div class="completion-title">You did it! Quiz Complete.</div>
+            <div class="completion-subtitle">Here's how you performed</div>
+
+            <div class="stats-grid">
+                <div class="stat-card score">
+                    <div class="stat-label">Score</div>
+                    <div class="stat-value" id="score-value">0/@@TOTAL_QUESTIONS@@</div>
+                </div>
+                <div class="stat-card">
+                    <div class="stat-label">Accuracy</div>
+                    <div class="stat-value" id="accuracy-value">0%</div>
+                </div>
+                <div class="stat-card">
+                    <div class="stat-label">Right</div>
+                    <div class="stat-value" id="right-value">0</div>
+                </div>
+                <div class="stat-card">
+                    <div class="stat-label">Wrong</div>
+                    <div class="stat-value" id="wrong-value">0</div>
+                </div>
+                <div class="stat-card">
+                    <div class="stat-label">Skipped</div>
+                    <div class="stat-value" id="skipped-value">0</div>
+                </div>
+            </div>
+
+            <div class="topic-breakdown" id="topic-breakdown" hidden>
+                <div class="topic-breakdown-title">By topic</div>
+            </div>
+
+            <div class="completion-buttons">
+                <button class="btn btn-secondary" onclick="reviewQuiz()">Review Quiz</button>
+                <button class="btn btn-primary" onclick="retakeQuiz()">Retake Quiz</button>
+            </div>
+        </div>
+    </div>
+
+    @@KATEX_SCRIPTS@@
+@@CHUNKS@@    <script>
+@@QUESTIONS_SCRIPT@@
+@@INLINE_SCRIPT@@    </script>@@EXTERNAL_SCRIPT@@
 </body>
 </html>"""
 
-    return html
+PAGE_SLOT_RE = re.compile(r'@@([A-Z_]+)@@')
+MAX_COMPILED_PAGES = 64
+
+
+def compile_page(template: str, static: dict) -> tuple[list[bytes], list[str]]:
+    """Fill the static slots of template and split it around the remaining ones.
+
+    Returns (literals, slots) with len(literals) == len(slots) + 1. The literals
+    are kept UTF-8 encoded: the page holds non-ASCII characters, so building it
+    as str would widen and re-encode every static byte on each render, while
+    fill_page only has to encode the per-page values.
+    """
+    parts = PAGE_SLOT_RE.split(template)
+    literals, slots = [parts[0]], []
+    for name, literal in zip(parts[1::2], parts[2::2]):
+        if name in static:
+            literals[-1] += static[name] + literal
+        else:
+            slots.append(name)
+            literals.append(literal)
+    return [literal.encode('utf-8') for literal in literals], slots
+
+
+def fill_page(page: tuple[list[bytes], list[str]], values: dict) -> bytes:
+    literals, slots = page
+    parts = [literals[0]]
+    for name, literal in zip(slots, literals[1:]):
+        parts.append(values[name].encode('utf-8'))
+        parts.append(literal)
+    return b''.join(parts)
+
+
+def _script_json(value) -> str:
+    # "</" would end the surrounding <script> element early
+    return json.dumps(value, ensure_ascii=False).replace('</', '<\\/')
+
+
+def lazy_questions_script(total_questions: int, chunk_size: int) -> str:
+    return (
+        LAZY_QUESTIONS_SCRIPT
+        .replace('@@TOTAL@@', str(total_questions))
+        .replace('@@CHUNK_SIZE@@', str(chunk_size))
+    )
+
+
+def question_chunks(questions: list, chunk_size: int) -> str:
+    """Emit questions as JSON data blocks of chunk_size questions each."""
+    return ''.join(
+        f"    <script type=\"application/json\" id=\"quiz-chunk-{number}\">"
+        f"{_script_json(questions[start:start + chunk_size])}</script>\n"
+        for number, start in enumerate(range(0, len(questions), chunk_size))
+    )
+
+
+def generate_html(
+    quiz_data: dict,
+    katex_assets: dict,
+    shared_urls: Optional[dict] = None,
+    chunk_size: int = 0
+) -> str:
+    """Generate interactive quiz HTML (see render_quiz_html, which skips the decode)."""
+    return render_quiz_html(quiz_data, katex_assets, shared_urls, chunk_size).decode('utf-8')
+
+
+def render_quiz_html(
+    quiz_data: dict,
+    katex_assets: dict,
+    shared_urls: Optional[dict] = None,
+    chunk_size: int = 0
+) -> bytes:
+    """Generate interactive quiz HTML as UTF-8.
+
+    With shared_urls (see shared_asset_urls) the page links the shared CSS/JS files
+    instead of inlining them. A positive chunk_size stores the questions in chunks
+    that are parsed as the learner reaches them instead of all at page load.
+    """
 
+    title = quiz_data.get("title", "Quiz")
+    questions = quiz_data.get("questions", [])
+    total_questions = len(questions)
+    topic_totals = {}
+    tally_topics(questions, topic_totals)
 
-def convert_quiz(input_path: str, output_path: str) -> str:
-    """Convert JSON quiz to interactive HTML."""
-    logger.info(f"Loading quiz from {input_path}")
-    quiz_data = load_quiz_data(input_path)
+    # Convert questions to JSON string for embedding
+    if chunk_size > 0:
+        chunks = question_chunks(questions, chunk_size)
+        questions_script = lazy_questions_script(total_questions, chunk_size)
+    else:
+        chunks = ''
+        questions_script = f"        const questions = {_script_json(questions)};"
+
+    return render_quiz_page(title, total_questions, chunks, questions_script, katex_assets, shared_urls, topic_totals)
+
+
+def render_quiz_page(
+    title: str,
+    total_questions: int,
+    chunks: str,
+    questions_script: str,
+    katex_assets: dict,
+    shared_urls: Optional[dict] = None,
+    topic_totals: Optional[dict] = None
+) -> bytes:
+    """Fill the page template around already serialised question data; returns UTF-8.
+
+    topic_totals maps each topic to its question count for the completion screen.
+    """
+
+    page = compiled_quiz_page(katex_assets, shared_urls)
+    return fill_page(page, {
+        'TITLE': str(title),
+        'TOTAL_QUESTIONS': str(total_questions),
+        'CHUNKS': chunks,
+        'QUESTIONS_SCRIPT': f"{questions_script}\n        const topicTotals = {_script_json(topic_totals or {})};"
+    })
+
+
+def compiled_quiz_page(katex_assets: dict, shared_urls: Optional[dict] = None) -> tuple[list[bytes], list[str]]:
+    """Return the page template with its asset slots filled, compiled once per asset set."""
+
+    key = (katex_assets['styles'], katex_assets['scripts'], tuple(shared_urls.items()) if shared_urls else None)
+    page = _compiled_pages.get(key)
+    if page is not None:
+        return page
 
-    logger.info(f"Generating HTML with {len(quiz_data['questions'])} questions")
-    katex_assets = get_katex_assets()
-    html = generate_html(quiz_data, katex_assets)
+    katex_styles = katex_assets['styles']
+    katex_scripts = katex_assets['scripts']
+    styles = f"    <style>\n{QUIZ_STYLES}    </style>"
+    inline_script = QUIZ_SCRIPT
+    external_script = ''
+
+    if shared_urls:
+        styles = f"    <link rel=\"stylesheet\" href=\"{shared_urls['quiz_css']}\">"
+        inline_script = ''
+        external_script = f"\n    <script src=\"{shared_urls['quiz_js']}\"></script>"
+        if 'katex_css' in shared_urls:
+            katex_styles = f"<link rel=\"stylesheet\" href=\"{shared_urls['katex_css']}\">"
+        if 'katex_js' in shared_urls:
+            katex_scripts = (
+                f"<script src=\"{shared_urls['katex_js']}\"></script>\n"
+                f"<script src=\"{shared_urls['auto_render_js']}\"></script>"
+            )
+
+    page = compile_page(QUIZ_PAGE_TEMPLATE, {
+        'STYLES': styles,
+        'KATEX_STYLES': katex_styles,
+        'KATEX_SCRIPTS': katex_scripts,
+        'INLINE_SCRIPT': inline_script,
+        'EXTERNAL_SCRIPT': external_script
+    })
+    if len(_compiled_pages) >= MAX_COMPILED_PAGES:
+        _compiled_pages.clear()
+    _compiled_pages[key] = page
+    return page
+
+
+# Same delimiters, in the same order, as renderMath() in QUIZ_SCRIPT
+MATH_DELIMITERS = (('$$', '$$', True), ('$', '$', False), ('\\(', '\\)', False), ('\\[', '\\]', True))
+MATH_LEFT_RE = re.compile('|'.join(re.escape(left) for left, _, _ in MATH_DELIMITERS))
+MATH_SPECIAL_RE = re.compile(r'[\\{}]')
+HTML_TAG_RE = re.compile(r'<[A-Za-z/!?]')
+QUIZ_MATH_FIELDS = ('question', 'options', 'hint', 'correctExplanation', 'wrongExplanation', 'explanation')
+MAX_MATH_MEMO = 50000
+
+KATEX_WORKER_JS = r"""
+const readline = require('readline');
+const reply = (message) => process.stdout.write(JSON.stringify(message) + '\n');
+let katex;
+try {
+  katex = require(process.argv[1]);
+} catch (error) {
+  reply({ ready: false, error: String(error) });
+  process.exit(1);
+}
+if (typeof katex.renderToString !== 'function') {
+  reply({ ready: false, error: 'katex.min.js does not export renderToString' });
+  process.exit(1);
+}
+reply({ ready: true });
+
+readline.createInterface({ input: process.stdin }).on('line', (line) => {
+  if (!line.trim()) return;
+  const request = JSON.parse(line);
+  reply({ html: request.formulas.map(([tex, displayMode]) => {
+    try {
+      return katex.renderToString(tex, { displayMode, throwOnError: true });
+    } catch (error) {
+      return null;
+    }
+  }) });
+});
+"""
 
-    logger.info(f"Writing HTML to {output_path}")
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html)
 
-    ensure_katex_fonts(output_path, katex_assets['fonts_dir'])
+def _find_end_of_math(delimiter: str, text: str, start: int) -> int:
+    # Port of auto-render's findEndOfMath: skip escaped characters and braced groups
+    end = text.find(delimiter, start)
+    if end != -1 and not MATH_SPECIAL_RE.search(text, start, end):
+        return end
+    index = start
+    braces = 0
+    while index < len(text):
+        if braces <= 0 and text.startswith(delimiter, index):
+            return index
+        character = text[index]
+        if character == '\\':
+            index += 1
+        elif character == '{':
+            braces += 1
+        elif character == '}':
+            braces -= 1
+        index += 1
+    return -1
+
+
+def split_math(text: str) -> list[Union[str, tuple[str, str, bool]]]:
+    """Split text at math delimiters exactly as KaTeX auto-render does.
+
+    Returns plain text strings and (tex, raw, display) tuples, raw being the
+    formula with its delimiters.
+    """
+    parts: list[Union[str, tuple[str, str, bool]]] = []
+    while True:
+        match = MATH_LEFT_RE.search(text)
+        if not match:
+            break
+        if match.start():
+            parts.append(text[:match.start()])
+            text = text[match.start():]
+        left, right, display = next(delimiter for delimiter in MATH_DELIMITERS if text.startswith(delimiter[0]))
+        end = _find_end_of_math(right, text, len(left))
+        if end == -1:
+            break
+        parts.append((text[len(left):end], text[:end + len(right)], display))
+        text = text[end + len(right):]
+    if text:
+        parts.append(text)
+    return parts
+
+
+class MathRenderCache:
+    """Persistent store of KaTeX output shared by every deck and skill on this machine.
+
+    Entries are keyed by TeX, display mode and KaTeX version. Once the entries
+    exceed max_bytes the least recently used are evicted, and lifetime hit and
+    miss counts are kept next to them.
+    """
+
+    def __init__(self, version: str, path: Path = MATH_CACHE_PATH, max_bytes: int = MATH_CACHE_MAX_BYTES):
+        self.version = version
+        self.max_bytes = max_bytes
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=30)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS renders (
+                tex TEXT NOT NULL,
+                display INTEGER NOT NULL,
+                version TEXT NOT NULL,
+                html TEXT,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (tex, display, version)
+            );
+            CREATE INDEX IF NOT EXISTS renders_last_used ON renders (last_used);
+            CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+            INSERT OR IGNORE INTO counters VALUES ('hits', 0), ('misses', 0);
+        """)
+
+    def get(self, formulas: list[tuple[str, bool]]) -> dict[tuple[str, bool], Optional[str]]:
+        """Return the cached formulas (None for TeX KaTeX rejected) and mark them used."""
+        found = {}
+        for tex, display in formulas:
+            row = self.db.execute(
+                'SELECT html FROM renders WHERE tex = ? AND display = ? AND version = ?',
+                (tex, display, self.version)
+            ).fetchone()
+            if row:
+                found[(tex, display)] = row[0]
+        if found:
+            with self.db:
+                self.db.executemany(
+                    'UPDATE renders SET last_used = ?, hits = hits + 1 WHERE tex = ? AND display = ? AND version = ?',
+                    [(time.time(), tex, display, self.version) for tex, display in found]
+                )
+        return found
+
+    def put(self, rendered: dict[tuple[str, bool], Optional[str]], hits: int, misses: int) -> None:
+        """Store newly rendered formulas and add a render call's hit and miss counts."""
+        now = time.time()
+        with self.db:
+            self.db.executemany(
+                'INSERT OR REPLACE INTO renders (tex, display, version, html, size, last_used) VALUES (?, ?, ?, ?, ?, ?)',
+                [
+                    (tex, display, self.version, html_out, len(tex) + len(html_out or ''), now)
+                    for (tex, display), html_out in rendered.items()
+                ]
+            )
+            self.db.execute("UPDATE counters SET value = value + ? WHERE name = 'hits'", (hits,))
+            self.db.execute("UPDATE counters SET value = value + ? WHERE name = 'misses'", (misses,))
+        if rendered:
+            self.prune(self.max_bytes)
+
+    def prune(self, max_bytes: int) -> int:
+        """Evict least recently used entries until at most max_bytes remain; returns the count."""
+        total = self.db.execute('SELECT COALESCE(SUM(size), 0) FROM renders').fetchone()[0]
+        if total <= max_bytes:
+            return 0
+        evict = []
+        for rowid, size in self.db.execute('SELECT rowid, size FROM renders ORDER BY last_used'):
+            if total <= max_bytes:
+                break
+            evict.append((rowid,))
+            total -= size
+        with self.db:
+            self.db.executemany('DELETE FROM renders WHERE rowid = ?', evict)
+        return len(evict)
+
+    def stats(self) -> dict:
+        entries, size = self.db.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM renders').fetchone()
+        counters = dict(self.db.execute('SELECT name, value FROM counters'))
+        return {
+            'entries': entries,
+            'bytes': size,
+            'hits': counters['hits'],
+            'misses': counters['misses'],
+            'versions': self.db.execute(
+                'SELECT version, COUNT(*) FROM renders GROUP BY version ORDER BY COUNT(*) DESC'
+            ).fetchall(),
+            'top': self.db.execute(
+                'SELECT tex, hits FROM renders ORDER BY hits DESC, last_used DESC LIMIT 10'
+            ).fetchall()
+        }
+
+    def close(self) -> None:
+        self.db.close()
+
+
+def katex_version(dist: Path) -> str:
+    """KaTeX version from the install's package.json, else its location and mtime."""
+    try:
+        return json.loads((dist.parent / 'package.json').read_text(encoding='utf-8'))['version']
+    except (OSError, ValueError, KeyError, TypeError):
+        return f"{dist}@{_mtime(dist)}"
+
+
+def open_math_cache(version: str) -> Optional[MathRenderCache]:
+    try:
+        return MathRenderCache(version)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"⚠ KaTeX render cache unavailable: {e}")
+        return None
+
+
+class KatexWorker:
+    """Long-lived Node process that renders TeX with the local KaTeX build.
+
+    Results are memoised by (tex, display mode) for the life of the process and
+    looked up in the persistent render cache, so a formula repeated across
+    questions, quizzes or runs is only rendered once. Node is only started once
+    a formula misses both.
+    """
+
+    def __init__(self, katex_js: Path, cache: Optional[MathRenderCache] = None):
+        self.katex_js = katex_js
+        self.cache = cache
+        self.process: Optional[subprocess.Popen] = None
+        self.memo: dict[tuple[str, bool], Optional[str]] = {}
+        self.failed = False
+        self.hits = 0
+        self.misses = 0
+
+    def start(self) -> None:
+        self.process = subprocess.Popen(
+            [shutil.which('node') or 'node', '-e', KATEX_WORKER_JS, str(self.katex_js)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding='utf-8',
+            bufsize=1
+        )
+        ready = self._read()
+        if not ready.get('ready'):
+            raise RuntimeError(ready.get('error', 'worker failed to start'))
+
+    def _read(self) -> dict:
+        line = self.process.stdout.readline()
+        if not line:
+            raise RuntimeError('KaTeX worker exited unexpectedly')
+        return json.loads(line)
+
+    def render(self, formulas: Iterable[tuple[str, bool]]) -> dict[tuple[str, bool], Optional[str]]:
+        """Map each (tex, display) to KaTeX HTML, or None for TeX left to the browser.
+
+        None marks TeX KaTeX rejects, and every uncached formula once the worker
+        has failed.
+        """
+        formulas = list(dict.fromkeys(formulas))
+        if len(self.memo) > MAX_MATH_MEMO:
+            self.memo.clear()
+        missing = [formula for formula in formulas if formula not in self.memo]
+        if missing and self.cache:
+            try:
+                self.memo.update(self.cache.get(missing))
+            except sqlite3.Error as e:
+                self._drop_cache(e)
+            missing = [formula for formula in missing if formula not in self.memo]
+        hits = len(formulas) - len(missing)
+        self.hits += hits
+        self.misses += len(missing)
+
+        rendered = {}
+        if missing and not self.failed:
+            try:
+                if not self.process:
+                    self.start()
+                self.process.stdin.write(json.dumps({'formulas': missing}) + '\n')
+                self.process.stdin.flush()
+                rendered = dict(zip(missing, self._read()['html']))
+                self.memo.update(rendered)
+            except (OSError, RuntimeError, ValueError) as e:
+                logger.warning(f"⚠ KaTeX worker failed, remaining math renders in the browser: {e}")
+                self.failed = True
+        if self.cache and formulas:
+            try:
+                self.cache.put(rendered, hits, len(missing))
+            except sqlite3.Error as e:
+                self._drop_cache(e)
+        return {formula: self.memo.get(formula) for formula in formulas}
+
+    def _drop_cache(self, error: Exception) -> None:
+        logger.warning(f"⚠ KaTeX render cache failed, continuing without it: {error}")
+        self.cache.close()
+        self.cache = None
+
+    def close(self) -> None:
+        if self.cache:
+            self.cache.close()
+        if not self.process:
+            return
+        if self.process.poll() is None:
+            try:
+                self.process.stdin.close()
+                self.process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+                self.process.wait()
+        self.process = None
+
+
+def get_katex_worker() -> Optional[KatexWorker]:
+    """Create the KaTeX worker once per process; None when Node or a local KaTeX is missing."""
+    global _katex_worker, _katex_worker_started
+    if _katex_worker_started:
+        return _katex_worker
+    _katex_worker_started = True
+
+    dist = find_katex_dist()
+    if not dist or not (dist / 'katex.min.js').exists() or not shutil.which('node'):
+        logger.warning("⚠ Math prerendering needs Node and a local KaTeX install; math renders in the browser")
+        return None
+    _katex_worker = KatexWorker(dist / 'katex.min.js', open_math_cache(katex_version(dist)))
+    return _katex_worker
+
+
+def show_math_cache(prune_to_mb: Optional[float] = None) -> None:
+    """Log the KaTeX render cache's size and counters, optionally pruning it first."""
+    dist = find_katex_dist()
+    cache = open_math_cache(katex_version(dist) if dist else 'none')
+    if not cache:
+        return
+    try:
+        if prune_to_mb is not None:
+            removed = cache.prune(int(prune_to_mb * (1 << 20)))
+            logger.info(f"✓ Pruned {removed} entries from {MATH_CACHE_PATH}")
+        stats = cache.stats()
+    finally:
+        cache.close()
+    lookups = stats['hits'] + stats['misses']
+    hit_rate = f"{stats['hits'] / lookups:.1%}" if lookups else 'n/a'
+    logger.info(f"KaTeX render cache: {MATH_CACHE_PATH}")
+    logger.info(
+        f"  {stats['entries']} entries, {stats['bytes'] / (1 << 20):.1f} MB "
+        f"of {MATH_CACHE_MAX_BYTES / (1 << 20):.0f} MB"
+    )
+    logger.info(f"  {stats['hits']} hits, {stats['misses']} misses ({hit_rate} hit rate)")
+    for version, count in stats['versions']:
+        logger.info(f"  KaTeX {version}: {count} entries")
+    for tex, hits in stats['top']:
+        logger.info(f"  {hits:>8} hits  {tex[:60]}")
+
+
+def prerender_questions(questions: list, worker: KatexWorker) -> bool:
+    """Replace the math in each question's text fields with KaTeX HTML, in place.
+
+    All formulas of the batch go to the worker in one request. Returns True when
+    math is left for the browser to render: TeX KaTeX rejects (auto-render shows
+    the error) and fields with inline markup, whose formulas auto-render only
+    finds within single text nodes.
+    """
+    fields = []
+    runtime_math = False
+    for question in questions:
+        for name in QUIZ_MATH_FIELDS:
+            value = question.get(name)
+            if isinstance(value, list):
+                targets = [(value, index) for index in range(len(value))]
+            else:
+                targets = [(question, name)]
+            for container, key in targets:
+                text = container[key] if isinstance(container, list) else container.get(key)
+                if not isinstance(text, str) or not MATH_LEFT_RE.search(text):
+                    continue
+                if HTML_TAG_RE.search(text):
+                    runtime_math = True
+                    continue
+                # Fields are HTML; auto-render sees their text with entities decoded
+                parts = split_math(html.unescape(text))
+                if any(isinstance(part, tuple) for part in parts):
+                    fields.append((container, key, parts))
+
+    rendered = worker.render(
+        (part[0], part[2]) for _, _, parts in fields for part in parts if isinstance(part, tuple)
+    )
+    for container, key, parts in fields:
+        output = []
+        for part in parts:
+            if isinstance(part, str):
+                output.append(html.escape(part, quote=False))
+            elif rendered[(part[0], part[2])] is None:
+                runtime_math = True
+                output.append(html.escape(part[1], quote=False))
+            else:
+                # auto-render wraps each formula in a span as well
+                output.append(f"<span>{rendered[(part[0], part[2])]}</span>")
+        container[key] = ''.join(output)
+    return runtime_math
+
+
+def without_katex_runtime(katex_assets: dict, shared_urls: Optional[dict] = None) -> tuple[dict, Optional[dict]]:
+    """Assets for a page whose math is all prerendered: KaTeX CSS and fonts, no scripts."""
+    if shared_urls:
+        shared_urls = {name: url for name, url in shared_urls.items() if name not in ('katex_js', 'auto_render_js')}
+    return {**katex_assets, 'scripts': ''}, shared_urls
+
+
+def _spool_questions(spool: BinaryIO, batch: list, written: int, chunk_size: int) -> None:
+    """Append a batch of questions that follows `written` earlier ones to the spool."""
+    if chunk_size > 0:
+        if batch:
+            spool.write(
+                f'    <script type="application/json" id="quiz-chunk-{written // chunk_size}">'
+                f'{_script_json(batch)}</script>\n'.encode('utf-8')
+            )
+        return
+    # Serialising a whole batch per call is much faster than one dumps per question;
+    # its brackets are dropped so the batches join into one array
+    spool.write(b', ' if written else b'[')
+    spool.write(_script_json(batch)[1:-1].encode('utf-8'))
+
+
+QUESTION_DATA_SENTINEL = '\x00quiz-question-data\x00'
+
+
+def stream_quiz_html(
+    input_path: str,
+    output_path: str,
+    katex_assets: dict,
+    shared_urls: Optional[dict] = None,
+    chunk_size: int = 0,
+    prerender_math: bool = False
+) -> int:
+    """Write the quiz page for input_path one question at a time; returns the question count.
+
+    Questions are validated and serialised into a spool file in batches (one chunk,
+    or STREAM_BATCH_SIZE questions) as they are parsed, so memory is bounded by a
+    batch rather than the deck. The page is
+    assembled around the spool once the title and question count are known.
+
+    With prerender_math each batch's formulas are rendered to KaTeX HTML by the
+    KaTeX worker, and the page ships no KaTeX scripts if none are left.
+    """
+    output = Path(output_path)
+    title = "Quiz"
+    count = 0
+    topic_totals = {}
+    worker = get_katex_worker() if prerender_math else None
+    runtime_math = False
+    if worker:
+        hits, misses = worker.hits, worker.misses
+    with tempfile.TemporaryFile('w+b', dir=output.parent) as spool:
+        batch_size = chunk_size if chunk_size > 0 else STREAM_BATCH_SIZE
+        batch = []
+        for kind, value in iter_json_records(input_path, 'questions'):
+            if kind == 'field':
+                if value[0] == 'title':
+                    title = value[1]
+                continue
+            validate_question(value, count + 1)
+            batch.append(value)
+            count += 1
+            if len(batch) == batch_size:
+                tally_topics(batch, topic_totals)
+                if worker:
+                    runtime_math |= prerender_questions(batch, worker)
+                _spool_questions(spool, batch, count - len(batch), chunk_size)
+                batch = []
+        tally_topics(batch, topic_totals)
+        if worker and batch:
+            runtime_math |= prerender_questions(batch, worker)
+        if batch or not count:
+            _spool_questions(spool, batch, count - len(batch), chunk_size)
+        if chunk_size <= 0:
+            spool.write(b']')
+
+        if worker:
+            logger.info(f"Math prerendered: {worker.hits - hits} formulas cached, {worker.misses - misses} rendered")
+        if worker and not runtime_math:
+            katex_assets, shared_urls = without_katex_runtime(katex_assets, shared_urls)
+
+        if chunk_size > 0:
+            page = render_quiz_page(
+                title, count, QUESTION_DATA_SENTINEL, lazy_questions_script(count, chunk_size),
+                katex_assets, shared_urls, topic_totals
+            )
+        else:
+            page = render_quiz_page(
+                title, count, '', f"        const questions = {QUESTION_DATA_SENTINEL};",
+                katex_assets, shared_urls, topic_totals
+            )
+        head, tail = page.split(QUESTION_DATA_SENTINEL.encode('utf-8'))
+
+        spool.seek(0)
+        tmp_path = output.with_name(f".{output.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(head)
+                shutil.copyfileobj(spool, f, STREAM_READ_SIZE)
+                f.write(tail)
+            os.replace(tmp_path, output)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+    return count
+
+
+def write_compressed_siblings(output_path: str, formats: Iterable[str] = (), levels: Optional[dict] = None) -> dict:
+    """Write <output>.gz / <output>.br next to output_path for static servers and return the sizes.
+
+    levels maps a format to its level (gzip 1-9, brotli 0-11); formats not in
+    it use their best (gzip 9, brotli 11). Siblings of formats
+    that are not requested are removed, so a rebuilt page never has a stale one.
+    """
+    global _brotli_missing_warned
+    output = Path(output_path)
+    sizes = {'raw': output.stat().st_size}
+    for fmt, (suffix, best) in COMPRESSIONS.items():
+        target = output.with_name(output.name + suffix)
+        brotli = None
+        if fmt == 'brotli' and fmt in formats:
+            try:
+                import brotli
+            except ImportError:
+                if not _brotli_missing_warned:
+                    logger.warning("⚠ brotli is not installed (pip install brotli), skipping .br files")
+                    _brotli_missing_warned = True
+        if fmt not in formats or (fmt == 'brotli' and brotli is None):
+            target.unlink(missing_ok=True)
+            continue
+
+        level = (levels or {}).get(fmt, best)
+        tmp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        try:
+            with open(output, 'rb') as src, open(tmp_path, 'wb') as f:
+                if brotli:
+                    compressor = brotli.Compressor(quality=level)
+                    for block in iter(lambda: src.read(STREAM_READ_SIZE), b''):
+                        f.write(compressor.process(block))
+                    f.write(compressor.finish())
+                else:
+                    # mtime=0 keeps the bytes reproducible, so unchanged pages give unchanged siblings
+                    with gzip.GzipFile(filename='', mode='wb', fileobj=f, compresslevel=level, mtime=0) as gz:
+                        shutil.copyfileobj(src, gz, STREAM_READ_SIZE)
+            os.replace(tmp_path, target)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        sizes[fmt] = target.stat().st_size
+    return sizes
+
+
+def writable_compressions(formats: Iterable[str]) -> list[str]:
+    """Return the formats write_compressed_siblings can write here (brotli needs its module)."""
+    writable = []
+    for fmt in sorted(formats):
+        if fmt == 'brotli':
+            try:
+                import brotli  # noqa: F401
+            except ImportError:
+                continue
+        writable.append(fmt)
+    return writable
+
+
+def compression_report(sizes: dict) -> str:
+    """Format write_compressed_siblings sizes as 'raw 120.0 KB, gzip 30.0 KB (25%), ...'."""
+    raw = sizes['raw']
+    parts = [f"raw {raw / 1024:.1f} KB"]
+    for fmt in COMPRESSIONS:
+        if fmt in sizes:
+            parts.append(f"{fmt} {sizes[fmt] / 1024:.1f} KB ({sizes[fmt] / max(raw, 1):.0%})")
+    return ', '.join(parts)
+
+
+def converter_version() -> str:
+    """Digest of this converter's source, so any code change invalidates earlier builds."""
+    global _converter_version
+    if _converter_version is None:
+        _converter_version = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:16]
+    return _converter_version
+
+
+def asset_version() -> str:
+    """Identify the KaTeX install pages are built against."""
+    dist = find_katex_dist()
+    return f"{dist}@{_mtime(dist)}" if dist else 'cdn'
+
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_build_manifest(output_dir: Path) -> dict:
+    try:
+        return json.loads((output_dir / BUILD_MANIFEST_NAME).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+def write_build_manifest(output_dir: Path, manifest: dict) -> None:
+    path = output_dir / BUILD_MANIFEST_NAME
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        tmp_path.write_text(json.dumps(manifest, sort_keys=True), encoding='utf-8')
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"⚠ Build manifest not saved: {e}")
+
+
+def check_build(
+    input_path: str,
+    output_path: str,
+    options: dict,
+    manifest: dict,
+    force: bool = False,
+    existing: Optional[set] = None
+) -> tuple[Optional[str], Optional[dict]]:
+    """Return (reason to rebuild or None if current, build state to record).
+
+    The input is only re-hashed when its size or mtime changed since the last build.
+    Missing siblings that can be written now (see writable_compressions) also
+    trigger a rebuild.
+    The output is also rebuilt when a file the build deployed (see deployed_files)
+    is gone; existing caches paths already found, for batches sharing fonts/assets.
+    """
+    previous = manifest.get(Path(output_path).name)
+    try:
+        stat = Path(input_path).stat()
+        input_stat = [stat.st_size, stat.st_mtime_ns]
+        if previous and previous.get('input_stat') == input_stat:
+            digest = previous['input']
+        else:
+            digest = _file_digest(Path(input_path))
+    except OSError:
+        return 'input unreadable', None
+
+    state = {
+        'input': digest,
+        'input_stat': input_stat,
+        'converter': converter_version(),
+        'assets': asset_version(),
+        'options': options
+    }
+    if force:
+        return 'forced', state
+    if not previous:
+        return 'not built before', state
+    for field in ('input', 'converter', 'assets', 'options'):
+        if previous.get(field) != state[field]:
+            return f"{field} changed", state
+    written = previous.get('compressed', [])
+    if set(options['compress']) - set(written):
+        # e.g. brotli was missing at build time and has been installed since
+        added = sorted(set(writable_compressions(options['compress'])) - set(written))
+        if added:
+            return f"{', '.join(added)} sibling not written yet", state
+    try:
+        output_stat = Path(output_path).stat()
+    except OSError:
+        return 'output missing', state
+    if previous.get('output_stat') != [output_stat.st_size, output_stat.st_mtime_ns]:
+        return 'output modified', state
+    output_dir = Path(output_path).resolve().parent
+    for name in previous.get('files', []):
+        path = os.path.normpath(output_dir / name)
+        if existing is not None and path in existing:
+            continue
+        if not os.path.exists(path):
+            return f"{name} missing", state
+        if existing is not None:
+            existing.add(path)
+    return None, state
+
+
+def deployed_files(
+    output_path: str,
+    katex_assets: dict,
+    sizes: dict,
+    fonts_root: Optional[str] = None,
+    shared_assets: Optional[dict] = None
+) -> list[str]:
+    """List the files deployed along with the page, relative to its directory.
+
+    These are the compressed siblings in sizes, the shared assets and the KaTeX fonts.
+    """
+    output = Path(output_path).resolve()
+    files = [output.with_name(output.name + COMPRESSIONS[fmt][0]) for fmt in sizes if fmt != 'raw']
+    fonts_base = None
+    if shared_assets:
+        assets_root = Path(shared_assets['root'])
+        files += [assets_root / filename for filename in shared_assets['files'].values()]
+        if 'katex_css' in shared_assets['files']:
+            fonts_base = assets_root
+    else:
+        fonts_base = Path(fonts_root).resolve() if fonts_root else output.parent
+    fonts_dir = katex_assets.get('fonts_dir')
+    if fonts_base and fonts_dir and fonts_dir.exists():
+        files += [fonts_base / 'fonts' / font.name for font in fonts_dir.glob('*') if font.is_file()]
+    return sorted(Path(os.path.relpath(path, output.parent)).as_posix() for path in files)
+
+
+def record_build(
+    output_path: str,
+    state: dict,
+    manifest: dict,
+    files: Iterable[str] = (),
+    sizes: Optional[dict] = None
+) -> None:
+    """Add the build of output_path to manifest, with its deployed files and the siblings in sizes."""
+    stat = Path(output_path).stat()
+    manifest[Path(output_path).name] = {
+        **state,
+        'output_stat': [stat.st_size, stat.st_mtime_ns],
+        'files': list(files),
+        'compressed': sorted(fmt for fmt in sizes or () if fmt != 'raw')
+    }
+
+
+def _build_options(
+    fonts_mode: str,
+    fonts_root: Optional[str],
+    asset_mode: str,
+    assets_dir: Optional[str],
+    chunk_size: int,
+    prerender_math: bool = False,
+    compress: Iterable[str] = (),
+    compress_levels: Optional[dict] = None
+) -> dict:
+    return {
+        'fonts_mode': fonts_mode,
+        'fonts_root': str(Path(fonts_root).resolve()) if fonts_root else None,
+        'asset_mode': asset_mode,
+        'assets_dir': str(Path(assets_dir).resolve()) if assets_dir else None,
+        'chunk_size': chunk_size,
+        'prerender_math': prerender_math,
+        'compress': sorted(compress),
+        'compress_levels': compress_levels or None
+    }
+
+
+def convert_quiz(
+    input_path: str,
+    output_path: str,
+    katex_assets: Optional[dict] = None,
+    fonts_mode: str = 'link',
+    fonts_root: Optional[str] = None,
+    asset_mode: str = 'inline',
+    assets_dir: Optional[str] = None,
+    force: bool = False,
+    dry_run: bool = False,
+    chunk_size: int = 0,
+    prerender_math: bool = False,
+    compress: Iterable[str] = (),
+    compress_levels: Optional[dict] = None
+) -> str:
+    """Convert JSON quiz to interactive HTML.
+
+    asset_mode='shared' writes the CSS/JS/KaTeX files once into assets_dir
+    (default: <output dir>/assets) and links them from the page. chunk_size > 0
+    stores the questions in lazily parsed chunks (see generate_html).
+    prerender_math renders formulas to KaTeX HTML at build time (see stream_quiz_html).
+    compress lists the precompressed siblings ('gzip', 'brotli') to write next to the page.
+
+    The build is skipped when the output directory's build manifest shows the
+    output is current; force rebuilds anyway and dry_run only reports.
+    """
+    output_dir = Path(output_path).resolve().parent
+    if asset_mode == 'shared':
+        assets_dir = assets_dir or str(output_dir / 'assets')
+    else:
+        assets_dir = None
+    options = _build_options(
+        fonts_mode, fonts_root, asset_mode, assets_dir, chunk_size, prerender_math, compress, compress_levels
+    )
+    reason, state = check_build(input_path, output_path, options, read_build_manifest(output_dir), force)
+    if reason is None:
+        logger.info(f"✓ Up to date: {output_path}")
+        return output_path
+    if dry_run:
+        logger.info(f"Would rebuild: {output_path} ({reason})")
+        return output_path
+
+    logger.info(f"Streaming quiz from {input_path} to {output_path}")
+    katex_assets = katex_assets or get_katex_assets()
+    if asset_mode == 'shared':
+        shared_assets = publish_shared_assets(katex_assets, assets_dir, fonts_mode)
+        count = stream_quiz_html(
+            input_path,
+            output_path,
+            katex_assets,
+            shared_asset_urls(shared_assets, output_path),
+            chunk_size,
+            prerender_math
+        )
+    else:
+        count = stream_quiz_html(
+            input_path,
+            output_path,
+            localize_katex_assets(katex_assets, output_path, fonts_root),
+            chunk_size=chunk_size,
+            prerender_math=prerender_math
+        )
+    logger.info(f"Wrote {count} questions")
+    sizes = write_compressed_siblings(output_path, compress, compress_levels)
+    if compress:
+        logger.info(f"Compressed: {compression_report(sizes)}")
+
+    if asset_mode != 'shared':
+        shared_assets = None
+        ensure_katex_fonts(output_path, katex_assets['fonts_dir'], fonts_mode, fonts_root)
+
+    # Re-read so builds of sibling outputs finished meanwhile are kept
+    build_manifest = read_build_manifest(output_dir)
+    record_build(
+        output_path, state, build_manifest,
+        deployed_files(output_path, katex_assets, sizes, fonts_root, shared_assets), sizes
+    )
+    write_build_manifest(output_dir, build_manifest)
     logger.success(f"Quiz created: {output_path}")
     return output_path
 
 
+def collect_batch_jobs(
+    output_dir: str,
+    input_dir: Optional[str] = None,
+    pattern: str = '*.json',
+    manifest: Optional[str] = None
+) -> list[tuple[str, str]]:
+    """Pair every batch input with its output HTML path under output_dir.
+
+    Raises ValueError if two inputs would write the same output, or an output
+    would land outside output_dir (a manifest entry with '..').
+    """
+    output_root = Path(output_dir)
+    resolved_root = output_root.resolve()
+    jobs = []
+    sources: dict[Path, Path] = {}
+
+    def add_job(input_path: Path, relative: Path) -> None:
+        output_path = output_root / relative.with_suffix('.html')
+        resolved = output_path.resolve()
+        if not resolved.is_relative_to(resolved_root):
+            raise ValueError(f"{input_path}: output {output_path} is outside {output_dir}")
+        source = input_path.resolve()
+        if resolved in sources:
+            if sources[resolved] != source:
+                raise ValueError(f"{input_path} and {sources[resolved]} would both write {output_path}")
+            return  # the same input listed twice
+        sources[resolved] = source
+        jobs.append((str(input_path), str(output_path)))
+
+    if input_dir:
+        input_root = Path(input_dir)
+        for input_path in sorted(input_root.glob(pattern)):
+            if input_path.is_file() and input_path.name != BUILD_MANIFEST_NAME:
+                relative = input_path.relative_to(input_root)
+                add_job(input_path, relative)
+
+    if manifest:
+        manifest_path = Path(manifest)
+        for line in manifest_path.read_text(encoding='utf-8').splitlines():
+            entry = line.strip()
+            if not entry or entry.startswith('#'):
+                continue
+            input_path = Path(entry)
+            if input_path.is_absolute():
+                relative = Path(input_path.name)
+            else:
+                relative = input_path
+                input_path = manifest_path.parent / input_path
+            add_job(input_path, relative)
+
+    return jobs
+
+
+_batch_katex_assets: Optional[dict] = None
+_batch_fonts_root: Optional[str] = None
+_batch_shared_assets: Optional[dict] = None
+_batch_chunk_size = 0
+_batch_prerender_math = False
+_batch_compress: tuple[str, ...] = ()
+_batch_compress_levels: Optional[dict] = None
+
+
+def _init_batch_worker(
+    katex_assets: dict,
+    fonts_root: Optional[str] = None,
+    shared_assets: Optional[dict] = None,
+    chunk_size: int = 0,
+    prerender_math: bool = False,
+    compress: tuple[str, ...] = (),
+    compress_levels: Optional[dict] = None
+) -> None:
+    global _batch_katex_assets, _batch_fonts_root, _batch_shared_assets, _batch_chunk_size, _batch_prerender_math
+    global _batch_compress, _batch_compress_levels
+    _batch_katex_assets = katex_assets
+    _batch_fonts_root = fonts_root
+    _batch_shared_assets = shared_assets
+    _batch_chunk_size = chunk_size
+    _batch_prerender_math = prerender_math
+    _batch_compress = compress
+    _batch_compress_levels = compress_levels
+
+
+def _convert_batch_job(job: tuple[str, str]) -> tuple[str, str, float, Optional[str], Optional[dict]]:
+    input_path, output_path = job
+    start = time.perf_counter()
+    try:
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        if _batch_shared_assets:
+            stream_quiz_html(
+                input_path,
+                output_path,
+                _batch_katex_assets,
+                shared_asset_urls(_batch_shared_assets, output_path),
+                _batch_chunk_size,
+                _batch_prerender_math
+            )
+        else:
+            stream_quiz_html(
+                input_path,
+                output_path,
+                localize_katex_assets(_batch_katex_assets, output_path, _batch_fonts_root),
+                chunk_size=_batch_chunk_size,
+                prerender_math=_batch_prerender_math
+            )
+        # Compressing in the worker spreads it over the pool along with rendering
+        sizes = write_compressed_siblings(output_path, _batch_compress, _batch_compress_levels)
+    except Exception as e:
+        return input_path, output_path, time.perf_counter() - start, f"{type(e).__name__}: {e}", None
+    return input_path, output_path, time.perf_counter() - start, None, sizes
+
+
+def convert_quiz_batch(
+    jobs: list[tuple[str, str]],
+    workers: Optional[int] = None,
+    fonts_mode: str = 'link',
+    fonts_root: Optional[str] = None,
+    assets_dir: Optional[str] = None,
+    force: bool = False,
+    dry_run: bool = False,
+    chunk_size: int = 0,
+    prerender_math: bool = False,
+    compress: Iterable[str] = (),
+    compress_levels: Optional[dict] = None
+) -> list[tuple[str, str, float, Optional[str], Optional[dict]]]:
+    """Convert many quizzes in one process tree, resolving KaTeX assets only once.
+
+    With assets_dir set, every page links the shared CSS/JS/KaTeX files written there.
+    With prerender_math each worker process keeps one KaTeX worker and formula memo.
+    compress siblings are written by the worker that rendered the page; each result
+    ends with the page's raw/compressed sizes.
+    Outputs the build manifests show as current are skipped unless force is set;
+    dry_run only reports what would be rebuilt.
+    """
+    started = time.perf_counter()
+    asset_mode = 'shared' if assets_dir else 'inline'
+    compress = tuple(compress)
+    options = _build_options(
+        fonts_mode, fonts_root, asset_mode, assets_dir, chunk_size, prerender_math, compress, compress_levels
+    )
+    build_manifests: dict[Path, dict] = {}
+    build_states: dict[str, dict] = {}
+    existing: set[str] = set()
+    pending = []
+    for input_path, output_path in jobs:
+        output_dir = Path(output_path).resolve().parent
+        if output_dir not in build_manifests:
+            build_manifests[output_dir] = read_build_manifest(output_dir)
+        reason, state = check_build(
+            input_path, output_path, options, build_manifests[output_dir], force, existing
+        )
+        if reason is None:
+            continue
+        if dry_run:
+            logger.info(f"Would rebuild: {output_path} ({reason})")
+        pending.append((input_path, output_path))
+        if state:
+            build_states[output_path] = state
+
+    up_to_date = len(jobs) - len(pending)
+    if dry_run:
+        logger.success(f"Dry run: {len(pending)} to rebuild, {up_to_date} up to date")
+        return []
+    jobs = pending
+
+    katex_assets = get_katex_assets()
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    logger.info(f"Converting {len(jobs)} quizzes with {workers} worker(s), {up_to_date} up to date")
+
+    shared_assets = publish_shared_assets(katex_assets, assets_dir, fonts_mode) if assets_dir else None
+    if workers == 1:
+        _init_batch_worker(katex_assets, fonts_root, shared_assets, chunk_size, prerender_math, compress, compress_levels)
+        results = [_convert_batch_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_batch_worker,
+            initargs=(katex_assets, fonts_root, shared_assets, chunk_size, prerender_math, compress, compress_levels)
+        ) as executor:
+            results = list(executor.map(_convert_batch_job, jobs, chunksize=16))
+
+    output_dirs = set()
+    compressed_totals: dict[str, int] = {}
+    for input_path, output_path, elapsed, error, sizes in results:
+        if error:
+            logger.error(f"✗ {input_path}: {error}")
+            continue
+        report = f"; {compression_report(sizes)}" if compress else ''
+        logger.info(f"✓ {input_path} → {output_path} ({elapsed * 1000:.1f} ms{report})")
+        output_dirs.add(str(Path(output_path).resolve().parent))
+        for fmt, size in sizes.items():
+            compressed_totals[fmt] = compressed_totals.get(fmt, 0) + size
+
+    # Fonts only depend on the output directory, so deploy them once per directory
+    # (or once in total when the whole tree shares a fonts root)
+    if shared_assets:
+        output_dirs = set()
+    elif fonts_root:
+        output_dirs = {fonts_root} if output_dirs else set()
+    for output_dir in sorted(output_dirs):
+        ensure_katex_fonts(str(Path(output_dir) / 'quiz.html'), katex_assets['fonts_dir'], fonts_mode)
+
+    changed_dirs = set()
+    for _, output_path, _, error, sizes in results:
+        if not error and output_path in build_states:
+            output_dir = Path(output_path).resolve().parent
+            record_build(
+                output_path, build_states[output_path], build_manifests[output_dir],
+                deployed_files(output_path, katex_assets, sizes, fonts_root, shared_assets), sizes
+            )
+            changed_dirs.add(output_dir)
+    for output_dir in changed_dirs:
+        write_build_manifest(output_dir, build_manifests[output_dir])
+
+    timings = [elapsed for _, _, elapsed, error, _ in results if not error]
+    failed = len(results) - len(timings)
+    total = time.perf_counter() - started
+    if timings:
+        logger.info(
+            f"Per-file render: mean {sum(timings) / len(timings) * 1000:.1f} ms, "
+            f"max {max(timings) * 1000:.1f} ms"
+        )
+    if compress and compressed_totals:
+        logger.info(f"Compressed total: {compression_report(compressed_totals)}")
+    summary = (
+        f"Batch finished: {len(timings)} converted, {up_to_date} up to date, "
+        f"{failed} failed in {total:.2f}s"
+    )
+    if failed:
+        logger.warning(summary)
+    else:
+        logger.success(summary)
+    return results
+
+
 def main():
     parser = argparse.ArgumentParser(description="Convert JSON quiz to interactive HTML")
-    parser.add_argument('-i', '--input', required=True, help='Input JSON file')
+    parser.add_argument('-i', '--input', help='Input JSON file')
     parser.add_argument('-o', '--output', default='quiz.html', help='Output HTML file')
+    parser.add_argument('--input-dir', help='Batch mode: convert every matching JSON file in this directory')
+    parser.add_argument('--glob', default='*.json', help='Batch mode: file pattern inside --input-dir (default: *.json)')
+    parser.add_argument('--manifest', help='Batch mode: text file listing input JSON files, one per line')
+    parser.add_argument('--output-dir', help='Batch mode: directory for the generated HTML files')
+    parser.add_argument('--workers', type=int, default=None, help='Batch mode: worker processes (default: CPU count)')
+    parser.add_argument('--fonts-mode', choices=FONT_MODES, default='link',
+                        help='How KaTeX fonts are deployed: hard link from the shared store (default), symlink, or copy')
+    parser.add_argument('--fonts-root', help='Deploy KaTeX fonts once into <dir>/fonts and reference them from every page')
+    parser.add_argument('--asset-mode', choices=ASSET_MODES, default='inline',
+                        help='inline: self-contained pages (default); shared: link content-hashed CSS/JS/KaTeX files')
+    parser.add_argument('--assets-dir',
+                        help='Shared asset mode: directory for the asset files (default: assets/ next to the output)')
+    parser.add_argument('--chunk-size', type=int, default=0,
+                        help='Store questions in lazily parsed chunks of this many (default: 0, one inline array)')
+    parser.add_argument('--prerender-math', action='store_true',
+                        help='Render formulas to KaTeX HTML at build time (needs Node and a local KaTeX install)')
+    parser.add_argument('--compress', nargs='+', choices=tuple(COMPRESSIONS), default=[],
+                        help='Also write precompressed <output>.gz and/or <output>.br for static file servers')
+    parser.add_argument('--gzip-level', type=int,
+                        help='gzip level 1-9 for --compress (default: 9)')
+    parser.add_argument('--brotli-level', type=int,
+                        help='brotli quality 0-11 for --compress (default: 11)')
+    parser.add_argument('--force', action='store_true', help='Rebuild even when the build manifest says the output is current')
+    parser.add_argument('--dry-run', action='store_true', help='Report which outputs would be rebuilt, without writing anything')
+    parser.add_argument('--refresh-asset-cache', action='store_true', help='Re-resolve cached KaTeX asset locations')
+    parser.add_argument('--math-cache-stats', action='store_true',
+                        help='Show the size and hit rate of the KaTeX render cache used by --prerender-math')
+    parser.add_argument('--prune-math-cache', type=float, metavar='MB',
+                        help='Evict least recently used KaTeX renders until the cache is at most MB (0 empties it)')
 
     args = parser.parse_args()
 
-    convert_quiz(args.input, args.output)
+    if args.refresh_asset_cache:
+        refresh_asset_cache()
+    if args.math_cache_stats or args.prune_math_cache is not None:
+        show_math_cache(args.prune_math_cache)
+    if args.refresh_asset_cache or args.math_cache_stats or args.prune_math_cache is not None:
+        if not (args.input or args.input_dir or args.manifest):
+            return
+
+    if args.chunk_size < 0:
+        parser.error('--chunk-size must be 0 or a positive number')
+    if args.gzip_level is not None and not 1 <= args.gzip_level <= 9:
+        parser.error('--gzip-level must be between 1 and 9')
+    if args.brotli_level is not None and not 0 <= args.brotli_level <= 11:
+        parser.error('--brotli-level must be between 0 and 11')
+    compress_levels = {
+        fmt: level for fmt, level in (('gzip', args.gzip_level), ('brotli', args.brotli_level)) if level is not None
+    }
+    if args.asset_mode == 'shared' and args.fonts_root:
+        parser.error('--fonts-root cannot be combined with --asset-mode shared (fonts go to <assets-dir>/fonts)')
+
+    if args.input_dir or args.manifest:
+        if args.input:
+            parser.error('--input cannot be combined with --input-dir/--manifest')
+        if not args.output_dir:
+            parser.error('--output-dir is required in batch mode')
+        try:
+            jobs = collect_batch_jobs(args.output_dir, args.input_dir, args.glob, args.manifest)
+        except ValueError as e:
+            parser.error(str(e))
+        if not jobs:
+            parser.error('No input files found for batch mode')
+        assets_dir = None
+        if args.asset_mode == 'shared':
+            assets_dir = args.assets_dir or str(Path(args.output_dir) / 'assets')
+        results = convert_quiz_batch(
+            jobs,
+            args.workers,
+            args.fonts_mode,
+            args.fonts_root,
+            assets_dir,
+            args.force,
+            args.dry_run,
+            args.chunk_size,
+            args.prerender_math,
+            args.compress,
+            compress_levels
+        )
+        if any(error for _, _, _, error, _ in results):
+            sys.exit(1)
+        return
+
+    if not args.input:
+        parser.error('one of --input, --input-dir or --manifest is required')
+
+    convert_quiz(
+        args.input,
+        args.output,
+        fonts_mode=args.fonts_mode,
+        fonts_root=args.fonts_root,
+        asset_mode=args.asset_mode,
+        assets_dir=args.assets_dir,
+        force=args.force,
+        dry_run=args.dry_run,
+        chunk_size=args.chunk_size,
+        prerender_math=args.prerender_math,
+        compress=args.compress,
+        compress_levels=compress_levels
+    )
 
 
 if __name__ == "__main__":